@@ -2,16 +2,43 @@
 from __future__ import annotations
 from typing import Callable, Optional
 from settings_store import AppSettings
-from ssh_controller import SSHConnectionManager, SSHController, PasswordProvider
+from listing_cache import DirectoryListingCache
+from file_metadata import MetadataService
+from path_index import PathIndexService
+from remote_cache import RemoteContentCache
+from remote_walk import RemoteFolderWalker
+from session_store import SessionStore
+from ssh_controller import SSHConnectionManager, SSHController, SSHHostRegistry, PasswordProvider
 
 class AppContext:
     def __init__(self, password_provider: Optional[PasswordProvider] = None):
         self.settings = AppSettings()
         self.ssh_manager = SSHConnectionManager(self.settings.ssh_host or None, self.settings.ssh_username or None)
         self.ssh = SSHController(self.ssh_manager, password_provider=password_provider)
+        # Connections to the host profiles, for "name:/path" workspace paths
+        self.ssh_hosts = SSHHostRegistry(self.ssh_manager, self.settings.ssh_profiles)
+        # Folder walks shared by every workspace tab
+        self.listing_cache = DirectoryListingCache()
+        # Size/lines/tokens/encoding of workspace files, computed in the background
+        self.metadata = MetadataService(ssh_manager=self.ssh_manager, ssh_hosts=self.ssh_hosts)
+        # Ctrl+P picker indexes, rebuilt in the background when stale
+        self.path_index = PathIndexService()
+        # Folders on the SSH host, listed in the background
+        self.remote_walker = RemoteFolderWalker()
+        # Remote file contents reused across runs while size and mtime match
+        self.remote_cache = RemoteContentCache(
+            max_bytes=self.settings.remote_cache_max_mb * 1024 * 1024,
+            compress=self.settings.remote_cache_compress,
+        )
+        # Workspace tabs saved on exit and restored on the next launch
+        self.sessions = SessionStore()
 
         # Keep SSH manager config synced to settings
         self.settings.sshConfigChanged.connect(self._on_ssh_config_changed)
+        self.settings.sshProfilesChanged.connect(self.ssh_hosts.set_profiles)
+        self.settings.remoteCacheChanged.connect(
+            lambda max_mb, compress: self.remote_cache.set_limits(max_mb * 1024 * 1024, compress)
+        )
 
     def _on_ssh_config_changed(self, host: str, username: str):
         self.ssh.configure(host, username)
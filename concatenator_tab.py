@@ -1,6 +1,7 @@
 import os
 import posixpath
-from dataclasses import dataclass
+import time
+from functools import partial
 from typing import Optional
 
 from PyQt5.QtWidgets import (
@@ -13,14 +14,25 @@ from PyQt5.QtWidgets import (
     QLineEdit,
     QPushButton,
     QShortcut,
+    QStackedWidget,
     QVBoxLayout,
     QWidget,
 )
 from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QKeySequence
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QRunnable, QThreadPool, Qt, pyqtSignal
 
 from file_list_widget import FileListWidget
-from file_concatenator import concatenate_files
+from file_concatenator import Concatenation, ContentCache, build_concatenation, present_concatenation
+from remote_paths import is_host_path, join_host_path, split_host_path
+from tab_history import (
+    DEFAULT_MAX_ENTRIES,
+    DEFAULT_MAX_MEMORY_MB,
+    HistoryStep,
+    TabHistory,
+    TabState,
+)
+from watch_mode import WorkspaceWatcher
+from workspace_tree_view import WorkspaceTreeView
 from wsl_utilities import convert_wsl_path
 
 # Preset definitions for prefix and suffix.
@@ -31,16 +43,23 @@ PRESETS = {
 }
 
 
-@dataclass(frozen=True)
-class TabState:
-    files: tuple[str, ...]
-    root_path: Optional[str]
-    include_root: bool
-    prefix: str
-    suffix: str
-    preset: str
+class _ConcatTask(QRunnable):
+    def __init__(self, job, done):
+        super().__init__()
+        self._job = job
+        self._done = done
+
+    def run(self):
+        try:
+            result = self._job()
+        except Exception as exc:  # never let a worker die silently
+            result = Concatenation(error_title="Error", error=str(exc) or type(exc).__name__, critical=True)
+        self._done.emit(result)
+
 
 class ConcatenatorTab(QWidget):
+    _concatDone = pyqtSignal(object)  # Concatenation
+
     def __init__(self, ctx):
         super().__init__()
         self.ctx = ctx
@@ -48,8 +67,21 @@ class ConcatenatorTab(QWidget):
         self.root_path = None
         self.loading_preset = False
         self._restoring_state = False
-        self._history: list[TabState] = []
-        self._history_index = -1
+        self._history = TabHistory(
+            getattr(self.settings, "history_max_entries", DEFAULT_MAX_ENTRIES),
+            getattr(self.settings, "history_max_memory_mb", DEFAULT_MAX_MEMORY_MB),
+        )
+        if hasattr(self.settings, "historyLimitsChanged"):
+            self.settings.historyLimitsChanged.connect(self._history.set_limits)
+        self._content_cache = ContentCache()
+        self._workspace_watcher = WorkspaceWatcher(parent=self)
+        self._workspace_watcher.triggered.connect(self._on_watched_files_changed)
+        # Files are read on a worker; the clipboard is filled back here
+        self._concat_pool = QThreadPool(self)
+        self._concat_pool.setMaxThreadCount(1)
+        self._concat_report: Optional[tuple] = None  # (show_success_message, notify) of the running copy
+        self._concat_queued: Optional[tuple] = None
+        self._concatDone.connect(self._on_concatenated)
         self.init_ui()
         self.load_preset_settings()
         self.setAcceptDrops(True)  # Enable drag-and-drop on this widget.
@@ -65,12 +97,27 @@ class ConcatenatorTab(QWidget):
         self.instruction_label.setStyleSheet("font-size: 16px;")
         layout.addWidget(self.instruction_label)
 
-        # File list
+        # File list with a filter box above it; the directory tree is an
+        # alternative view of the same list, built the first time it is shown
+        filter_layout = QHBoxLayout()
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter files...")
+        self.filter_input.setClearButtonEnabled(True)
+        filter_layout.addWidget(self.filter_input, 1)
+        self.tree_checkbox = QCheckBox("Tree")
+        self.tree_checkbox.setToolTip("Group the files by directory")
+        self.tree_checkbox.toggled.connect(self.set_tree_view_enabled)
+        filter_layout.addWidget(self.tree_checkbox)
+        layout.addLayout(filter_layout)
         self.list_widget = FileListWidget(
             self.ctx,
             change_callback=self.on_file_list_changed,
         )
-        layout.addWidget(self.list_widget)
+        self.filter_input.textChanged.connect(self.list_widget.set_filter_text)
+        self.tree_view: Optional[WorkspaceTreeView] = None
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.list_widget)
+        layout.addWidget(self.view_stack)
 
         # Root path section with clickable label
         root_layout = QHBoxLayout()
@@ -109,10 +156,22 @@ class ConcatenatorTab(QWidget):
         prefix_suffix_layout.addWidget(self.suffix_input)
         layout.addLayout(prefix_suffix_layout)
 
-        # Concatenate button
+        # Concatenate button and watch toggle
+        concat_layout = QHBoxLayout()
         self.concat_button = QPushButton("Concatenate and Copy to Clipboard")
         self.concat_button.clicked.connect(self.concatenate_files_wrapper)
-        layout.addWidget(self.concat_button)
+        concat_layout.addWidget(self.concat_button, 1)
+        self.watch_checkbox = QCheckBox("Watch")
+        self.watch_checkbox.setToolTip(
+            "Copy again automatically whenever a file in this workspace changes"
+        )
+        self.watch_checkbox.stateChanged.connect(self.toggle_watch_mode)
+        concat_layout.addWidget(self.watch_checkbox)
+        layout.addLayout(concat_layout)
+        # Outcome of the last automatic copy; watch mode never opens dialogs
+        self.watch_status_label = QLabel()
+        self.watch_status_label.setVisible(False)
+        layout.addWidget(self.watch_status_label)
 
         self.setLayout(layout)
 
@@ -138,6 +197,18 @@ class ConcatenatorTab(QWidget):
         self.redo_shortcut.activated.connect(self.redo)
         self.redo_shortcut_alt = QShortcut(QKeySequence(Qt.CTRL | Qt.SHIFT | Qt.Key_Z), self)
         self.redo_shortcut_alt.activated.connect(self.redo)
+        self.filter_shortcut = QShortcut(QKeySequence.Find, self)
+        self.filter_shortcut.activated.connect(self.filter_input.setFocus)
+        self.picker_shortcut = QShortcut(QKeySequence(Qt.CTRL | Qt.Key_P), self)
+        self.picker_shortcut.activated.connect(lambda: self.list_widget.open_file_picker())
+
+    def set_tree_view_enabled(self, enabled: bool) -> None:
+        if enabled and self.tree_view is None:
+            self.tree_view = WorkspaceTreeView(self.list_widget)
+            self.view_stack.addWidget(self.tree_view)
+        # The filter only applies to the flat list
+        self.filter_input.setEnabled(not enabled)
+        self.view_stack.setCurrentWidget(self.tree_view if enabled else self.list_widget)
 
     def _update_root_button(self) -> None:
         path_text = self.root_path if self.root_path else "None"
@@ -151,31 +222,43 @@ class ConcatenatorTab(QWidget):
             prefix=self.prefix_input.text(),
             suffix=self.suffix_input.text(),
             preset=self.preset_combo.currentText(),
+            folder_sources=tuple(self.list_widget.folder_sources),
         )
 
+    def session_state(self) -> TabState:
+        return self._capture_state()
+
+    def load_session_state(self, state: TabState) -> None:
+        """
+        Restore a saved workspace; it becomes the start of the undo history.
+
+        The saved file list is taken as it is; its folder sources are walked
+        and watched in the background.
+        """
+        self._restore_state(state)
+        self._initialize_history()
+
     def _initialize_history(self) -> None:
-        self._history = [self._capture_state()]
-        self._history_index = 0
+        self._history.reset(self._capture_state())
 
     def _push_history_state(self) -> None:
-        state = self._capture_state()
-        if self._history and 0 <= self._history_index < len(self._history):
-            if self._history[self._history_index] == state:
-                return
-            self._history = self._history[: self._history_index + 1]
-        self._history.append(state)
-        self._history_index = len(self._history) - 1
+        self._history.record(self._capture_state())
 
     def can_undo(self) -> bool:
-        return self._history_index > 0
+        return self._history.can_undo()
 
     def can_redo(self) -> bool:
-        return self._history_index < len(self._history) - 1
+        return self._history.can_redo()
 
-    def _restore_state(self, state: TabState) -> None:
+    def _restore_state(self, state: TabState, step: Optional[HistoryStep] = None) -> None:
         self._restoring_state = True
         try:
-            self.list_widget.set_files(state.files, notify=False)
+            if step is not None:
+                # Undo/redo: replay the recorded splice on the live list
+                self.list_widget.splice_files(step.start, step.stop, step.paths)
+            if step is None or tuple(self.list_widget.files) != state.files:
+                self.list_widget.set_files(state.files, notify=False, normalized=True)
+            self.list_widget.set_folder_sources(state.folder_sources)
             self.root_path = state.root_path
             self.enable_root_checkbox.blockSignals(True)
             self.enable_root_checkbox.setChecked(state.include_root)
@@ -209,18 +292,48 @@ class ConcatenatorTab(QWidget):
 
     def on_file_list_changed(self) -> None:
         self._record_change()
+        self._content_cache.retain(self.list_widget.files)
+        if self.watch_checkbox.isChecked():
+            self._workspace_watcher.set_paths(self._local_files())
+            self._workspace_watcher.schedule()
+
+    def _local_files(self) -> list[str]:
+        remote = self._is_remote()
+        return [
+            p for p in self.list_widget.files
+            if not is_host_path(p) and not (remote and p.startswith("/"))
+        ]
+
+    def toggle_watch_mode(self) -> None:
+        if self.watch_checkbox.isChecked():
+            self._workspace_watcher.set_paths(self._local_files())
+            self._workspace_watcher.schedule()
+        else:
+            self._workspace_watcher.stop()
+            self.watch_status_label.setVisible(False)
 
-    def undo(self) -> None:
-        if self._history_index <= 0:
+    def _on_watched_files_changed(self, changed) -> None:
+        if not self.watch_checkbox.isChecked() or not self.list_widget.files:
             return
-        self._history_index -= 1
-        self._restore_state(self._history[self._history_index])
+        self._content_cache.invalidate(changed)
+        self._concatenate(show_success_message=False, notify=self._show_watch_status)
+
+    def _show_watch_status(self, title: str, text: str) -> None:
+        first_line = text.splitlines()[0] if text else ""
+        summary = first_line if title == "Success" else f"{title}: {first_line}"
+        self.watch_status_label.setText(f"{time.strftime('%H:%M:%S')}  {summary}")
+        self.watch_status_label.setToolTip(text)
+        self.watch_status_label.setVisible(True)
+
+    def undo(self) -> None:
+        step = self._history.undo()
+        if step is not None:
+            self._restore_state(step.state, step)
 
     def redo(self) -> None:
-        if self._history_index >= len(self._history) - 1:
-            return
-        self._history_index += 1
-        self._restore_state(self._history[self._history_index])
+        step = self._history.redo()
+        if step is not None:
+            self._restore_state(step.state, step)
 
     def load_preset_settings(self):
         # Suppress change handling during load
@@ -272,63 +385,86 @@ class ConcatenatorTab(QWidget):
         else:
             event.ignore()
 
+    def _collect_dropped_paths(self, raw_paths) -> tuple[list[str], bool]:
+        """Resolve dropped paths into files to add; folders are expanded."""
+        ssh = self.ctx.ssh.manager
+        connected = bool(ssh and self.ctx.ssh.is_connected())
+        host = ssh.host if connected else None
+        paths: list[str] = []
+        for raw in raw_paths:
+            path = convert_wsl_path(raw.strip(), host)
+            if self._is_remote():
+                path = self._to_posix(path)
+            if path:
+                paths.append(path)
+        # Remote paths are checked in one batch instead of a round trip each
+        remote = {}
+        if connected:
+            # Paths that could not be checked are left out, after a warning
+            infos = self.list_widget.stat_remote(ssh, [p for p in paths if p.startswith("/")])
+            remote = {info.path: info for info in infos or ()}
+        files: list[str] = []
+        recognized = False
+        for path in paths:
+            if path in remote:
+                if remote[path].is_dir:
+                    self.list_widget.add_remote_folder(path)
+                    recognized = True
+                elif remote[path].exists:
+                    files.append(path)
+                    recognized = True
+            elif os.path.isfile(path):
+                files.append(path)
+                recognized = True
+            elif os.path.isdir(path):
+                files.extend(self.list_widget.collect_folder(path))
+                recognized = True
+        return files, recognized
+
     def dropEvent(self, event: QDropEvent):
         """Handle drag and drop of files or text paths."""
         print("Drop event triggered")
+        files: list[str] = []
         added = False
         # Text drops
         if event.mimeData().hasText():
             lines = event.mimeData().text().strip().splitlines()
-            for line in lines:
-                ssh = self.ctx.ssh.manager
-                host = ssh.host if (ssh and self.ctx.ssh.is_connected()) else None
-                path = convert_wsl_path(line.strip(), host)
-                if self._is_remote():
-                    path = self._to_posix(path)
-                if path:
-                    if ssh and self.ctx.ssh.is_connected() and path.startswith("/"):
-                        if ssh.path_exists(path):
-                            self.list_widget.add_file(path, enforce_filter=False)
-                            added = True
-                    elif os.path.isfile(path):
-                        self.list_widget.add_file(path, enforce_filter=False)
-                        added = True
-                    elif os.path.isdir(path):
-                        self.list_widget.add_folder(path)
-                        added = True
+            files, added = self._collect_dropped_paths(lines)
         # URL drops (some platforms provide both text and url data)
         if not added and event.mimeData().hasUrls():
-            for url in event.mimeData().urls():
-                ssh = self.ctx.ssh.manager
-                host = ssh.host if (ssh and self.ctx.ssh.is_connected()) else None
-                path = convert_wsl_path(url.toLocalFile(), host)
-                if self._is_remote():
-                    path = self._to_posix(path)
-                if path:
-                    if ssh and self.ctx.ssh.is_connected() and path.startswith("/"):
-                        if ssh.path_exists(path):
-                            self.list_widget.add_file(path, enforce_filter=False)
-                            added = True
-                    elif os.path.isfile(path):
-                        self.list_widget.add_file(path, enforce_filter=False)
-                        added = True
-                    elif os.path.isdir(path):
-                        self.list_widget.add_folder(path)
-                        added = True
+            files, added = self._collect_dropped_paths(
+                url.toLocalFile() for url in event.mimeData().urls()
+            )
+        # One batch: a single model insert and a single history entry
+        self.list_widget.add_files(files, enforce_filter=False)
 
         if added:
             event.acceptProposedAction()
         else:
             event.ignore()
 
+    def _offers_remote_root(self) -> bool:
+        if self._is_remote() or any(is_host_path(p) for p in self.list_widget.files):
+            return True
+        ssh_hosts = getattr(self.ctx, "ssh_hosts", None)
+        return bool(ssh_hosts is not None and ssh_hosts.profiles)
+
+    def _suggested_remote_root(self) -> str:
+        """Common folder of the remote files; ``name:/path`` when they all live on one profile host."""
+        files = self.list_widget.files
+        if self._is_remote():
+            only_posix = [self._to_posix(p) for p in files if p.startswith("/")]
+            if only_posix:
+                return posixpath.commonpath(only_posix)
+        qualified = [q for q in map(split_host_path, files) if q is not None]
+        if qualified and len({name for name, _path in qualified}) == 1:
+            return join_host_path(qualified[0][0], posixpath.commonpath([path for _name, path in qualified]))
+        return "/"
+
     def select_root_path(self):
         """Select a root path depending on SSH configuration."""
-        if self._is_remote():
-            if self.list_widget.files:
-                only_posix = [self._to_posix(p) for p in self.list_widget.files if p.startswith("/")]
-                base = posixpath.commonpath(only_posix) if only_posix else "/"
-            else:
-                base = "/"
+        if self._offers_remote_root():
+            base = self._suggested_remote_root()
             path, ok = QInputDialog.getText(
                  self, "Insert Host Path", "Enter remote root path:", text=base
             )
@@ -343,7 +479,8 @@ class ConcatenatorTab(QWidget):
             return
 
         # local: Windows/UNIX native commonpath
-        common_path = os.path.commonpath(self.list_widget.files) if self.list_widget.files else None
+        local_files = [p for p in self.list_widget.files if not is_host_path(p)]
+        common_path = os.path.commonpath(local_files) if local_files else None
 
         folder = QFileDialog.getExistingDirectory(
             self, "Select Root Directory", common_path or ""
@@ -405,14 +542,38 @@ class ConcatenatorTab(QWidget):
         self._record_change()
 
     def concatenate_files_wrapper(self):
-        prefix = self.prefix_input.text()
-        suffix = self.suffix_input.text()
-        concatenate_files(
-            self.list_widget.files,
+        self._concatenate(show_success_message=self.ctx.settings.show_success_message)
+
+    def _concatenate(self, show_success_message: bool, notify=None) -> None:
+        if self._concat_report is not None:
+            # One copy at a time; the latest request runs when it is done
+            self._concat_queued = (show_success_message, notify)
+            return
+        job = partial(
+            build_concatenation,
+            list(self.list_widget.files),
             self.root_path,
-            prefix,
-            suffix,
-            show_success_message=self.ctx.settings.show_success_message,
+            self.prefix_input.text(),
+            self.suffix_input.text(),
             interpret_escape_sequences=self.ctx.settings.interpret_escape_sequences,
             ssh_manager=self.ctx.ssh.manager,
+            content_cache=self._content_cache,
+            remote_bulk_fetch=getattr(self.ctx.settings, "remote_bulk_fetch", False),
+            remote_cache=getattr(self.ctx, "remote_cache", None),
+            ssh_hosts=getattr(self.ctx, "ssh_hosts", None),
         )
+        self._concat_report = (show_success_message, notify)
+        self.concat_button.setEnabled(False)
+        self._concat_pool.start(_ConcatTask(job, self._concatDone))
+
+    def _on_concatenated(self, result: Concatenation) -> None:
+        report, self._concat_report = self._concat_report, None
+        self.concat_button.setEnabled(True)
+        if report is not None:
+            present_concatenation(result, *report)
+        queued, self._concat_queued = self._concat_queued, None
+        if queued is not None:
+            self._concatenate(*queued)
+
+    def wait_for_concatenation(self, msecs: int = -1) -> bool:
+        return self._concat_pool.waitForDone(msecs)
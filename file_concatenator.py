@@ -1,33 +1,275 @@
 import os
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
 import chardet
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from PyQt5.QtGui import QClipboard
+from remote_paths import remote_target, split_host_path
 from utils import safe_relpath
 
 
-def concatenate_files(
+# Fewer remote files than this are not worth an archive stream
+BULK_FETCH_MIN_FILES = 4
+DEFAULT_CONTENT_CACHE_MB = 64
+# Remote files are fetched and decoded this many at a time, so only one
+# batch of raw bytes is held next to the text built so far
+PREFETCH_BATCH_FILES = 256
+
+
+def prefetch_remote_files(
+    file_paths,
+    ssh_manager,
+    bulk_fetch: bool = False,
+    remote_cache=None,
+    ssh_hosts=None,
+    content_cache=None,
+    signatures: Optional[dict] = None,
+) -> dict[str, bytes]:
+    """
+    Fetch the remote files among ``file_paths`` ahead of the concatenation.
+
+    Files are grouped by the host that serves them (see
+    :func:`remote_paths.remote_target`) and the hosts are fetched from in
+    parallel. Files that are still missing afterwards are read (and their
+    errors reported) one by one. Files stat'ed for the ``remote_cache``
+    get their ``(mtime, size)`` in ``signatures``, and those whose text
+    ``content_cache`` holds for that signature are not fetched at all.
+    """
+    groups: dict = {}
+    for path in dict.fromkeys(file_paths):
+        target = remote_target(path, ssh_manager, ssh_hosts)
+        if target is not None:
+            groups.setdefault(target[0], {})[target[1]] = path
+    if not groups:
+        return {}
+
+    def fetch(item):
+        manager, paths = item
+
+        def is_cached(remote: str, info) -> bool:
+            signature = (info.mtime, info.size)
+            if signatures is not None:
+                signatures[paths[remote]] = signature
+            return content_cache is not None and content_cache.lookup(paths[remote], signature) is not None
+
+        found = _prefetch_from_host(list(paths), manager, bulk_fetch, remote_cache, is_cached)
+        return {paths[remote]: data for remote, data in found.items()}
+
+    if len(groups) == 1:
+        return fetch(next(iter(groups.items())))
+    fetched: dict[str, bytes] = {}
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        for found in executor.map(fetch, groups.items()):
+            fetched.update(found)
+    return fetched
+
+
+def _prefetch_from_host(remote, ssh_manager, bulk_fetch: bool, remote_cache, is_cached=None) -> dict[str, bytes]:
+    """
+    Fetch ``remote`` paths from one host.
+
+    With a ``remote_cache`` the files are stat'ed in one batch first;
+    files ``is_cached(path, info)`` accepts are skipped and unchanged ones
+    come from disk. The others arrive as one archive stream when
+    ``bulk_fetch`` is set, and whatever that did not deliver is read
+    concurrently over pooled SFTP sessions.
+    """
+    fetched: dict[str, bytes] = {}
+    stats = None
+    if remote_cache is not None and remote_cache.enabled:
+        host = ssh_manager.host or ""
+        try:
+            stats = {info.path: info for info in ssh_manager.stat_many(remote) if info.is_file}
+        except Exception:  # uncached reads report real errors
+            stats = None
+        if stats is not None:
+            # Missing files are left to the per-file reads to report
+            remote = [p for p in remote if p in stats and not (is_cached and is_cached(p, stats[p]))]
+            for path in remote:
+                data = remote_cache.get(host, path, stats[path].size, stats[path].mtime)
+                if data is not None:
+                    fetched[path] = data
+    rest = [p for p in remote if p not in fetched]
+    downloaded: dict[str, bytes] = {}
+    if bulk_fetch and len(rest) >= BULK_FETCH_MIN_FILES:
+        try:
+            downloaded = ssh_manager.fetch_archive(rest)
+        except Exception:  # the fallback reads report real errors
+            downloaded = {}
+    rest = [p for p in rest if p not in downloaded]
+    if rest:
+        downloaded.update(ssh_manager.read_many(rest))
+    if stats:
+        for path, data in downloaded.items():
+            remote_cache.put(host, path, stats[path].size, stats[path].mtime, data)
+        remote_cache.flush()
+    fetched.update(downloaded)
+    return fetched
+
+
+def decode_bytes(raw_data: bytes) -> str:
+    """Decode file contents as UTF-8, falling back to chardet's best guess."""
+    try:
+        return raw_data.decode("utf-8")
+    except UnicodeDecodeError:
+        result = chardet.detect(raw_data)
+        encoding = result["encoding"]
+        if encoding:
+            return raw_data.decode(encoding)
+        raise UnicodeDecodeError("Unknown encoding", b"", 0, 0, "Unknown")
+
+
+def read_file_text(filepath: str, ssh_manager=None, ssh_hosts=None) -> str:
+    target = remote_target(filepath, ssh_manager, ssh_hosts)
+    if target is not None:
+        manager, remote_path = target
+        raw_data = manager.read_bytes(remote_path)
+    else:
+        with open(filepath, "rb") as file:
+            raw_data = file.read()
+    return decode_bytes(raw_data)
+
+
+class ContentCache:
+    """
+    Decoded file contents reused between concatenations.
+
+    Local entries are validated against the file's mtime and size, so only
+    files that changed since the last run are read again. Remote files are
+    kept only when the prefetch stat'ed them (see
+    :func:`prefetch_remote_files`); :meth:`read` always fetches them.
+
+    The least recently used entries are dropped once the cached text
+    exceeds ``max_bytes`` (counted in characters). Reads may run on a
+    worker thread while the GUI thread prunes the cache.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CONTENT_CACHE_MB * 1024 * 1024):
+        self._max_bytes = max(0, max_bytes)
+        self._entries: dict[str, tuple[tuple, str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def read(self, filepath: str, ssh_manager=None, ssh_hosts=None) -> str:
+        if remote_target(filepath, ssh_manager, ssh_hosts) is not None:
+            return read_file_text(filepath, ssh_manager, ssh_hosts)
+        st = os.stat(filepath)
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = self.lookup(filepath, signature)
+        if cached is not None:
+            return cached
+        content = read_file_text(filepath)
+        self.store(filepath, signature, content)
+        return content
+
+    def lookup(self, filepath: str, signature: tuple) -> Optional[str]:
+        """Text stored for ``filepath`` under ``signature``, else None."""
+        with self._lock:
+            cached = self._entries.get(filepath)
+            if cached is None or cached[0] != signature:
+                return None
+            self._entries[filepath] = self._entries.pop(filepath)  # most recently used goes last
+            return cached[1]
+
+    def store(self, filepath: str, signature: tuple, content: str) -> None:
+        with self._lock:
+            self._discard(filepath)
+            if len(content) > self._max_bytes:
+                return
+            self._entries[filepath] = (signature, content)
+            self._bytes += len(content)
+            while self._bytes > self._max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def invalidate(self, paths) -> None:
+        with self._lock:
+            for path in paths:
+                self._discard(path)
+
+    def retain(self, paths) -> None:
+        """Drop entries for files that are no longer of interest."""
+        if not self._entries:
+            return
+        keep = set(paths)
+        with self._lock:
+            for path in [p for p in self._entries if p not in keep]:
+                self._discard(path)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def __contains__(self, filepath: str) -> bool:
+        return filepath in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _display_path(filepath: str, root_path) -> tuple[str, Optional[str]]:
+    """``$filepath`` of a file; host-qualified files keep their host unless under a root on it."""
+    qualified = split_host_path(filepath)
+    if qualified is None or not root_path:
+        return safe_relpath(filepath, root_path)
+    root = split_host_path(root_path)
+    if root is not None and root[0] == qualified[0]:
+        return posixpath.relpath(qualified[1], root[1]), None
+    return filepath, None
+
+
+def _missing_files_message(missing: list[str]) -> str:
+    return "The following files no longer exist and were skipped:\n" + "\n".join(missing)
+
+
+def _alert(notify, box, title: str, text: str) -> None:
+    """Pass a message to ``notify`` when given, else show it in a message box."""
+    if notify is not None:
+        notify(title, text)
+    else:
+        box(None, title, text)
+
+
+@dataclass
+class Concatenation:
+    """Outcome of :func:`build_concatenation`; ``error`` means nothing is copied."""
+
+    text: str = ""
+    warnings: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    error_title: str = ""
+    error: str = ""
+    critical: bool = False
+
+
+def build_concatenation(
     file_paths,
     root_path=None,
     prefix='<file filename="$filepath">',
     suffix='</file>',
-    show_success_message=True,
     interpret_escape_sequences=True,
     ssh_manager=None,
-):
+    content_cache: Optional[ContentCache] = None,
+    remote_bulk_fetch: bool = False,
+    remote_cache=None,
+    ssh_hosts=None,
+) -> Concatenation:
     """
-    Concatenates the contents of the given files, wrapping each in custom tags.
-    Copies the final result to the clipboard.
-
-    :param file_paths: List of absolute file paths.
-    :param root_path: Optional root path to calculate relative file paths.
-    :param prefix: String prefix for each file's content. Use $filepath as a placeholder.
-    :param suffix: String suffix for each file's content.
-    :param show_success_message: If True, show a pop-up after copying.
-    :param interpret_escape_sequences: If True, convert literal escape sequences (e.g. "\n") into actual characters.
+    Read and wrap the files without touching the GUI, so it can run on a
+    worker thread. Remote files are fetched ``PREFETCH_BATCH_FILES`` at a
+    time. The parameters are those of :func:`concatenate_files`.
     """
+    file_paths = list(file_paths)
     if not file_paths:
-        QMessageBox.warning(None, "No Files", "No files to concatenate.")
-        return
+        return Concatenation(error_title="No Files", error="No files to concatenate.")
 
     # Process escape sequences if enabled
     if interpret_escape_sequences:
@@ -35,47 +277,119 @@ def concatenate_files(
             prefix = prefix.encode('latin-1', 'backslashreplace').decode('unicode_escape')
             suffix = suffix.encode('latin-1', 'backslashreplace').decode('unicode_escape')
         except Exception as e:
-            QMessageBox.critical(None, "Error", f"Failed to process escape sequences:\n{str(e)}")
-            return
-
-    concatenated_text = ""
-    warnings: list[str] = []
+            return Concatenation(
+                error_title="Error", error=f"Failed to process escape sequences:\n{str(e)}", critical=True
+            )
 
-    for filepath in file_paths:
-        filepath_string, warn_msg = safe_relpath(filepath, root_path)
-        if warn_msg:
-            warnings.append(warn_msg)
+    result = Concatenation()
+    pieces: list[str] = []
+    for start in range(0, len(file_paths), PREFETCH_BATCH_FILES):
+        batch = file_paths[start:start + PREFETCH_BATCH_FILES]
+        signatures: dict = {}
+        prefetched = prefetch_remote_files(
+            batch, ssh_manager, remote_bulk_fetch, remote_cache, ssh_hosts, content_cache, signatures
+        )
+        for filepath in batch:
+            filepath_string, warn_msg = _display_path(filepath, root_path)
+            if warn_msg:
+                result.warnings.append(warn_msg)
 
-        file_prefix = prefix.replace("$filepath", filepath_string)
+            file_prefix = prefix.replace("$filepath", filepath_string)
 
-        try:
-            if ssh_manager and ssh_manager.is_connected() and filepath.startswith("/"):
-                raw_data = ssh_manager.read_bytes(filepath)
-            else:
-                with open(filepath, "rb") as file:
-                    raw_data = file.read()
             try:
-                content = raw_data.decode("utf-8")
-            except UnicodeDecodeError:
-                result = chardet.detect(raw_data)
-                encoding = result["encoding"]
-                if encoding:
-                    content = raw_data.decode(encoding)
+                raw_data = prefetched.pop(filepath, None)
+                signature = signatures.get(filepath)
+                if raw_data is not None:
+                    content = decode_bytes(raw_data)
+                    if content_cache is not None and signature is not None:
+                        content_cache.store(filepath, signature, content)
+                elif content_cache is not None:
+                    content = None if signature is None else content_cache.lookup(filepath, signature)
+                    if content is None:
+                        content = content_cache.read(filepath, ssh_manager, ssh_hosts)
                 else:
-                    raise UnicodeDecodeError("Unknown encoding", b"", 0, 0, "Unknown")
-        except Exception as e:
-            QMessageBox.critical(None, "Error", f"Failed to read {filepath}.\n{str(e)}")
-            return
+                    content = read_file_text(filepath, ssh_manager, ssh_hosts)
+            except FileNotFoundError:
+                # Files deleted or renamed since they were added are skipped.
+                result.missing.append(filepath)
+                continue
+            except Exception as e:
+                return Concatenation(error_title="Error", error=f"Failed to read {filepath}.\n{str(e)}", critical=True)
+
+            # Wrap content with custom prefix and suffix
+            pieces.append(f"{file_prefix}\n{content}\n{suffix}\n")
 
-        # Wrap content with custom prefix and suffix
-        concatenated_text += f"{file_prefix}\n{content}\n{suffix}\n"
+    if result.missing and len(result.missing) == len(file_paths):
+        return Concatenation(error_title="Files Not Found", error=_missing_files_message(result.missing))
+    result.text = "".join(pieces)
+    return result
+
+
+def present_concatenation(result: Concatenation, show_success_message=True, notify=None) -> None:
+    """Copy a built concatenation to the clipboard and report how it went; GUI thread only."""
+    if result.error:
+        box = QMessageBox.critical if result.critical else QMessageBox.warning
+        _alert(notify, box, result.error_title, result.error)
+        return
 
     # Copy to clipboard
     clipboard: QClipboard = QApplication.clipboard()
-    clipboard.setText(concatenated_text)
+    clipboard.setText(result.text)
 
-    if warnings:
-        QMessageBox.warning(None, "Path Error", "\n".join(sorted(set(warnings))))
+    if result.warnings:
+        _alert(notify, QMessageBox.warning, "Path Error", "\n".join(sorted(set(result.warnings))))
 
-    if show_success_message:
+    if result.missing:
+        _alert(notify, QMessageBox.warning, "Files Not Found", _missing_files_message(result.missing))
+
+    if notify is not None:
+        if not result.warnings and not result.missing:
+            notify("Success", "Concatenated text copied to clipboard.")
+    elif show_success_message:
         QMessageBox.information(None, "Success", "Concatenated text copied to clipboard.")
+
+
+def concatenate_files(
+    file_paths,
+    root_path=None,
+    prefix='<file filename="$filepath">',
+    suffix='</file>',
+    show_success_message=True,
+    interpret_escape_sequences=True,
+    ssh_manager=None,
+    content_cache: Optional[ContentCache] = None,
+    remote_bulk_fetch: bool = False,
+    remote_cache=None,
+    ssh_hosts=None,
+    notify: Optional[Callable[[str, str], None]] = None,
+):
+    """
+    Concatenates the contents of the given files, wrapping each in custom tags.
+    Copies the final result to the clipboard.
+
+    :param file_paths: List of absolute file paths.
+    :param root_path: Optional root path to calculate relative file paths.
+    :param prefix: String prefix for each file's content. Use $filepath as a placeholder.
+    :param suffix: String suffix for each file's content.
+    :param show_success_message: If True, show a pop-up after copying.
+    :param interpret_escape_sequences: If True, convert literal escape sequences (e.g. "\n") into actual characters.
+    :param content_cache: Optional ContentCache; unchanged files are taken from it instead of being read again.
+    :param remote_bulk_fetch: If True, fetch remote files with one archive stream before falling back to SFTP.
+    :param remote_cache: Optional RemoteContentCache; unchanged remote files are taken from it.
+    :param ssh_hosts: Optional SSHHostRegistry; routes host-qualified paths such as "build1:/srv/a.py".
+    :param notify: Optional callable taking (title, text); receives warnings, errors and the success
+        message instead of message boxes, for copies nobody explicitly asked for.
+    """
+    result = build_concatenation(
+        file_paths,
+        root_path,
+        prefix,
+        suffix,
+        interpret_escape_sequences=interpret_escape_sequences,
+        ssh_manager=ssh_manager,
+        content_cache=content_cache,
+        remote_bulk_fetch=remote_bulk_fetch,
+        remote_cache=remote_cache,
+        ssh_hosts=ssh_hosts,
+    )
+    present_concatenation(result, show_success_message, notify)
@@ -0,0 +1,385 @@
+"""Incremental fuzzy filtering of the workspace list."""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterable, Optional
+
+from PyQt5.QtCore import QAbstractProxyModel, QModelIndex, QPersistentModelIndex, Qt
+
+
+def compile_query(text: str) -> Optional[Callable[[str], object]]:
+    """
+    Return a matcher for a lowercase ``text``, or None for an empty query.
+
+    Every whitespace separated term has to occur in the candidate with its
+    characters in order, though not necessarily adjacent, so ``flw`` finds
+    ``file_list_widget.py`` and a plain substring always matches.
+    """
+    terms = text.split()
+    if not terms:
+        return None
+    pattern = "".join(
+        "(?=.*?" + ".*?".join(re.escape(ch) for ch in term) + ")" for term in terms
+    )
+    return re.compile(pattern, re.DOTALL).match
+
+
+class MatchedRows:
+    """
+    Sorted source rows of the accepted entries, split into blocks.
+
+    Each block stores its rows relative to a block offset, so shifting every
+    row after an edit point touches one block's items and the offsets of the
+    following blocks instead of every accepted row.
+    """
+
+    BLOCK_SIZE = 512
+
+    def __init__(self, rows: Iterable[int] = ()):
+        self._load(list(rows))
+
+    def _load(self, rows: list[int]) -> None:
+        size = self.BLOCK_SIZE
+        self._blocks: list[list[int]] = [rows[i:i + size] for i in range(0, len(rows), size)]
+        self._offsets: list[int] = [0] * len(self._blocks)
+        self._reindex()
+
+    def _reindex(self) -> None:
+        """Recompute per-block start positions and first source rows."""
+        self._starts: list[int] = []
+        self._firsts: list[int] = []
+        total = 0
+        for block, offset in zip(self._blocks, self._offsets):
+            self._starts.append(total)
+            self._firsts.append(block[0] + offset)
+            total += len(block)
+        self._length = total
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        for block, offset in zip(self._blocks, self._offsets):
+            for row in block:
+                yield row + offset
+
+    def _locate(self, position: int) -> tuple[int, int]:
+        """Block number and index inside it of proxy ``position``."""
+        b = bisect_right(self._starts, position) - 1
+        return b, position - self._starts[b]
+
+    def __getitem__(self, position: int) -> int:
+        if not 0 <= position < self._length:
+            raise IndexError(position)
+        b, i = self._locate(position)
+        return self._blocks[b][i] + self._offsets[b]
+
+    def position(self, source_row: int) -> int:
+        """Number of accepted rows before ``source_row`` (``bisect_left``)."""
+        b = bisect_right(self._firsts, source_row) - 1
+        if b < 0:
+            return 0
+        return self._starts[b] + bisect_left(self._blocks[b], source_row - self._offsets[b])
+
+    def index_of(self, source_row: int) -> int:
+        """Proxy row of ``source_row``, or -1 when it is not accepted."""
+        position = self.position(source_row)
+        if position < self._length and self[position] == source_row:
+            return position
+        return -1
+
+    def shift(self, position: int, delta: int) -> None:
+        """Add ``delta`` to the rows at ``position`` and after."""
+        if position >= self._length:
+            return
+        b, i = self._locate(position)
+        block, offset = self._blocks[b], self._offsets[b]
+        if i:
+            block[i:] = [row + delta for row in block[i:]]
+        else:
+            self._offsets[b] = offset + delta
+        for later in range(b + 1, len(self._offsets)):
+            self._offsets[later] += delta
+        self._firsts[b:] = [blk[0] + off for blk, off in zip(self._blocks[b:], self._offsets[b:])]
+
+    def insert(self, position: int, rows: list[int]) -> None:
+        """Insert sorted ``rows`` so that the first lands at ``position``."""
+        if not rows:
+            return
+        if not self._blocks:
+            self._load(rows)
+            return
+        if position >= self._length:
+            b, i = len(self._blocks) - 1, len(self._blocks[-1])
+        else:
+            b, i = self._locate(position)
+        offset = self._offsets[b]
+        block = self._blocks[b]
+        block[i:i] = [row - offset for row in rows]
+        if len(block) > 2 * self.BLOCK_SIZE:
+            size = self.BLOCK_SIZE
+            pieces = [block[j:j + size] for j in range(0, len(block), size)]
+            self._blocks[b:b + 1] = pieces
+            self._offsets[b:b + 1] = [offset] * len(pieces)
+        self._reindex()
+
+    def delete(self, lo: int, hi: int) -> None:
+        """Drop the accepted rows at positions ``[lo, hi)``."""
+        if lo >= hi:
+            return
+        b_lo, i_lo = self._locate(lo)
+        b_hi, i_hi = self._locate(hi - 1)
+        if b_lo == b_hi:
+            del self._blocks[b_lo][i_lo:i_hi + 1]
+        else:
+            del self._blocks[b_lo][i_lo:]
+            del self._blocks[b_hi][:i_hi + 1]
+            del self._blocks[b_lo + 1:b_hi]
+            del self._offsets[b_lo + 1:b_hi]
+        keep = [n for n, block in enumerate(self._blocks) if block]
+        if len(keep) != len(self._blocks):
+            self._blocks = [self._blocks[n] for n in keep]
+            self._offsets = [self._offsets[n] for n in keep]
+        self._reindex()
+
+
+class FileFilterProxyModel(QAbstractProxyModel):
+    """
+    Shows the rows of a :class:`~file_list_model.FileListModel` whose
+    display path matches a query.
+
+    Accepted rows are kept as sorted source rows in a :class:`MatchedRows`,
+    so mapping is a lookup, no per-row callback runs through Python when the
+    query changes and a source edit does not renumber every accepted row. Display paths are lowercased once into an index that follows
+    inserts and removals, and a query that extends the previous one only
+    rescans the rows that matched before.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._query = ""
+        self._rows: Optional[MatchedRows] = None  # None: every source row
+        self._haystack: Optional[list[str]] = None
+        self._layout_sources: list[tuple[QModelIndex, QPersistentModelIndex]] = []
+
+    # ---- query ----
+    def is_filtering(self) -> bool:
+        return self._rows is not None
+
+    def filter_text(self) -> str:
+        return self._query
+
+    def set_filter_text(self, text: str) -> None:
+        query = " ".join(text.lower().split())
+        if query == self._query:
+            return
+        previous, self._query = self._query, query
+        narrowing = self._rows is not None and previous and query.startswith(previous)
+        self.beginResetModel()
+        self._rows = self._match(self._rows if narrowing else None)
+        self.endResetModel()
+
+    def _index_text(self) -> list[str]:
+        if self._haystack is None:
+            source = self.sourceModel()
+            self._haystack = [source.display_text(p).lower() for p in source.files]
+        return self._haystack
+
+    def _match(self, candidates) -> Optional[MatchedRows]:
+        matcher = compile_query(self._query)
+        if matcher is None:
+            return None
+        return MatchedRows(self._matching(matcher, candidates))
+
+    def _matching(self, matcher, rows=None) -> list[int]:
+        haystack = self._index_text()
+        if rows is None:
+            rows = range(len(haystack))
+        return [row for row in rows if matcher(haystack[row])]
+
+    def _span(self, first: int, last: int) -> tuple[int, int]:
+        """Proxy rows ``[lo, hi)`` whose source rows lie in ``first..last``."""
+        return self._rows.position(first), self._rows.position(last + 1)
+
+    def _refilter(self) -> None:
+        self.beginResetModel()
+        self._rows = self._match(None)
+        self.endResetModel()
+
+    # ---- QAbstractProxyModel ----
+    def setSourceModel(self, source) -> None:
+        self.beginResetModel()
+        super().setSourceModel(source)
+        self._haystack = None
+        self._rows = self._match(None)
+        source.rowsAboutToBeInserted.connect(self._on_rows_about_to_be_inserted)
+        source.rowsInserted.connect(self._on_rows_inserted)
+        source.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        source.rowsRemoved.connect(self._on_rows_removed)
+        source.rowsAboutToBeMoved.connect(self._on_rows_about_to_be_moved)
+        source.rowsMoved.connect(self._on_rows_moved)
+        source.modelAboutToBeReset.connect(self._on_model_about_to_be_reset)
+        source.modelReset.connect(self._on_model_reset)
+        source.layoutAboutToBeChanged.connect(self._on_layout_about_to_be_changed)
+        source.layoutChanged.connect(self._on_layout_changed)
+        source.dataChanged.connect(self._on_data_changed)
+        self.endResetModel()
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < self.rowCount() or not 0 <= column < self.columnCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        if self._rows is None:
+            return self.sourceModel().rowCount()
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def hasChildren(self, parent=QModelIndex()):
+        return not parent.isValid() and self.rowCount() > 0
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        return self.sourceModel().headerData(section, orientation, role)
+
+    def source_row(self, row: int) -> int:
+        return row if self._rows is None else self._rows[row]
+
+    def mapToSource(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self.source_row(index.row()), index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self._rows is not None:
+            row = self._rows.index_of(row)
+        return self.index(row, source_index.column())
+
+    # ---- drag and drop (reordering is only offered while unfiltered) ----
+    def mimeTypes(self):
+        return self.sourceModel().mimeTypes()
+
+    def supportedDropActions(self):
+        return self.sourceModel().supportedDropActions()
+
+    def mimeData(self, indexes):
+        return self.sourceModel().mimeData([self.mapToSource(i) for i in indexes])
+
+    def canDropMimeData(self, data, action, row, column, parent):
+        return self._rows is None and self.sourceModel().canDropMimeData(
+            data, action, row, column, self.mapToSource(parent)
+        )
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if self._rows is not None:
+            return False
+        return self.sourceModel().dropMimeData(data, action, row, column, self.mapToSource(parent))
+
+    # ---- source notifications ----
+    def _on_rows_about_to_be_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _on_rows_inserted(self, parent, first, last):
+        count = last - first + 1
+        if self._haystack is not None:
+            source = self.sourceModel()
+            self._haystack[first:first] = [
+                source.display_text(p).lower() for p in source.files[first:last + 1]
+            ]
+        if self._rows is None:
+            self.endInsertRows()
+            return
+        position = self._rows.position(first)
+        matches = self._matching(compile_query(self._query), range(first, last + 1))
+        self._rows.shift(position, count)
+        if matches:
+            self.beginInsertRows(QModelIndex(), position, position + len(matches) - 1)
+            self._rows.insert(position, matches)
+            self.endInsertRows()
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            return
+        lo, hi = self._span(first, last)
+        if lo < hi:
+            self.beginRemoveRows(QModelIndex(), lo, hi - 1)
+
+    def _on_rows_removed(self, parent, first, last):
+        count = last - first + 1
+        if self._haystack is not None:
+            del self._haystack[first:last + 1]
+        if self._rows is None:
+            self.endRemoveRows()
+            return
+        lo, hi = self._span(first, last)
+        self._rows.delete(lo, hi)
+        self._rows.shift(lo, -count)
+        if lo < hi:
+            self.endRemoveRows()
+
+    def _on_rows_about_to_be_moved(self, parent, first, last, destination, row):
+        if self._rows is None:
+            self.beginMoveRows(QModelIndex(), first, last, QModelIndex(), row)
+
+    def _on_rows_moved(self, parent, first, last, destination, row):
+        self._haystack = None
+        if self._rows is None:
+            self.endMoveRows()
+        else:
+            self._refilter()
+
+    def _on_model_about_to_be_reset(self):
+        self.beginResetModel()
+
+    def _on_model_reset(self):
+        self._haystack = None
+        self._rows = self._match(None)
+        self.endResetModel()
+
+    def _on_layout_about_to_be_changed(self, *args):
+        self.layoutAboutToBeChanged.emit()
+        self._layout_sources = [
+            (index, QPersistentModelIndex(self.mapToSource(index)))
+            for index in self.persistentIndexList()
+        ]
+
+    def _on_layout_changed(self, *args):
+        self._haystack = None
+        self._rows = self._match(None)
+        stored, self._layout_sources = self._layout_sources, []
+        self.changePersistentIndexList(
+            [proxy for proxy, _source in stored],
+            [self.mapFromSource(QModelIndex(source)) for _proxy, source in stored],
+        )
+        self.layoutChanged.emit()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        if top_left.column() == 0 and (not roles or Qt.DisplayRole in roles):
+            # Display paths changed (new root): the text index is stale.
+            self._haystack = None
+            if self._rows is not None:
+                self._refilter()
+                return
+        if self._rows is None:
+            lo, hi = top_left.row(), bottom_right.row() + 1
+        else:
+            lo, hi = self._span(top_left.row(), bottom_right.row())
+        if lo < hi:
+            self.dataChanged.emit(
+                self.index(lo, top_left.column()), self.index(hi - 1, bottom_right.column()), roles
+            )
@@ -0,0 +1,315 @@
+import os
+from typing import Iterable, Optional
+
+from PyQt5.QtCore import (
+    QAbstractTableModel,
+    QByteArray,
+    QMimeData,
+    QModelIndex,
+    Qt,
+    pyqtSignal,
+)
+
+from file_metadata import FileMetadata, format_size
+from remote_paths import is_host_path
+from utils import safe_relpath
+
+ROWS_MIME_TYPE = "application/x-code2clip-rows"
+
+COLUMN_PATH, COLUMN_SIZE, COLUMN_LINES, COLUMN_TOKENS, COLUMN_ENCODING = range(5)
+COLUMN_TITLES = ("Path", "Size", "Lines", "Tokens", "Encoding")
+# Setting names of the optional columns, in display order
+METADATA_COLUMNS = {
+    "size": COLUMN_SIZE,
+    "lines": COLUMN_LINES,
+    "tokens": COLUMN_TOKENS,
+    "encoding": COLUMN_ENCODING,
+}
+
+
+def _metadata_value(metadata: FileMetadata, column: int):
+    if column == COLUMN_SIZE:
+        return metadata.size
+    if column == COLUMN_LINES:
+        return metadata.lines
+    if column == COLUMN_TOKENS:
+        return metadata.tokens
+    return metadata.encoding
+
+
+class FileListModel(QAbstractTableModel):
+    """
+    Workspace paths exposed to a view without per-row widget items.
+
+    The model owns the ordered list of paths. Rows are inserted, removed
+    and moved with the matching begin/end notifications, so views only
+    repaint what changed. Display strings are computed in ``data()`` for
+    the rows that are actually shown and memoised until the root changes.
+    Metadata columns read the shared metadata service's cache and have it
+    revalidate painted rows on its workers; new values are filled in when
+    the service reports them. Removed paths are dropped from the service.
+    """
+
+    rowsReordered = pyqtSignal()
+    pathWarning = pyqtSignal(str)
+    metadataCached = pyqtSignal(str)  # path whose metadata became known while painting
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.files: list[str] = []
+        self.root_path: Optional[str] = None
+        self._root_prefix: Optional[str] = None
+        self._display_cache: dict[str, str] = {}
+        self._warned: set[str] = set()
+        self._metadata_service = None
+        self._metadata: dict[str, FileMetadata] = {}
+
+    def set_metadata_service(self, service) -> None:
+        self._metadata_service = service
+        self._metadata.clear()
+
+    # ---- read access ----
+    def index(self, row, column=COLUMN_PATH, parent=QModelIndex()):
+        return super().index(row, column, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.files)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(COLUMN_TITLES)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(COLUMN_TITLES):
+            return COLUMN_TITLES[section]
+        return None
+
+    @property
+    def root_prefix(self) -> Optional[str]:
+        """The root path with a trailing separator, when the root is absolute."""
+        return self._root_prefix
+
+    def display_text(self, filepath: str) -> str:
+        cached = self._display_cache.get(filepath)
+        if cached is None and self._root_prefix and filepath.startswith(self._root_prefix):
+            # Entries are normalized, so under the root this equals relpath()
+            # without its two abspath() calls per row.
+            cached = self._display_cache[filepath] = filepath[len(self._root_prefix):]
+        if cached is None:
+            cached, warn_msg = safe_relpath(filepath, self.root_path)
+            if warn_msg:
+                cached = f"{cached} [abs]"
+                if warn_msg not in self._warned:
+                    self._warned.add(warn_msg)
+                    self.pathWarning.emit(warn_msg)
+            self._display_cache[filepath] = cached
+        return cached
+
+    def metadata_for(self, filepath: str, request: bool = True) -> Optional[FileMetadata]:
+        """Known metadata of ``filepath``; never touches the filesystem here."""
+        metadata = self._metadata.get(filepath)
+        if metadata is None and self._metadata_service is not None:
+            metadata = self._metadata_service.cached(filepath)
+            if metadata is not None:
+                self._metadata[filepath] = metadata
+                self.metadataCached.emit(filepath)
+            if request:
+                # A cached value may be stale; the worker checks and reports changes
+                self._metadata_service.request([filepath])
+        return metadata
+
+    def cached_metadata(self, filepath: str) -> Optional[FileMetadata]:
+        """Metadata already held for ``filepath``; never stats or requests anything."""
+        return self._metadata.get(filepath)
+
+    def update_metadata(self, row: int, metadata: FileMetadata) -> None:
+        """Store fresh ``metadata`` for ``row`` and repaint its metadata cells."""
+        if not 0 <= row < len(self.files) or self.files[row] != metadata.path:
+            return
+        self._metadata[metadata.path] = metadata
+        self.dataChanged.emit(
+            self.index(row, COLUMN_SIZE), self.index(row, COLUMN_ENCODING), [Qt.DisplayRole]
+        )
+
+    def _metadata_text(self, filepath: str, column: int) -> str:
+        metadata = self.metadata_for(filepath)
+        if metadata is None or metadata.error:
+            return ""
+        value = _metadata_value(metadata, column)
+        if value is None:
+            return ""
+        if column == COLUMN_SIZE:
+            return format_size(value)
+        if column == COLUMN_ENCODING:
+            return str(value)
+        return f"{value:,}"
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.files):
+            return None
+        filepath = self.files[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == COLUMN_PATH:
+                return self.display_text(filepath)
+            return self._metadata_text(filepath, column)
+        if role in (Qt.UserRole, Qt.ToolTipRole):
+            return filepath
+        if role == Qt.TextAlignmentRole and column in (COLUMN_SIZE, COLUMN_LINES, COLUMN_TOKENS):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    # ---- mutation with notifications ----
+    def set_files(self, files: Iterable[str]) -> None:
+        files = list(files)
+        if self._metadata_service is not None and self.files:
+            kept = set(files)
+            self._metadata_service.invalidate(p for p in self.files if p not in kept)
+        self.beginResetModel()
+        self.files = files
+        self._display_cache.clear()
+        self._metadata.clear()
+        self.endResetModel()
+
+    def append_rows(self, paths: list[str]) -> None:
+        self.insert_rows(len(self.files), paths)
+
+    def insert_rows(self, row: int, paths: list[str]) -> None:
+        if not paths:
+            return
+        self.beginInsertRows(QModelIndex(), row, row + len(paths) - 1)
+        self.files[row:row] = paths
+        self.endInsertRows()
+
+    def remove_rows(self, rows: Iterable[int]) -> None:
+        """Remove ``rows``, notifying once per contiguous range."""
+        ordered = sorted(set(rows), reverse=True)
+        i = 0
+        while i < len(ordered):
+            last = first = ordered[i]
+            i += 1
+            while i < len(ordered) and ordered[i] == first - 1:
+                first = ordered[i]
+                i += 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for filepath in self.files[first:last + 1]:
+                self._display_cache.pop(filepath, None)
+                self._metadata.pop(filepath, None)
+            if self._metadata_service is not None:
+                self._metadata_service.invalidate(self.files[first:last + 1])
+            del self.files[first:last + 1]
+            self.endRemoveRows()
+
+    def move_row(self, source: int, target: int) -> bool:
+        """Move ``source`` so it lands before the row currently at ``target``."""
+        if not 0 <= source < len(self.files):
+            return False
+        target = max(0, min(target, len(self.files)))
+        if target in (source, source + 1):
+            return False
+        self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), target)
+        filepath = self.files.pop(source)
+        self.files.insert(target - 1 if target > source else target, filepath)
+        self.endMoveRows()
+        self.rowsReordered.emit()
+        return True
+
+    def set_root_path(self, root_path: Optional[str]) -> None:
+        self.root_path = root_path
+        self._root_prefix = None
+        if root_path and is_host_path(root_path):
+            self._root_prefix = root_path.rstrip("/") + "/"
+        elif root_path and os.path.isabs(root_path):
+            root = os.path.normpath(root_path)
+            self._root_prefix = root if root.endswith(os.sep) else root + os.sep
+        self._display_cache.clear()
+        self._warned.clear()
+        if self.files:
+            self.dataChanged.emit(
+                self.index(0), self.index(len(self.files) - 1), [Qt.DisplayRole]
+            )
+
+    def refresh(self) -> None:
+        """Drop memoised display strings and let views re-query everything."""
+        self.beginResetModel()
+        self._display_cache.clear()
+        self._metadata.clear()
+        self.endResetModel()
+
+    # ---- sorting ----
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Reorder the workspace itself by ``column``.
+
+        The order of the list is the order of the concatenated output, so
+        sorting is a real edit (reported through ``rowsReordered``) rather
+        than a view-only proxy. Only cached metadata is used: rows without
+        it keep their relative order at the end and are filled in as they
+        are painted.
+        """
+        if not 0 <= column < len(COLUMN_TITLES) or len(self.files) < 2:
+            return
+        descending = order == Qt.DescendingOrder
+        if column == COLUMN_PATH:
+            known = [(self.display_text(p).lower(), row) for row, p in enumerate(self.files)]
+            unknown: list[int] = []
+        else:
+            known, unknown = [], []
+            for row, filepath in enumerate(self.files):
+                metadata = self.metadata_for(filepath, request=False)
+                value = None if metadata is None or metadata.error else _metadata_value(metadata, column)
+                if value is None:
+                    unknown.append(row)
+                else:
+                    known.append((str(value).lower() if column == COLUMN_ENCODING else value, row))
+        known.sort(key=lambda item: item[0], reverse=descending)
+        self.reorder([row for _value, row in known] + unknown)
+
+    def reorder(self, new_order: list[int]) -> None:
+        """Rearrange the rows so that old row ``new_order[i]`` becomes row ``i``."""
+        if new_order == list(range(len(self.files))):
+            return
+        self.layoutAboutToBeChanged.emit()
+        new_row = {old: new for new, old in enumerate(new_order)}
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(new_row[i.row()], i.column()) for i in persistent],
+        )
+        self.files[:] = [self.files[row] for row in new_order]
+        self.layoutChanged.emit()
+        self.rowsReordered.emit()
+
+    # ---- internal drag and drop ----
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [ROWS_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        rows = sorted({index.row() for index in indexes if index.isValid()})
+        mime = QMimeData()
+        mime.setData(ROWS_MIME_TYPE, QByteArray(",".join(map(str, rows)).encode("ascii")))
+        return mime
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if action != Qt.MoveAction or not data.hasFormat(ROWS_MIME_TYPE):
+            return False
+        payload = bytes(data.data(ROWS_MIME_TYPE)).decode("ascii")
+        rows = [int(r) for r in payload.split(",") if r]
+        if len(rows) != 1:
+            return False
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self.files)
+        # The move happens here; removeRows is deliberately not implemented,
+        # so the view's post-drag cleanup leaves the list untouched.
+        return self.move_row(rows[0], row)
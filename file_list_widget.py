@@ -1,25 +1,34 @@
 import os
+import fnmatch
 import ntpath
 import posixpath
 from functools import partial
-from typing import Callable, Iterable, Optional
+from typing import Callable, Iterable, Optional, Sequence
 
-import chardet
 from PyQt5.QtWidgets import (
     QApplication,
     QFileDialog,
-    QListWidget,
-    QListWidgetItem,
+    QAbstractItemView,
+    QHeaderView,
+    QInputDialog,
     QMenu,
     QMessageBox,
+    QTableView,
 )
 from PyQt5.QtGui import QClipboard
-from PyQt5.QtCore import QDateTime, Qt
+from PyQt5.QtCore import QDateTime, Qt, QTimer
 
 from wsl_utilities import convert_wsl_path
-from utils import safe_relpath, list_files
-
-class FileListWidget(QListWidget):
+from file_filter_model import FileFilterProxyModel
+from file_list_model import COLUMN_PATH, COLUMN_TITLES, METADATA_COLUMNS, FileListModel
+from file_metadata import FileMetadata, compute_metadata
+from folder_sync import FolderSync
+from git_utils import list_changed_files, list_git_files
+from gitignore_filters import is_path_ignored
+from remote_paths import join_host_path, split_host_path
+from utils import list_files
+
+class FileListWidget(QTableView):
     def __init__(
         self,
         ctx=None,
@@ -28,13 +37,41 @@ class FileListWidget(QListWidget):
     ):
         super().__init__(parent)
         self.ctx = ctx
+        self._model = FileListModel(self)
+        self._model.rowsReordered.connect(self._on_rows_reordered)
+        self._model.pathWarning.connect(self._queue_path_warning)
+        # The view shows a filtering proxy; rows and edits live in _model
+        self._proxy = FileFilterProxyModel(self)
+        self._proxy.setSourceModel(self._model)
+        self.setModel(self._proxy)
+        # A table with fixed row heights: inserting or removing a row only
+        # shifts section offsets, where a tree view relays out every row
+        # through the model's Python index()/flags()
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        rows = self.verticalHeader()
+        rows.hide()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(self.fontMetrics().height() + 6)
+        header = self.horizontalHeader()
+        header.setStretchLastSection(False)
+        header.setSectionResizeMode(COLUMN_PATH, QHeaderView.Stretch)
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(False)
+        header.sectionClicked.connect(self._on_header_clicked)
+        header.setContextMenuPolicy(Qt.CustomContextMenu)
+        header.customContextMenuRequested.connect(self._show_column_menu)
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
         # Enable drag and drop reordering within the list
         self.setAcceptDrops(True)
         self.setDragEnabled(True)
         self.setDropIndicatorShown(True)
         self.setDefaultDropAction(Qt.MoveAction)
-        self.setSelectionMode(self.SingleSelection)
-        self.setDragDropMode(QListWidget.InternalMove)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setDragDropMode(QAbstractItemView.InternalMove)
+        self._path_warnings: list[str] = []
         self.files = []
         self.root_path = None
         self._change_callback = change_callback
@@ -42,6 +79,29 @@ class FileListWidget(QListWidget):
         self._redo_handler: Optional[Callable[[], None]] = None
         self._can_undo: Optional[Callable[[], bool]] = None
         self._can_redo: Optional[Callable[[], bool]] = None
+        self._folder_sync = FolderSync(
+            self._list_folder_for_sync,
+            self._accepts_synced_path,
+            parent=self,
+            walk_folder=partial(self._list_folder_for_sync, cached=False),
+        )
+        self._folder_sync.changed.connect(self._on_folder_sync_changed)
+        self._pending_inspections: dict[str, list[Callable[[FileMetadata], None]]] = {}
+        # Remote folder walks started here (walk id -> folder) and those that added files
+        self._remote_walks: dict[int, str] = {}
+        self._remote_walks_added: set[int] = set()
+        walker = getattr(ctx, "remote_walker", None)
+        if walker is not None:
+            walker.filesFound.connect(self._on_remote_files_found)
+            walker.finished.connect(self._on_remote_walk_finished)
+        metadata = getattr(ctx, "metadata", None)
+        if metadata is not None:
+            self._model.set_metadata_service(metadata)
+            metadata.metadataReady.connect(self._on_metadata_ready)
+        settings = getattr(ctx, "settings", None)
+        self.set_metadata_columns(getattr(settings, "metadata_columns", ()))
+        if hasattr(settings, "metadataColumnsChanged"):
+            settings.metadataColumnsChanged.connect(self.set_metadata_columns)
 
     def _looks_like_windows_path(self, filepath: str) -> bool:
         if not filepath:
@@ -50,7 +110,7 @@ class FileListWidget(QListWidget):
             return True
         if "\\" in filepath:
             return True
-        if ":" in filepath:
+        if ":" in filepath and split_host_path(filepath) is None:
             return True
         return False
 
@@ -78,6 +138,9 @@ class FileListWidget(QListWidget):
     def _normalize_incoming_path(self, filepath: str) -> str:
         if not filepath:
             return filepath
+        qualified = split_host_path(filepath)
+        if qualified is not None:
+            return join_host_path(qualified[0], posixpath.normpath(qualified[1]))
         if self._looks_like_windows_path(filepath):
             normalized = filepath.replace("/", "\\")
             normalized = self._convert_wsl_unc_to_drive(normalized)
@@ -91,18 +154,84 @@ class FileListWidget(QListWidget):
             return posixpath.normpath(filepath)
         return os.path.normpath(filepath)
 
-    def _canonical_key(self, filepath: str) -> str:
-        normalized = self._normalize_incoming_path(filepath)
+    def _key_for_normalized(self, normalized: str) -> str:
         if self._looks_like_windows_path(normalized):
             return ntpath.normcase(normalized)
         return normalized
 
+    def _canonical_key(self, filepath: str) -> str:
+        return self._key_for_normalized(self._normalize_incoming_path(filepath))
+
+    # ---- file list and canonical-key index ----
+    @property
+    def list_model(self) -> FileListModel:
+        return self._model
+
+    @property
+    def files(self) -> list[str]:
+        return self._model.files
+
+    @files.setter
+    def files(self, value: Iterable[str]) -> None:
+        self._model.set_files(value)
+        self._key_index: Optional[dict[str, int]] = None
+        self._positions_stale = False
+
+    def _index(self) -> dict[str, int]:
+        """Map canonical key -> position, rebuilt only after wholesale changes."""
+        if self._key_index is None or self._positions_stale:
+            index: dict[str, int] = {}
+            for position, filepath in enumerate(self.files):
+                index.setdefault(self._key_for_normalized(filepath), position)
+            self._key_index = index
+            self._positions_stale = False
+        return self._key_index
+
     def _path_exists_in_list(self, filepath: str) -> bool:
-        candidate_key = self._canonical_key(filepath)
-        for existing in self.files:
-            if candidate_key == self._canonical_key(existing):
-                return True
-        return False
+        index = self._key_index if self._key_index is not None else self._index()
+        return self._canonical_key(filepath) in index
+
+    def index_of(self, filepath: str) -> int:
+        """Return the row of ``filepath`` in the list, or -1."""
+        return self._index().get(self._canonical_key(filepath), -1)
+
+    def _append_normalized(self, normalized_files: Iterable[str]) -> list[str]:
+        """Append already-normalized paths that are not in the list yet."""
+        index = self._key_index if self._key_index is not None else self._index()
+        first = len(self.files)
+        added: list[str] = []
+        for normalized in normalized_files:
+            key = self._key_for_normalized(normalized)
+            if key in index:
+                continue
+            index[key] = first + len(added)
+            added.append(normalized)
+        self._model.append_rows(added)
+        return added
+
+    def _remove_rows(self, rows: Iterable[int]) -> None:
+        index = self._key_index if self._key_index is not None else self._index()
+        rows = set(rows)
+        for row in rows:
+            index.pop(self._key_for_normalized(self.files[row]), None)
+        self._model.remove_rows(rows)
+        self._positions_stale = True
+
+    def splice_files(self, start: int, stop: int, paths: Sequence[str]) -> None:
+        """
+        Replace rows ``start:stop`` with ``paths`` without notifying.
+
+        ``paths`` must already be normalized entries of this list (undo and
+        redo replay them), so they are not normalized or checked again.
+        """
+        if stop > start:
+            self._remove_rows(range(start, stop))
+        if paths:
+            index = self._key_index if self._key_index is not None else self._index()
+            for normalized in paths:
+                index[self._key_for_normalized(normalized)] = -1
+            self._model.insert_rows(start, list(paths))
+            self._positions_stale = True
 
     def set_change_callback(self, callback: Optional[Callable[[], None]]) -> None:
         self._change_callback = callback
@@ -125,34 +254,39 @@ class FileListWidget(QListWidget):
         self._can_undo = can_undo
         self._can_redo = can_redo
 
-    def set_files(self, files: Iterable[str], notify: bool = True) -> None:
+    def set_files(self, files: Iterable[str], notify: bool = True, normalized: bool = False) -> None:
+        """
+        Replace the list. ``normalized`` skips path normalization for entries
+        that came out of a list before (history, saved sessions).
+        """
         unique_files: list[str] = []
-        seen_keys: set[str] = set()
+        index: dict[str, int] = {}
+        normalize = None if normalized else self._normalize_incoming_path
         for filepath in files:
-            normalized = self._normalize_incoming_path(filepath)
-            key = self._canonical_key(normalized)
-            if key in seen_keys:
+            entry = normalize(filepath) if normalize else filepath
+            key = self._key_for_normalized(entry)
+            if key in index:
                 continue
-            seen_keys.add(key)
-            unique_files.append(normalized)
+            index[key] = len(unique_files)
+            unique_files.append(entry)
         self.files = unique_files
-        self.update_list_display()
+        self._key_index = index
         if notify:
             self._notify_change()
 
     def contextMenuEvent(self, event):
-        item = self.itemAt(event.pos())
+        index = self.indexAt(event.pos())
         menu = QMenu(self)
 
-        if item:           
+        if index.isValid():
             remove_action = menu.addAction("Remove File")
-            remove_action.triggered.connect(partial(self.remove_item, item))
+            remove_action.triggered.connect(partial(self.remove_item, index))
 
             encoding_action = menu.addAction("Check Encoding")
-            encoding_action.triggered.connect(partial(self.check_encoding, item))
+            encoding_action.triggered.connect(partial(self.check_encoding, index))
 
             metadata_action = menu.addAction("View Metadata")
-            metadata_action.triggered.connect(partial(self.view_metadata, item))
+            metadata_action.triggered.connect(partial(self.view_metadata, index))
 
             menu.addSeparator()
 
@@ -171,9 +305,17 @@ class FileListWidget(QListWidget):
         add_folder_action = menu.addAction("Add Folder")
         add_folder_action.triggered.connect(add_folder_from_dialog)
 
+        find_files_action = menu.addAction("Find Files... (Ctrl+P)")
+        find_files_action.triggered.connect(lambda: self.open_file_picker())
+
+        add_changed_action = menu.addAction("Add Changed Files (git)...")
+        add_changed_action.triggered.connect(self.add_changed_files_from_dialog)
+
         remove_all_action = menu.addAction("Remove All Files")
         remove_all_action.triggered.connect(self.remove_all)
 
+        self._add_column_actions(menu.addMenu("Columns"))
+
         menu.addSeparator()
 
         undo_action = menu.addAction("Undo")
@@ -196,28 +338,69 @@ class FileListWidget(QListWidget):
         # split text by newline and filter out empty strings
         file_paths = list(filter(None, text.split("\n")))
         not_found_files = []
+        to_add: list[str] = []
         ssh_ctrl = getattr(self.ctx, "ssh", None)
         ssh = ssh_ctrl.manager if ssh_ctrl else None
         host = ssh.host if (ssh and ssh_ctrl and ssh_ctrl.is_connected()) else None
-        for file_path in file_paths:
-            original = file_path
-            file_path = self.strip_quotes(file_path)
-            file_path = convert_wsl_path(file_path, host)
-            if ssh and ssh.is_connected() and file_path.startswith("/"):
-                if ssh.path_exists(file_path):
-                    self.add_file(file_path, enforce_filter=False)
+        connected = bool(ssh and ssh.is_connected())
+        resolved = []
+        for original in file_paths:
+            file_path = self.strip_quotes(original)
+            resolved.append((original, convert_wsl_path(file_path, host)))
+        # Remote paths are checked in one batch per host instead of a round trip each
+        remote = {}
+        failed = set()
+        if connected:
+            default_paths = [p for _, p in resolved if p.startswith("/")]
+            infos = self.stat_remote(ssh, default_paths)
+            if infos is None:
+                failed.update(default_paths)
+            else:
+                remote = {info.path: info for info in infos}
+        by_host: dict = {}
+        for _, file_path in resolved:
+            if split_host_path(file_path) is not None:
+                target = self._remote_target(file_path)
+                if target is not None:
+                    by_host.setdefault(target[0], {})[target[1]] = file_path
+        # Hosts that are not connected yet are checked when the files are read
+        unverified = set()
+        for manager, paths in by_host.items():
+            if manager.is_connected():
+                infos = self.stat_remote(manager, list(paths))
+                if infos is None:
+                    failed.update(paths.values())
+                else:
+                    remote.update((paths[info.path], info) for info in infos)
+            else:
+                unverified.update(paths.values())
+                try:
+                    manager.connect_in_background()  # ready by the time the files are read
+                except Exception:
+                    pass  # a recent failure; reported when the files are read
+        for original, file_path in resolved:
+            if file_path in unverified:
+                to_add.append(file_path)
+            elif file_path in failed:
+                not_found_files.append(original)
+            elif file_path in remote:
+                if remote[file_path].is_dir:
+                    self.add_remote_folder(file_path)
+                elif remote[file_path].exists:
+                    to_add.append(file_path)
                 else:
                     not_found_files.append(original)
             elif os.path.exists(file_path):
-                self.add_file(file_path, enforce_filter=False)
+                to_add.append(file_path)
             elif self.root_path:
                 candidate = os.path.join(self.root_path, file_path)
                 if os.path.exists(candidate):
-                    self.add_file(candidate, enforce_filter=False)
+                    to_add.append(candidate)
                 else:
                     not_found_files.append(original)
             else:
                 not_found_files.append(original)
+        self.add_files(to_add, enforce_filter=False)
         if not_found_files:
             QMessageBox.warning(
                 self,
@@ -225,58 +408,266 @@ class FileListWidget(QListWidget):
                 "The following files were not found:\n" + "\n".join(not_found_files),
             )
 
+    def stat_remote(self, manager, paths: list[str]):
+        """``manager.stat_many(paths)``, or None after warning that the host could not be asked."""
+        if not paths:
+            return []
+        try:
+            return manager.stat_many(paths)
+        except Exception as exc:  # a dropped link must not escape a Qt slot
+            QMessageBox.warning(self, "Remote Paths", f"Could not check paths on {manager.host}:\n{exc}")
+            return None
+
+    def _list_folder(
+        self,
+        folder_path: str,
+        filters: Optional[list[str]],
+        visited_dirs: Optional[list[str]] = None,
+        cached: bool = True,
+    ) -> list[str]:
+        settings = getattr(self.ctx, "settings", None)
+        ignores = settings.ignore_filters if settings else None
+        if settings and getattr(settings, "use_git_index", False):
+            files = list_git_files(folder_path, filters, ignores, visited_dirs)
+            if files is not None:
+                return files
+        gitignore = bool(getattr(settings, "respect_gitignore", False))
+        cache = getattr(self.ctx, "listing_cache", None) if cached else None
+        lister = cache.list_files if cache is not None else list_files
+        return lister(
+            folder_path,
+            filters,
+            ignores,
+            respect_gitignore=gitignore,
+            visited_dirs=visited_dirs,
+        )
+
+    def _list_folder_for_sync(self, folder_path: str, cached: bool = True) -> tuple[list[str], list[str]]:
+        """Files and walked directories of ``folder_path``; off the GUI thread pass ``cached=False``."""
+        settings = getattr(self.ctx, "settings", None)
+        filters = settings.extension_filters if settings else None
+        visited: list[str] = []
+        files = self._list_folder(folder_path, filters, visited, cached)
+        return [f for f in files if self.is_allowed(f)], visited
+
+    def _accepts_synced_path(self, path: str, is_dir: bool) -> bool:
+        settings = getattr(self.ctx, "settings", None)
+        if is_dir:
+            ignores = settings.ignore_filters if settings else None
+            name = os.path.basename(path)
+            if ignores and any(fnmatch.fnmatch(name, pattern) for pattern in ignores):
+                return False
+        elif not self.is_allowed(path):
+            return False
+        if getattr(settings, "respect_gitignore", False) and is_path_ignored(path, is_dir):
+            return False
+        return True
+
+    @property
+    def folder_sources(self) -> list[str]:
+        return list(self._folder_sync.sources)
+
+    def set_folder_sources(self, folders: Iterable[str]) -> None:
+        self._folder_sync.set_sources(folders)
+
+    def _on_folder_sync_changed(self, added: list[str], removed: list[str]) -> None:
+        changed = False
+        if removed:
+            gone = {self._canonical_key(p) for p in removed}
+            prefixes = tuple(key.rstrip("\\/") + sep for key in gone for sep in ("/", "\\"))
+            rows = []
+            for row, filepath in enumerate(self.files):
+                key = self._canonical_key(filepath)
+                if key in gone or key.startswith(prefixes):
+                    rows.append(row)
+            if rows:
+                self._remove_rows(rows)
+                changed = True
+        if self._append_normalized(self._normalize_incoming_path(f) for f in added):
+            changed = True
+        if changed:
+            self._notify_change()
+
     def add_folder(self, folder_path=None):
         if folder_path:
-            settings = getattr(self.ctx, "settings", None)
-            filters = settings.extension_filters if settings else None
-            ignores = settings.ignore_filters if settings else None
-            files = list_files(
-                folder_path,
-                filters,
-                ignores,
+            if self._remote_target(folder_path) is not None:
+                self.add_remote_folder(folder_path)
+                return
+            self.add_files(self.collect_folder(folder_path), enforce_filter=False)
+
+    def _remote_manager(self):
+        ssh_ctrl = getattr(self.ctx, "ssh", None)
+        if ssh_ctrl is None or ssh_ctrl.manager is None or not ssh_ctrl.is_connected():
+            return None
+        return ssh_ctrl.manager
+
+    def _remote_target(self, path: str):
+        """Manager and path on the host for a remote ``path``, or None."""
+        qualified = split_host_path(path)
+        if qualified is not None:
+            hosts = getattr(self.ctx, "ssh_hosts", None)
+            manager = hosts.manager(qualified[0]) if hosts is not None else None
+            return (manager, qualified[1]) if manager is not None else None
+        manager = self._remote_manager()
+        if manager is not None and path.startswith("/"):
+            return manager, path
+        return None
+
+    def add_remote_folder(self, folder_path: str) -> bool:
+        """
+        Walk a folder on the SSH host in the background.
+
+        Files appear in the list as each directory is listed; the change
+        callback (and the undo history) fires once when the walk is done.
+        A host-qualified folder yields host-qualified files. Returns False
+        when no walk could be started.
+        """
+        target = self._remote_target(folder_path)
+        walker = getattr(self.ctx, "remote_walker", None)
+        if target is None or walker is None:
+            return False
+        settings = getattr(self.ctx, "settings", None)
+        walk_id = walker.walk(
+            target[0],
+            target[1],
+            settings.extension_filters if settings else None,
+            settings.ignore_filters if settings else None,
+            bool(getattr(settings, "respect_gitignore", False)),
+        )
+        self._remote_walks[walk_id] = folder_path
+        return True
+
+    def _on_remote_files_found(self, walk_id: int, batch: list[str]) -> None:
+        if walk_id not in self._remote_walks:
+            return
+        qualified = split_host_path(self._remote_walks[walk_id])
+        if qualified is not None:
+            batch = [join_host_path(qualified[0], f) for f in batch]
+        if self._append_normalized(self._normalize_incoming_path(f) for f in batch if self.is_allowed(f)):
+            self._remote_walks_added.add(walk_id)
+
+    def _on_remote_walk_finished(self, walk_id: int, count: int, error: str) -> None:
+        if walk_id not in self._remote_walks:
+            return
+        folder = self._remote_walks.pop(walk_id)
+        if walk_id in self._remote_walks_added:
+            self._remote_walks_added.discard(walk_id)
+            self._notify_change()
+        if error:
+            QMessageBox.warning(self, "Remote Folder", f"Could not list {folder}:\n{error}")
+        elif not count:
+            QMessageBox.information(self, "No Files Added", "No matching files were found in the remote folder.")
+
+    def collect_folder(self, folder_path: str) -> list[str]:
+        """
+        Return the allowed files under ``folder_path`` and start syncing it.
+
+        Nothing is added to the list, so callers can gather several folders
+        and files and pass them to :meth:`add_files` in one batch. When no
+        file passes the filters the user is told which categories to enable.
+        """
+        settings = getattr(self.ctx, "settings", None)
+        filters = settings.extension_filters if settings else None
+        walked_dirs: list[str] = []
+        files = self._list_folder(folder_path, filters, walked_dirs)
+        allowed_files = [f for f in files if self.is_allowed(f)]
+        if allowed_files:
+            self._folder_sync.add_source(folder_path, walked_dirs)
+        else:
+            self._explain_empty_folder(folder_path)
+        return allowed_files
+
+    def _explain_empty_folder(self, folder_path: str) -> None:
+        all_files = self._list_folder(folder_path, None)
+        if not all_files:
+            QMessageBox.information(
+                self,
+                "No Files Added",
+                "The selected folder contains no files.",
+            )
+            return
+        ext_set = {os.path.splitext(f)[1].lower() for f in all_files}
+        from extension_filters import EXTENSION_GROUP_DEFAULTS
+
+        category_counts: dict[str, int] = {}
+        for ext in ext_set:
+            for cat, items in EXTENSION_GROUP_DEFAULTS.items():
+                if ext in items:
+                    category_counts[cat] = category_counts.get(cat, 0) + 1
+
+        if not category_counts:
+            suggested = "Code Files"
+        elif len(category_counts) == 1:
+            suggested = next(iter(category_counts))
+        else:
+            suggested = (
+                "Code Files" if "Code Files" in category_counts else max(category_counts, key=category_counts.get)
+            )
+
+        suggested_exts = ", ".join(sorted(ext_set))
+        QMessageBox.information(
+            self,
+            "No Files Added",
+            f"No approved files were found. The folder contains: {suggested_exts}.\n"
+            f"Consider enabling the '{suggested}' category.",
+        )
+
+    def open_file_picker(self, folder: Optional[str] = None) -> None:
+        """Search every file under ``folder`` (default: the root path) and add the picks."""
+        from file_picker import FilePickerDialog
+
+        if not folder:
+            folder = self.root_path if self.root_path and os.path.isdir(self.root_path) else None
+        if not folder:
+            folder = QFileDialog.getExistingDirectory(
+                self,
+                "Select Folder",
+                options=QFileDialog.ShowDirsOnly | QFileDialog.DontResolveSymlinks,
+            )
+            if not folder:
+                return
+        dialog = FilePickerDialog(self.ctx, folder, self)
+        try:
+            if dialog.exec_() == FilePickerDialog.Accepted:
+                self.add_files(dialog.selected_paths(), enforce_filter=False)
+        finally:
+            dialog.deleteLater()
+
+    def add_changed_files_from_dialog(self):
+        directory = self.root_path if self.root_path and os.path.isdir(self.root_path) else None
+        if not directory:
+            directory = QFileDialog.getExistingDirectory(
+                self,
+                "Select Repository Folder",
+                options=QFileDialog.ShowDirsOnly | QFileDialog.DontResolveSymlinks,
+            )
+            if not directory:
+                return
+        revision_range, ok = QInputDialog.getText(
+            self,
+            "Add Changed Files",
+            "Compare against (leave empty for uncommitted changes,\n"
+            "e.g. main...HEAD for the current branch):",
+        )
+        if ok:
+            self.add_changed_files(directory, revision_range.strip())
+
+    def add_changed_files(self, directory: str, revision_range: str = "") -> None:
+        changed = list_changed_files(directory, revision_range)
+        if changed is None:
+            QMessageBox.warning(
+                self,
+                "Git Error",
+                f"Could not list changed files in {directory}.\n"
+                "Make sure it is inside a git repository and the revisions exist.",
+            )
+            return
+        if not self.add_files(changed):
+            QMessageBox.information(
+                self,
+                "No Files Added",
+                "No new changed files matching the current filters were found.",
             )
-            allowed_files = [f for f in files if self.is_allowed(f)]
-            if allowed_files:
-                normalized_files = [self._normalize_incoming_path(f) for f in allowed_files]
-                new_files = [f for f in normalized_files if not self._path_exists_in_list(f)]
-                if new_files:
-                    self.files.extend(new_files)
-                    self.update_list_display()
-                    self._notify_change()
-            else:
-                all_files = list_files(folder_path, None, ignores)
-                if not all_files:
-                    QMessageBox.information(
-                        self,
-                        "No Files Added",
-                        "The selected folder contains no files.",
-                    )
-                    return
-                ext_set = {os.path.splitext(f)[1].lower() for f in all_files}
-                from extension_filters import EXTENSION_GROUP_DEFAULTS
-
-                category_counts: dict[str, int] = {}
-                for ext in ext_set:
-                    for cat, items in EXTENSION_GROUP_DEFAULTS.items():
-                        if ext in items:
-                            category_counts[cat] = category_counts.get(cat, 0) + 1
-
-                if not category_counts:
-                    suggested = "Code Files"
-                elif len(category_counts) == 1:
-                    suggested = next(iter(category_counts))
-                else:
-                    suggested = (
-                        "Code Files" if "Code Files" in category_counts else max(category_counts, key=category_counts.get)
-                    )
-
-                suggested_exts = ", ".join(sorted(ext_set))
-                QMessageBox.information(
-                    self,
-                    "No Files Added",
-                    f"No approved files were found. The folder contains: {suggested_exts}.\n"
-                    f"Consider enabling the '{suggested}' category.",
-                )
 
     def strip_quotes(self, text):
         text = text.strip()
@@ -287,78 +678,141 @@ class FileListWidget(QListWidget):
             return text[1:-1]
         return text
 
-    def remove_item(self, item):
-        row = self.row(item)
-        del self.files[row]
-        self.takeItem(row)
+    def _source_row(self, index) -> int:
+        if index.model() is self._model:
+            return index.row()
+        return self._proxy.mapToSource(index).row()
+
+    def remove_item(self, index):
+        self._remove_rows([self._source_row(index)])
         self._notify_change()
 
+    def remove_paths(self, paths: Iterable[str]) -> None:
+        """Remove ``paths`` with one model update and one history entry."""
+        rows = {row for row in map(self.index_of, paths) if row >= 0}
+        if rows:
+            self._remove_rows(rows)
+            self._notify_change()
+
+    def move_paths(self, paths: Iterable[str], target: int) -> None:
+        """Move ``paths`` as one block so it lands before the row at ``target``."""
+        block = sorted({row for row in map(self.index_of, paths) if row >= 0})
+        if not block:
+            return
+        moved = set(block)
+        rest = [row for row in range(len(self.files)) if row not in moved]
+        position = sum(1 for row in rest if row < target)
+        self._model.reorder(rest[:position] + block + rest[position:])
+
+    def set_filter_text(self, text: str) -> None:
+        """Show only entries whose display path fuzzy-matches ``text``."""
+        self._proxy.set_filter_text(text)
+        # Row positions in a filtered view are not list positions, so
+        # reordering by drag is only offered for the full list.
+        filtering = self._proxy.is_filtering()
+        self.setDragEnabled(not filtering)
+        self.setDragDropMode(
+            QAbstractItemView.NoDragDrop if filtering else QAbstractItemView.InternalMove
+        )
+
     def remove_all(self):
-        self.files.clear()
-        self.update_list_display()
+        walker = getattr(self.ctx, "remote_walker", None)
+        for walk_id in self._remote_walks:
+            walker.cancel(walk_id)
+        self._remote_walks.clear()
+        self._remote_walks_added.clear()
+        self.files = []
+        self._folder_sync.clear()
         self._notify_change()
 
-    def check_encoding(self, item):
-        filepath = item.data(Qt.UserRole)
-        try:
-            with open(filepath, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                confidence = result['confidence']
-                if encoding:
-                    QMessageBox.information(
-                        self,
-                        "File Encoding",
-                        f"Encoding: {encoding}\nConfidence: {confidence*100:.2f}%",
-                    )
-                else:
-                    QMessageBox.warning(
-                        self,
-                        "Encoding Detection Failed",
-                        "Could not detect the encoding of the file.",
-                    )
-        except Exception as e:
+    def _inspect(self, filepath: str, show: Callable[[FileMetadata], None]) -> None:
+        """
+        Call ``show`` with the metadata of ``filepath``.
+
+        Cached entries are shown right away; otherwise the shared metadata
+        service computes them on a worker (over SFTP for remote paths) and
+        ``show`` runs once the result reaches the GUI thread.
+        """
+        service = getattr(self.ctx, "metadata", None)
+        if service is None:
+            show(compute_metadata(filepath))
+            return
+        cached = service.get(filepath)
+        if cached is not None:
+            show(cached)
+            return
+        self._pending_inspections.setdefault(filepath, []).append(show)
+        service.request([filepath])
+
+    def check_encoding(self, index):
+        self._inspect(index.data(Qt.UserRole), self._show_encoding)
+
+    def _show_encoding(self, metadata: FileMetadata) -> None:
+        if metadata.error:
             QMessageBox.critical(
                 self,
                 "Error",
-                f"Failed to read {os.path.basename(filepath)}.\n{str(e)}",
-            )
-
-    def view_metadata(self, item):
-        filepath = item.data(Qt.UserRole)
-        try:
-            size = os.path.getsize(filepath)
-            last_modified_timestamp = os.path.getmtime(filepath)
-            last_modified = QDateTime.fromSecsSinceEpoch(int(last_modified_timestamp)).toString(
-                Qt.DefaultLocaleLongDate
-            )
-            metadata = (
-                f"Filename: {os.path.basename(filepath)}\n"
-                f"Size: {size} bytes\n"
-                f"Last Modified: {last_modified}"
+                f"Failed to read {os.path.basename(metadata.path)}.\n{metadata.error}",
             )
+        elif metadata.encoding:
             QMessageBox.information(
                 self,
-                "File Metadata",
-                metadata,
+                "File Encoding",
+                f"Encoding: {metadata.encoding}\nConfidence: {metadata.confidence*100:.2f}%",
             )
-        except Exception as e:
+        else:
+            QMessageBox.warning(
+                self,
+                "Encoding Detection Failed",
+                "Could not detect the encoding of the file.",
+            )
+
+    def view_metadata(self, index):
+        self._inspect(index.data(Qt.UserRole), self._show_metadata)
+
+    def _show_metadata(self, metadata: FileMetadata) -> None:
+        filename = os.path.basename(metadata.path)
+        if metadata.error:
             QMessageBox.critical(
                 self,
                 "Error",
-                f"Failed to retrieve metadata for {os.path.basename(filepath)}.\n{str(e)}",
+                f"Failed to retrieve metadata for {filename}.\n{metadata.error}",
             )
+            return
+        last_modified = QDateTime.fromSecsSinceEpoch(metadata.mtime_ns // 1_000_000_000).toString(
+            Qt.DefaultLocaleLongDate
+        )
+        lines = [
+            f"Filename: {filename}",
+            f"Size: {metadata.size} bytes",
+            f"Last Modified: {last_modified}",
+        ]
+        if metadata.lines is not None:
+            lines.append(f"Lines: {metadata.lines:,}")
+        if metadata.tokens is not None:
+            lines.append(f"Estimated Tokens: {metadata.tokens:,}")
+        if metadata.encoding:
+            lines.append(f"Encoding: {metadata.encoding}")
+        QMessageBox.information(self, "File Metadata", "\n".join(lines))
 
     def add_file(self, filepath, enforce_filter=True):
-        normalized = self._normalize_incoming_path(filepath)
-        if self._path_exists_in_list(normalized):
-            return
-        if enforce_filter and not self.is_allowed(normalized):
-            return
-        self.files.append(normalized)
-        self.update_list_display()
-        self._notify_change()
+        self.add_files([filepath], enforce_filter=enforce_filter)
+
+    def add_files(self, filepaths: Iterable[str], enforce_filter: bool = True) -> list[str]:
+        """
+        Add many paths at once and return the ones that were new.
+
+        Duplicates are dropped in a single pass over the key index, the model
+        inserts all new rows with one notification and the change callback
+        (and with it the undo history) fires once for the whole batch.
+        """
+        normalized = (self._normalize_incoming_path(f) for f in filepaths if f)
+        if enforce_filter:
+            normalized = (f for f in normalized if self.is_allowed(f))
+        added = self._append_normalized(normalized)
+        if added:
+            self._notify_change()
+        return added
 
     def is_allowed(self, filepath: str) -> bool:
         settings = getattr(self.ctx, "settings", None)
@@ -373,33 +827,79 @@ class FileListWidget(QListWidget):
 
     def set_root_path(self, root_path):
         self.root_path = root_path
-        self.update_list_display()
+        self._model.set_root_path(root_path)
 
     def disable_root_path(self):
         self.root_path = None
-        self.update_list_display()
+        self._model.set_root_path(None)
 
     def update_list_display(self):
-        self.clear()
-        warnings: list[str] = []
-        for filepath in self.files:
-            display_path, warn_msg = safe_relpath(filepath, self.root_path)
-            if warn_msg:
-                warnings.append(warn_msg)
-                display_path = f"{display_path} [abs]"
-            item = QListWidgetItem(display_path)
-            item.setData(Qt.UserRole, filepath)  # Store full path
-            self.addItem(item)
+        self._model.refresh()
+
+    def _queue_path_warning(self, message: str) -> None:
+        # Raised from data() while painting; show it once painting is done.
+        if not self._path_warnings:
+            QTimer.singleShot(0, self._show_path_warnings)
+        self._path_warnings.append(message)
+
+    def _show_path_warnings(self) -> None:
+        warnings, self._path_warnings = self._path_warnings, []
         if warnings:
             QMessageBox.warning(self, "Path Error", "\n".join(sorted(set(warnings))))
 
-    def dropEvent(self, event):
-        super().dropEvent(event)
-        # update self.files to match the new order
-        new_files = []
-        for index in range(self.count()):
-            item = self.item(index)
-            filepath = item.data(Qt.UserRole)
-            new_files.append(filepath)
-        self.files = new_files  # Update the internal list
+    # ---- metadata columns ----
+    def set_metadata_columns(self, names: Iterable[str]) -> None:
+        """Show exactly the metadata columns listed in ``names``."""
+        visible = set(names or ())
+        for name, column in METADATA_COLUMNS.items():
+            self.setColumnHidden(column, name not in visible)
+        self.horizontalHeader().setVisible(bool(visible & METADATA_COLUMNS.keys()))
+
+    def visible_metadata_columns(self) -> list[str]:
+        return [name for name, column in METADATA_COLUMNS.items() if not self.isColumnHidden(column)]
+
+    def _toggle_metadata_column(self, name: str, visible: bool) -> None:
+        names = [n for n in self.visible_metadata_columns() if n != name]
+        if visible:
+            names.append(name)
+        names = [n for n in METADATA_COLUMNS if n in names]
+        settings = getattr(self.ctx, "settings", None)
+        if settings is not None and hasattr(settings, "set_metadata_columns"):
+            # Every workspace follows the setting through metadataColumnsChanged
+            settings.set_metadata_columns(names)
+        else:
+            self.set_metadata_columns(names)
+
+    def _add_column_actions(self, menu) -> None:
+        for name, column in METADATA_COLUMNS.items():
+            action = menu.addAction(COLUMN_TITLES[column])
+            action.setCheckable(True)
+            action.setChecked(not self.isColumnHidden(column))
+            action.toggled.connect(partial(self._toggle_metadata_column, name))
+
+    def _show_column_menu(self, pos) -> None:
+        menu = QMenu(self)
+        self._add_column_actions(menu)
+        menu.exec_(self.horizontalHeader().mapToGlobal(pos))
+
+    def _on_metadata_ready(self, path: str, metadata) -> None:
+        row = self.index_of(path)
+        if row >= 0:
+            self._model.update_metadata(row, metadata)
+        for show in self._pending_inspections.pop(path, ()):
+            show(metadata)
+
+    def _on_header_clicked(self, column: int) -> None:
+        if column == self._sort_column and self._sort_order == Qt.AscendingOrder:
+            self._sort_order = Qt.DescendingOrder
+        else:
+            self._sort_order = Qt.AscendingOrder
+        self._sort_column = column
+        self.horizontalHeader().setSortIndicator(column, self._sort_order)
+        self.horizontalHeader().setSortIndicatorShown(True)
+        self._model.sort(column, self._sort_order)
+
+    def _on_rows_reordered(self) -> None:
+        # Same entries in a new order: keys stay valid, positions do not.
+        self._positions_stale = True
         self._notify_change()
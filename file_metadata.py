@@ -0,0 +1,261 @@
+"""Per-file statistics for workspace entries, computed off the GUI thread."""
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional, Set
+
+import chardet
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from remote_paths import remote_target
+
+ENCODING_SAMPLE_BYTES = 64 * 1024
+READ_CHUNK_BYTES = 1024 * 1024
+BYTES_PER_TOKEN = 4
+MAX_WORKERS = 4
+# Remote entries are trusted this long before the file is stat()ed again
+REMOTE_RECHECK_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class FileMetadata:
+    path: str
+    size: int
+    mtime_ns: int
+    lines: Optional[int] = None
+    tokens: Optional[int] = None
+    encoding: Optional[str] = None
+    confidence: float = 0.0
+    error: Optional[str] = None
+
+
+def estimate_tokens(size: int) -> int:
+    """Rough LLM token count: about four bytes of source text per token."""
+    return (size + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+
+
+def format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    value = size / 1024
+    for unit in ("KB", "MB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def detect_encoding(sample: bytes, truncated: bool = False) -> tuple[Optional[str], float]:
+    """Guess the encoding from a leading ``sample`` of a file."""
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        # A sample cut in the middle of a multi-byte sequence is still UTF-8.
+        if not (truncated and exc.reason == "unexpected end of data"):
+            result = chardet.detect(sample)
+            return result["encoding"], result["confidence"] or 0.0
+    else:
+        if sample.isascii():
+            return "ascii", 1.0
+    return "utf-8", 1.0
+
+
+def compute_metadata(path: str) -> FileMetadata:
+    """Stat ``path``, count its lines in chunks and sample its encoding."""
+    try:
+        st = os.stat(path)
+        lines = 0
+        last = b""
+        with open(path, "rb") as fh:
+            sample = chunk = fh.read(ENCODING_SAMPLE_BYTES)
+            while chunk:
+                lines += chunk.count(b"\n")
+                last = chunk
+                chunk = fh.read(READ_CHUNK_BYTES)
+    except OSError as exc:
+        return FileMetadata(path, -1, 0, error=str(exc))
+    if last and not last.endswith(b"\n"):
+        lines += 1
+    encoding, confidence = detect_encoding(sample, truncated=len(sample) < st.st_size)
+    return FileMetadata(
+        path,
+        st.st_size,
+        st.st_mtime_ns,
+        lines=lines,
+        tokens=estimate_tokens(st.st_size),
+        encoding=encoding,
+        confidence=confidence,
+    )
+
+
+def revalidate_metadata(
+    path: str, previous: Optional[FileMetadata], compute: Callable[[str], FileMetadata] = compute_metadata
+) -> FileMetadata:
+    """``previous`` while the local file's size and mtime match it, else ``compute(path)``."""
+    if previous is not None and not previous.error:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return compute(path)
+        if (previous.size, previous.mtime_ns) == (st.st_size, st.st_mtime_ns):
+            return previous
+    return compute(path)
+
+
+def compute_remote_metadata(
+    path: str, ssh_manager, previous: Optional[FileMetadata] = None, remote_path: Optional[str] = None
+) -> FileMetadata:
+    """
+    Metadata of a remote file from an SFTP ``stat`` and a sampled read.
+
+    ``previous`` is returned as-is when size and mtime are unchanged. Lines
+    are only counted when the whole file fits in the sample. ``remote_path``
+    is the path on the host when ``path`` is host-qualified.
+    """
+    remote_path = remote_path or path
+    attrs = ssh_manager.stat(remote_path)
+    size = attrs.st_size or 0
+    mtime_ns = int(attrs.st_mtime or 0) * 1_000_000_000
+    if previous is not None and not previous.error and (previous.size, previous.mtime_ns) == (size, mtime_ns):
+        return previous
+    sample = ssh_manager.read_sample(remote_path, ENCODING_SAMPLE_BYTES) if size else b""
+    lines = None
+    if len(sample) >= size:
+        lines = sample.count(b"\n") + (1 if sample and not sample.endswith(b"\n") else 0)
+    encoding, confidence = detect_encoding(sample, truncated=len(sample) < size)
+    return FileMetadata(
+        path,
+        size,
+        mtime_ns,
+        lines=lines,
+        tokens=estimate_tokens(size),
+        encoding=encoding,
+        confidence=confidence,
+    )
+
+
+class _MetadataTask(QRunnable):
+    def __init__(self, path: str, job: Callable[[], FileMetadata], done):
+        super().__init__()
+        self._path = path
+        self._job = job
+        self._done = done
+
+    def run(self):
+        try:
+            metadata = self._job()
+        except Exception as exc:  # never let a worker die silently
+            metadata = FileMetadata(self._path, -1, 0, error=str(exc))
+        self._done.emit(self._path, metadata)
+
+
+class MetadataService(QObject):
+    """
+    Shared cache of :class:`FileMetadata`, filled by a small worker pool.
+
+    :meth:`cached` answers painting and sorting without touching the
+    filesystem. :meth:`request` revalidates entries on a worker, which stats
+    local files and recomputes only those whose size or mtime changed;
+    changed results are announced through ``metadataReady`` on the GUI
+    thread. Remote entries are trusted for ``REMOTE_RECHECK_SECONDS`` and
+    then revalidated by a worker with a single ``stat``.
+    """
+
+    metadataReady = pyqtSignal(str, object)  # path, FileMetadata
+    _computed = pyqtSignal(str, object)
+
+    def __init__(
+        self,
+        compute: Callable[[str], FileMetadata] = compute_metadata,
+        max_workers: int = MAX_WORKERS,
+        ssh_manager=None,
+        parent=None,
+        ssh_hosts=None,
+    ):
+        super().__init__(parent)
+        self._compute = compute
+        self._ssh_manager = ssh_manager
+        self._ssh_hosts = ssh_hosts
+        self._entries: Dict[str, FileMetadata] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._pending: Set[str] = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(max_workers, QThreadPool.globalInstance().maxThreadCount())))
+        self._computed.connect(self._store)
+
+    def _is_remote(self, path: str) -> bool:
+        return remote_target(path, self._ssh_manager, self._ssh_hosts) is not None
+
+    def cached(self, path: str) -> Optional[FileMetadata]:
+        """The entry last computed for ``path``; never stats anything."""
+        return self._entries.get(path)
+
+    def get(self, path: str) -> Optional[FileMetadata]:
+        """
+        Return the cached entry for ``path`` if it still matches the file.
+
+        Local files are stat()ed here, so this is meant for one-off lookups;
+        views use :meth:`cached` and :meth:`request`.
+        """
+        cached = self._entries.get(path)
+        if cached is None:
+            return None
+        if self._is_remote(path):
+            age = time.monotonic() - self._checked_at.get(path, 0.0)
+            return cached if age < REMOTE_RECHECK_SECONDS else None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return cached if cached.error else None
+        if cached.error or (cached.size, cached.mtime_ns) != (st.st_size, st.st_mtime_ns):
+            return None
+        return cached
+
+    def request(self, paths: Iterable[str]) -> None:
+        """Revalidate or compute ``paths`` on the worker pool."""
+        for path in paths:
+            if path in self._pending:
+                continue
+            target = remote_target(path, self._ssh_manager, self._ssh_hosts)
+            previous = self._entries.get(path)
+            if target is not None:
+                age = time.monotonic() - self._checked_at.get(path, 0.0)
+                if previous is not None and age < REMOTE_RECHECK_SECONDS:
+                    continue
+                manager, remote_path = target
+                job = partial(compute_remote_metadata, path, manager, previous, remote_path)
+            else:
+                job = partial(revalidate_metadata, path, previous, self._compute)
+            self._pending.add(path)
+            self._pool.start(_MetadataTask(path, job, self._computed))
+
+    def _store(self, path: str, metadata: FileMetadata) -> None:
+        self._pending.discard(path)
+        unchanged = metadata is self._entries.get(path)
+        self._entries[path] = metadata
+        self._checked_at[path] = time.monotonic()
+        if not unchanged:
+            self.metadataReady.emit(path, metadata)
+
+    def invalidate(self, paths: Iterable[str]) -> None:
+        """Forget ``paths``, e.g. once they leave the workspace."""
+        for path in paths:
+            self._entries.pop(path, None)
+            self._checked_at.pop(path, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._checked_at.clear()
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until running workers finish (used on shutdown and in tests)."""
+        return self._pool.waitForDone(msecs)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,130 @@
+import os
+from typing import Optional
+
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QDialog,
+    QDialogButtonBox,
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QPushButton,
+    QVBoxLayout,
+)
+from PyQt5.QtCore import Qt
+
+from path_index import PathIndex
+
+
+class FilePickerDialog(QDialog):
+    """
+    Quick-open dialog that searches every file under a folder.
+
+    Results come from the shared :class:`path_index.PathIndexService`; a
+    cached index answers immediately while a fresh one is built in the
+    background, and the results refresh when it arrives.
+    """
+
+    def __init__(self, ctx, folder: str, parent=None):
+        super().__init__(parent)
+        self.ctx = ctx
+        self.folder = folder
+        self._index: Optional[PathIndex] = None
+        self.setWindowTitle("Find Files")
+
+        layout = QVBoxLayout(self)
+        folder_layout = QHBoxLayout()
+        self.folder_label = QLabel()
+        folder_layout.addWidget(self.folder_label, 1)
+        change_button = QPushButton("Change Folder...")
+        change_button.clicked.connect(self.choose_folder)
+        folder_layout.addWidget(change_button)
+        layout.addLayout(folder_layout)
+
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Type to search file names and paths")
+        self.query_input.textChanged.connect(self.update_results)
+        self.query_input.returnPressed.connect(self.accept)
+        layout.addWidget(self.query_input)
+
+        self.results = QListWidget()
+        self.results.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.results.setUniformItemSizes(True)
+        self.results.itemDoubleClicked.connect(lambda _item: self.accept())
+        layout.addWidget(self.results)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Ok).setText("Add")
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.resize(640, 420)
+
+        service = getattr(ctx, "path_index", None)
+        if service is not None:
+            service.indexReady.connect(self._on_index_ready)
+        self.set_folder(folder)
+
+    def _service(self):
+        return getattr(self.ctx, "path_index", None)
+
+    def set_folder(self, folder: str) -> None:
+        self.folder = folder
+        self.folder_label.setText(f"Folder: {folder}")
+        self._index = None
+        service = self._service()
+        if service is not None:
+            settings = getattr(self.ctx, "settings", None)
+            self._index = service.index_for(
+                folder,
+                getattr(settings, "ignore_filters", None),
+                getattr(settings, "respect_gitignore", False),
+                getattr(settings, "use_git_index", False),
+            )
+        self.update_results()
+
+    def choose_folder(self) -> None:
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            "Select Folder",
+            self.folder,
+            options=QFileDialog.ShowDirsOnly | QFileDialog.DontResolveSymlinks,
+        )
+        if folder:
+            self.set_folder(folder)
+
+    def _on_index_ready(self, index: PathIndex) -> None:
+        if os.path.normcase(os.path.abspath(index.root)) == os.path.normcase(os.path.abspath(self.folder)):
+            self._index = index
+            self.update_results()
+
+    def update_results(self) -> None:
+        self.results.clear()
+        index = self._index
+        service = self._service()
+        building = service is not None and service.is_building(self.folder)
+        if index is None:
+            self.status_label.setText("Indexing files..." if building else "No files indexed.")
+            return
+        for position in index.search(self.query_input.text()):
+            item = QListWidgetItem(index.rel_paths[position])
+            item.setData(Qt.UserRole, index.paths[position])
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+        status = f"{len(index):,} files indexed"
+        if building:
+            status += " (refreshing...)"
+        self.status_label.setText(status)
+
+    def selected_paths(self) -> list[str]:
+        items = self.results.selectedItems()
+        if not items and self.results.count():
+            items = [self.results.item(0)]
+        return [item.data(Qt.UserRole) for item in items]
@@ -0,0 +1,192 @@
+# folder_sync.py
+from __future__ import annotations
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from listing_cache import DEFAULT_MAX_WATCHED_DIRS
+
+DEFAULT_DEBOUNCE_MS = 300
+
+FolderLister = Callable[[str], Tuple[List[str], List[str]]]
+PathFilter = Callable[[str, bool], bool]
+
+
+def _snapshot_dirs(dirs: Iterable[str], known, limit: int) -> Dict[str, Set[str]]:
+    """Entry names of up to ``limit`` directories of ``dirs`` not in ``known``."""
+    snapshots: Dict[str, Set[str]] = {}
+    for directory in dirs:
+        if len(snapshots) >= limit:
+            break
+        directory = os.path.normpath(directory)
+        if directory in known or directory in snapshots:
+            continue
+        try:
+            snapshots[directory] = set(os.listdir(directory))
+        except OSError:
+            continue
+    return snapshots
+
+
+class _WalkTask(QRunnable):
+    def __init__(self, generation: int, folders: List[str], walk: FolderLister, limit: int, done):
+        super().__init__()
+        self._generation = generation
+        self._folders = folders
+        self._walk = walk
+        self._limit = limit
+        self._done = done
+
+    def run(self):
+        snapshots: Dict[str, Set[str]] = {}
+        for folder in self._folders:
+            try:
+                if os.path.isdir(folder):
+                    _files, walked = self._walk(folder)
+                    snapshots.update(_snapshot_dirs(walked, snapshots, self._limit - len(snapshots)))
+            except Exception:  # never let a worker die silently
+                continue
+        self._done.emit(self._generation, snapshots)
+
+
+class FolderSync(QObject):
+    """
+    Keeps a workspace in step with the folders it was populated from.
+
+    Every directory walked for a folder source is watched. Change events are
+    debounced, then only the directories that changed are re-listed and
+    compared with their previous entry names, so manual removals from the
+    workspace stick and unchanged parts of the tree are never walked again.
+
+    :meth:`set_sources` walks on a worker thread with ``walk_folder``, which
+    must not touch Qt objects; at most ``max_watched_dirs`` directories are
+    watched, the same budget as the shared listing cache.
+    """
+
+    # added file paths, removed file or directory paths
+    changed = pyqtSignal(object, object)
+    _walked = pyqtSignal(int, object)
+
+    def __init__(
+        self,
+        list_folder: FolderLister,
+        accept_path: PathFilter,
+        debounce_ms: int = DEFAULT_DEBOUNCE_MS,
+        parent=None,
+        walk_folder: Optional[FolderLister] = None,
+        max_watched_dirs: int = DEFAULT_MAX_WATCHED_DIRS,
+    ):
+        super().__init__(parent)
+        self._list_folder = list_folder
+        self._walk_folder = walk_folder or list_folder
+        self._accept_path = accept_path
+        self.max_watched_dirs = max_watched_dirs
+        self.sources: List[str] = []
+        self._snapshots: Dict[str, Set[str]] = {}
+        self._dirty: Set[str] = set()
+        self._generation = 0
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._walked.connect(self._on_walked)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._queue)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self.flush)
+
+    # ---- sources ----
+    def add_source(self, folder: str, walked_dirs: Iterable[str]) -> None:
+        folder = os.path.normpath(folder)
+        if folder not in self.sources:
+            self.sources.append(folder)
+        self._watch_dirs(walked_dirs)
+
+    def set_sources(self, folders: Iterable[str]) -> None:
+        """Follow exactly ``folders``; they are walked and watched in the background."""
+        folders = [os.path.normpath(f) for f in folders]
+        if folders == self.sources:
+            return
+        self.clear()
+        if not folders:
+            return
+        self.sources = list(folders)
+        self._pool.start(_WalkTask(self._generation, folders, self._walk_folder, self.max_watched_dirs, self._walked))
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _on_walked(self, generation: int, snapshots: Dict[str, Set[str]]) -> None:
+        if generation == self._generation:
+            self._watch_snapshots(snapshots)
+
+    def clear(self) -> None:
+        self._generation += 1  # results of a walk still running are dropped
+        self.sources = []
+        self._dirty.clear()
+        self._timer.stop()
+        if self._snapshots:
+            self._watcher.removePaths(list(self._snapshots))
+        self._snapshots.clear()
+
+    # ---- watching ----
+    def _watch_dirs(self, dirs: Iterable[str]) -> None:
+        room = self.max_watched_dirs - len(self._snapshots)
+        self._watch_snapshots(_snapshot_dirs(dirs, self._snapshots, room))
+
+    def _watch_snapshots(self, snapshots: Dict[str, Set[str]]) -> None:
+        room = self.max_watched_dirs - len(self._snapshots)
+        fresh = [d for d in snapshots if d not in self._snapshots][:max(room, 0)]
+        if not fresh:
+            return
+        failed = set(self._watcher.addPaths(fresh))
+        for directory in fresh:
+            if directory not in failed:
+                self._snapshots[directory] = snapshots[directory]
+
+    def _unwatch_under(self, path: str) -> None:
+        prefix = path.rstrip(os.sep) + os.sep
+        gone = [d for d in self._snapshots if d == path or d.startswith(prefix)]
+        for directory in gone:
+            del self._snapshots[directory]
+        if gone:
+            self._watcher.removePaths(gone)
+
+    def _queue(self, path: str) -> None:
+        self._dirty.add(os.path.normpath(path))
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Apply all queued directory changes and emit one ``changed`` signal."""
+        self._timer.stop()
+        dirty, self._dirty = sorted(self._dirty), set()
+        added: list[str] = []
+        removed: list[str] = []
+        for directory in dirty:
+            previous = self._snapshots.get(directory)
+            if previous is None:
+                continue
+            try:
+                current = set(os.listdir(directory))
+            except OSError:
+                removed.append(directory)
+                self._unwatch_under(directory)
+                continue
+            for name in sorted(current - previous):
+                path = os.path.join(directory, name)
+                is_dir = os.path.isdir(path)
+                if not self._accept_path(path, is_dir):
+                    continue
+                if is_dir:
+                    files, walked = self._list_folder(path)
+                    added.extend(files)
+                    self._watch_dirs(walked)
+                else:
+                    added.append(path)
+            for name in sorted(previous - current):
+                path = os.path.join(directory, name)
+                removed.append(path)
+                self._unwatch_under(path)
+            self._snapshots[directory] = current
+        if added or removed:
+            self.changed.emit(added, removed)
@@ -0,0 +1,171 @@
+"""Helpers that ask a local ``git`` executable about work trees."""
+from __future__ import annotations
+
+import fnmatch
+import os
+import subprocess
+from typing import Optional, Set
+
+GIT_TIMEOUT_SECONDS = 60
+_GITLINK_MODE = "160000"
+
+
+def _run_git(directory: str, *args: str) -> Optional[bytes]:
+    """Run ``git -C directory args`` and return stdout, or None on any failure."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", directory, *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=GIT_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+
+def _split_nul(output: bytes) -> list[str]:
+    return [os.fsdecode(item) for item in output.split(b"\0") if item]
+
+
+def is_inside_work_tree(directory: str) -> bool:
+    output = _run_git(directory, "rev-parse", "--is-inside-work-tree")
+    return output is not None and output.strip() == b"true"
+
+
+def excludes_file(directory: str) -> str:
+    """The global ignore file git applies in ``directory``'s work tree.
+
+    ``core.excludesFile`` when configured, else git's default of
+    ``$XDG_CONFIG_HOME/git/ignore``; the file need not exist.
+    """
+    output = _run_git(directory, "config", "--path", "core.excludesFile")
+    if output and output.strip():
+        return os.path.abspath(os.fsdecode(output.strip()))
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(
+        os.path.expanduser("~"), ".config"
+    )
+    return os.path.join(config_home, "git", "ignore")
+
+
+def _tracked_files(directory: str) -> Optional[list[str]]:
+    """Tracked paths under ``directory`` (relative to it), skipping submodules."""
+    output = _run_git(directory, "ls-files", "-z", "--cached", "--stage")
+    if output is None:
+        return None
+    paths: list[str] = []
+    seen: set[str] = set()
+    for entry in _split_nul(output):
+        info, _, path = entry.partition("\t")
+        if info.split(" ", 1)[0] == _GITLINK_MODE or path in seen:
+            continue
+        seen.add(path)
+        paths.append(path)
+    return paths
+
+
+def list_git_files(
+    directory: str,
+    extensions: Optional[list[str]] = None,
+    ignore_folders: Optional[Set[str]] = None,
+    visited_dirs: Optional[list[str]] = None,
+) -> Optional[list[str]]:
+    """
+    Return tracked and untracked-but-not-ignored files under ``directory``
+    using the git index instead of walking the filesystem.
+
+    Returns None when ``directory`` is not inside a git work tree or git is
+    unavailable, so callers can fall back to :func:`utils.list_files`.
+    ``visited_dirs`` receives ``directory`` and every directory below it
+    that holds a listed file, whatever its extension, like a walk would.
+    """
+    if not os.path.isdir(directory) or not is_inside_work_tree(directory):
+        return None
+    tracked = _tracked_files(directory)
+    untracked = _run_git(directory, "ls-files", "-z", "--others", "--exclude-standard")
+    deleted = _run_git(directory, "ls-files", "-z", "--deleted")
+    if tracked is None or untracked is None or deleted is None:
+        return None
+
+    missing = set(_split_nul(deleted))
+    normalized = [ext.lower() for ext in extensions] if extensions else None
+    ignored_dirs: dict[str, bool] = {}
+
+    def in_ignored_folder(rel_path: str) -> bool:
+        parent = rel_path.rpartition("/")[0]
+        if not parent:
+            return False
+        cached = ignored_dirs.get(parent)
+        if cached is None:
+            name = parent.rpartition("/")[2]
+            cached = in_ignored_folder(parent) or any(
+                fnmatch.fnmatch(name, pattern) for pattern in ignore_folders
+            )
+            ignored_dirs[parent] = cached
+        return cached
+
+    selected: list[str] = []
+    dirs: Set[str] = set()
+    for rel_path in tracked + _split_nul(untracked):
+        if rel_path in missing:
+            continue
+        if ignore_folders and in_ignored_folder(rel_path):
+            continue
+        parent = rel_path.rpartition("/")[0]
+        while parent and parent not in dirs:
+            dirs.add(parent)
+            parent = parent.rpartition("/")[0]
+        if normalized:
+            ext = os.path.splitext(rel_path)[1].lower()
+            if ext not in normalized:
+                continue
+        selected.append(os.path.join(directory, *rel_path.split("/")))
+    if visited_dirs is not None:
+        visited_dirs.append(directory)
+        visited_dirs.extend(os.path.join(directory, *d.split("/")) for d in sorted(dirs))
+    return selected
+
+
+def list_changed_files(directory: str, revision_range: str = "") -> Optional[list[str]]:
+    """
+    Return files under ``directory`` changed in git.
+
+    With an empty ``revision_range`` this is every file modified, staged or
+    newly created (untracked, not ignored) relative to ``HEAD``. Otherwise the
+    range is passed to ``git diff`` as-is, e.g. ``main...HEAD`` for the
+    changes of the current branch or ``v1.0 v1.1`` for two refs. Deleted
+    files are skipped. Returns None if git cannot answer the question.
+    """
+    revisions = revision_range.split()
+    if any(rev.startswith("-") for rev in revisions):
+        return None
+    if not os.path.isdir(directory) or not is_inside_work_tree(directory):
+        return None
+    diff = _run_git(
+        directory, "diff", "--name-only", "-z", "--relative", "--diff-filter=d",
+        *(revisions or ["HEAD"]), "--",
+    )
+    if diff is None:
+        return None
+    changed = _split_nul(diff)
+    if not revisions:
+        untracked = _run_git(directory, "ls-files", "-z", "--others", "--exclude-standard")
+        if untracked is None:
+            return None
+        changed.extend(_split_nul(untracked))
+
+    selected: list[str] = []
+    seen: set[str] = set()
+    for rel_path in changed:
+        if rel_path in seen:
+            continue
+        seen.add(rel_path)
+        path = os.path.join(directory, *rel_path.split("/"))
+        # Files changed between refs may no longer exist in the work tree.
+        if revisions and not os.path.isfile(path):
+            continue
+        selected.append(path)
+    return selected
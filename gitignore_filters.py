@@ -0,0 +1,256 @@
+"""Compiled ``.gitignore`` matching used to prune folder walks."""
+from __future__ import annotations
+
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from git_utils import excludes_file
+
+GITIGNORE_FILENAME = ".gitignore"
+
+
+class GitIgnorePattern:
+    """A single compiled line from a ``.gitignore`` style file."""
+
+    __slots__ = ("pattern", "negated", "dir_only", "anchored", "regex")
+
+    def __init__(self, pattern: str, negated: bool, dir_only: bool, anchored: bool):
+        self.pattern = pattern
+        self.negated = negated
+        self.dir_only = dir_only
+        self.anchored = anchored
+        self.regex = re.compile(_translate(pattern))
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        """Match ``rel_path`` (POSIX, relative to the pattern's directory)."""
+        if self.dir_only and not is_dir:
+            return False
+        if self.anchored:
+            return self.regex.fullmatch(rel_path) is not None
+        return self.regex.fullmatch(rel_path.rsplit("/", 1)[-1]) is not None
+
+
+def _translate(pattern: str) -> str:
+    """Convert a gitignore glob into an anchored regular expression."""
+    parts: list[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                j = i + 2
+                if at_start and j < n and pattern[j] == "/":
+                    parts.append("(?:.*/)?")
+                    i = j + 1
+                    continue
+                if at_start and j == n:
+                    parts.append(".*")
+                    i = j
+                    continue
+                parts.append("[^/]*")
+                i = j
+                continue
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                parts.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+
+def parse_gitignore_lines(lines: Iterable[str]) -> tuple[GitIgnorePattern, ...]:
+    """Compile the lines of a ``.gitignore`` file, skipping blanks and comments."""
+    patterns: list[GitIgnorePattern] = []
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if not line or line.startswith("#"):
+            continue
+        # Trailing spaces are ignored unless escaped with a backslash.
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+        if not line:
+            continue
+        negated = False
+        if line.startswith("!"):
+            negated = True
+            line = line[1:]
+        elif line.startswith(("\\!", "\\#")):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        if dir_only:
+            line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if not line:
+            continue
+        patterns.append(GitIgnorePattern(line, negated, dir_only, anchored))
+    return tuple(patterns)
+
+
+@lru_cache(maxsize=1024)
+def _compile_file(path: str, mtime_ns: int, size: int) -> tuple[GitIgnorePattern, ...]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            return parse_gitignore_lines(fh)
+    except OSError:
+        return ()
+
+
+def load_gitignore_file(path: str) -> tuple[GitIgnorePattern, ...]:
+    """Return the compiled patterns of ``path``; cached until the file changes."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ()
+    return _compile_file(path, st.st_mtime_ns, st.st_size)
+
+
+class GitIgnoreMatcher:
+    """Patterns of one directory, chained to the matcher of its parent."""
+
+    __slots__ = ("base", "patterns", "parent")
+
+    def __init__(
+        self,
+        base: str = "",
+        patterns: tuple[GitIgnorePattern, ...] = (),
+        parent: Optional["GitIgnoreMatcher"] = None,
+    ):
+        self.base = base
+        self.patterns = patterns
+        self.parent = parent
+
+    def child(self, base: str, patterns: tuple[GitIgnorePattern, ...]) -> "GitIgnoreMatcher":
+        """Return the matcher for a subdirectory; reuses ``self`` when it adds nothing."""
+        if not patterns:
+            return self
+        return GitIgnoreMatcher(base, patterns, self)
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Check ``rel_path`` (POSIX, relative to the work tree root).
+
+        Deeper files take precedence over shallower ones and, within a file,
+        the last matching pattern wins, mirroring git.
+        """
+        matcher: Optional[GitIgnoreMatcher] = self
+        while matcher is not None:
+            if matcher.patterns:
+                if matcher.base:
+                    prefix = matcher.base + "/"
+                    if not rel_path.startswith(prefix):
+                        matcher = matcher.parent
+                        continue
+                    local = rel_path[len(prefix):]
+                else:
+                    local = rel_path
+                for pattern in reversed(matcher.patterns):
+                    if pattern.matches(local, is_dir):
+                        return not pattern.negated
+            matcher = matcher.parent
+        return False
+
+
+def find_worktree_root(directory: str) -> Optional[str]:
+    """Return the closest ancestor of ``directory`` containing ``.git``."""
+    current = os.path.abspath(directory)
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def to_posix_relpath(path: str, start: str) -> str:
+    rel = os.path.relpath(path, start)
+    if rel == ".":
+        return ""
+    return rel.replace(os.sep, "/")
+
+
+@lru_cache(maxsize=64)
+def _excludes_file(root: str) -> str:
+    # One git process per work tree; the file's contents are still re-read
+    # whenever it changes.
+    return excludes_file(root)
+
+
+def inherited_ignore_files(directory: str) -> tuple[str, list[tuple[str, str]]]:
+    """Return the work tree root and the ``(base, path)`` ignore files above ``directory``.
+
+    In increasing precedence: ``core.excludesFile``, ``.git/info/exclude`` and
+    the ``.gitignore`` of every ancestor inside the work tree. The files need
+    not exist; ``directory``'s own ``.gitignore`` is not included.
+    """
+    directory = os.path.abspath(directory)
+    worktree = find_worktree_root(directory)
+    root = worktree or directory
+    files: list[tuple[str, str]] = []
+    if worktree is not None:
+        files.append(("", _excludes_file(worktree)))
+    files.append(("", os.path.join(root, ".git", "info", "exclude")))
+    rel = to_posix_relpath(directory, root)
+    if rel:
+        current = root
+        base_parts: list[str] = []
+        for part in [""] + rel.split("/")[:-1]:
+            if part:
+                current = os.path.join(current, part)
+                base_parts.append(part)
+            files.append(("/".join(base_parts), os.path.join(current, GITIGNORE_FILENAME)))
+    return root, files
+
+
+def matcher_for_directory(directory: str) -> tuple[GitIgnoreMatcher, str]:
+    """Build the inherited matcher for ``directory`` and return it with its base.
+
+    The files of :func:`inherited_ignore_files` are applied; ``directory``'s
+    own ``.gitignore`` is left for the walker, which loads it while descending.
+    """
+    root, files = inherited_ignore_files(directory)
+    matcher = GitIgnoreMatcher()
+    for base, path in files:
+        matcher = matcher.child(base, load_gitignore_file(path))
+    return matcher, root
+
+
+def is_path_ignored(path: str, is_dir: bool) -> bool:
+    """Check a single path against every ignore file that applies to it."""
+    parent = os.path.dirname(os.path.abspath(path))
+    matcher, root = matcher_for_directory(parent)
+    rel_parent = to_posix_relpath(parent, root)
+    matcher = matcher.child(
+        rel_parent, load_gitignore_file(os.path.join(parent, GITIGNORE_FILENAME))
+    )
+    name = os.path.basename(path)
+    if is_dir and name == ".git":
+        return True
+    return matcher.is_ignored(f"{rel_parent}/{name}" if rel_parent else name, is_dir)
@@ -0,0 +1,152 @@
+# listing_cache.py
+from __future__ import annotations
+import os
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from PyQt5.QtCore import QObject, QFileSystemWatcher
+
+from gitignore_filters import GITIGNORE_FILENAME, inherited_ignore_files
+from utils import list_files
+
+ListingKey = Tuple[str, Tuple[str, ...], FrozenSet[str], bool]
+
+# inotify watches are a per-user resource; leave room for other applications.
+DEFAULT_MAX_WATCHED_DIRS = 8192
+
+
+class DirectoryListingCache(QObject):
+    """
+    Shared cache of :func:`utils.list_files` results.
+
+    Entries are keyed by (root, extension filters, ignore set, gitignore flag)
+    and every directory of a cached walk is watched; any change inside one of
+    them drops the entries that walked it. Gitignore-aware entries also watch
+    the ignore files inherited from above the root. Trees too large to watch
+    within ``max_watched_dirs`` are listed but not cached.
+    """
+
+    def __init__(self, max_watched_dirs: int = DEFAULT_MAX_WATCHED_DIRS, parent=None):
+        super().__init__(parent)
+        self.max_watched_dirs = max_watched_dirs
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self.invalidate_directory)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._entries: Dict[ListingKey, List[str]] = {}
+        self._dirs: Dict[ListingKey, List[str]] = {}
+        self._paths_by_key: Dict[ListingKey, Set[str]] = {}
+        self._keys_by_path: Dict[str, Set[ListingKey]] = {}
+
+    @staticmethod
+    def _normalize_dir(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def _make_key(
+        self,
+        directory: str,
+        extensions: Optional[list[str]],
+        ignore_folders: Optional[Set[str]],
+        respect_gitignore: bool,
+    ) -> ListingKey:
+        return (
+            self._normalize_dir(directory),
+            tuple(sorted({ext.lower() for ext in extensions or ()})),
+            frozenset(ignore_folders or ()),
+            bool(respect_gitignore),
+        )
+
+    def list_files(
+        self,
+        directory: str,
+        extensions: Optional[list[str]] = None,
+        ignore_folders: Optional[Set[str]] = None,
+        respect_gitignore: bool = False,
+        visited_dirs: Optional[list[str]] = None,
+    ) -> list[str]:
+        key = self._make_key(directory, extensions, ignore_folders, respect_gitignore)
+        cached = self._entries.get(key)
+        if cached is not None:
+            if visited_dirs is not None:
+                visited_dirs.extend(self._dirs[key])
+            return list(cached)
+
+        visited: list[str] = []
+        files = list_files(
+            directory,
+            extensions,
+            ignore_folders,
+            respect_gitignore=respect_gitignore,
+            visited_dirs=visited,
+        )
+        if visited_dirs is not None:
+            visited_dirs.extend(visited)
+        watch_paths = {self._normalize_dir(d) for d in visited}
+        if respect_gitignore:
+            watch_paths.update(
+                os.path.join(d, GITIGNORE_FILENAME)
+                for d in list(watch_paths)
+                if os.path.isfile(os.path.join(d, GITIGNORE_FILENAME))
+            )
+            watch_paths.update(self._inherited_watch_paths(directory))
+        if self._watch(key, watch_paths):
+            self._entries[key] = files
+            self._dirs[key] = visited
+        return list(files)
+
+    def _inherited_watch_paths(self, directory: str) -> Set[str]:
+        """Ignore files above ``directory``, or the folder a missing one would appear in."""
+        paths: Set[str] = set()
+        for _, path in inherited_ignore_files(directory)[1]:
+            if os.path.isfile(path):
+                paths.add(self._normalize_dir(path))
+            elif os.path.isdir(os.path.dirname(path)):
+                paths.add(self._normalize_dir(os.path.dirname(path)))
+        return paths
+
+    def _on_file_changed(self, path: str) -> None:
+        self.invalidate_directory(path)
+        self.invalidate_directory(os.path.dirname(path))
+
+    def _watch(self, key: ListingKey, paths: Set[str]) -> bool:
+        new_paths = [p for p in paths if p not in self._keys_by_path]
+        if len(self._keys_by_path) + len(new_paths) > self.max_watched_dirs:
+            return False
+        if new_paths:
+            failed = set(self._watcher.addPaths(new_paths))
+            if failed:
+                self._unwatch([p for p in new_paths if p not in failed])
+                return False
+        for path in paths:
+            self._keys_by_path.setdefault(path, set()).add(key)
+        self._paths_by_key[key] = paths
+        return True
+
+    def _unwatch(self, paths: Iterable[str]) -> None:
+        paths = list(paths)
+        if paths:
+            self._watcher.removePaths(paths)
+
+    def _drop(self, key: ListingKey) -> None:
+        self._entries.pop(key, None)
+        self._dirs.pop(key, None)
+        orphaned: list[str] = []
+        for path in self._paths_by_key.pop(key, ()):
+            keys = self._keys_by_path.get(path)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_path[path]
+                orphaned.append(path)
+        self._unwatch(orphaned)
+
+    def invalidate_directory(self, path: str) -> None:
+        """Forget every cached listing that walked ``path`` or depends on it."""
+        keys = self._keys_by_path.get(self._normalize_dir(path))
+        for key in list(keys or ()):
+            self._drop(key)
+
+    def clear(self) -> None:
+        for key in list(self._paths_by_key):
+            self._drop(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -4,9 +4,21 @@ from PyQt5.QtCore import QSize, Qt
 import platform
 
 from app_context import AppContext
+from session_store import WorkspaceSession
 from utils import resource_path
 from main_window_styles import apply_app_palette, update_tab_close_buttons, enable_os_override_title_bar
 
+class _PendingWorkspace(QWidget):
+    """Stand-in for a restored workspace until its tab is first shown."""
+
+    def __init__(self, session: WorkspaceSession, parent=None):
+        super().__init__(parent)
+        self.session = session
+
+    def session_state(self):
+        return self.session.state
+
+
 class MainWindow(QMainWindow):
     def __init__(self, ctx: AppContext):
         super().__init__()
@@ -42,8 +54,9 @@ class MainWindow(QMainWindow):
         self.workspace_counter = 0
 
         self.settings_tab = SettingsTab(self.ctx)  # pass context, not main_window
-        self.add_workspace_tab()
         self.tabs.addTab(self.settings_tab, "Settings")
+        self._restore_session()
+        self.tabs.currentChanged.connect(self._materialize_workspace)
         update_tab_close_buttons(self.tabs, self.settings_tab, self._close_workspace_widget)
 
         layout = QVBoxLayout()
@@ -64,24 +77,77 @@ class MainWindow(QMainWindow):
         self._redraw_tabs()
 
     # ---- UI plumbing only ----
-    def add_workspace_tab(self):
+    def _create_workspace_tab(self):
         tab_cls = getattr(self, "_concatenator_tab_cls", None)
         if tab_cls is None:
             from concatenator_tab import ConcatenatorTab as tab_cls
             self._concatenator_tab_cls = tab_cls
-        new_tab = tab_cls(self.ctx)  # pass context
-        self.workspace_tabs.append(new_tab)
-        self.workspace_counter += 1
-        title = f"Workspace {self.workspace_counter}"
+        return tab_cls(self.ctx)  # pass context
+
+    def _insert_workspace(self, widget: QWidget, title: str) -> int:
+        self.workspace_tabs.append(widget)
         settings_index = self.tabs.indexOf(self.settings_tab) if self.settings_tab else -1
         if settings_index >= 0:
-            index = self.tabs.insertTab(settings_index, new_tab, title)
-        else:
-            index = self.tabs.addTab(new_tab, title)
+            return self.tabs.insertTab(settings_index, widget, title)
+        return self.tabs.addTab(widget, title)
+
+    def add_workspace_tab(self):
+        new_tab = self._create_workspace_tab()
+        self.workspace_counter += 1
+        index = self._insert_workspace(new_tab, f"Workspace {self.workspace_counter}")
         self.tabs.setCurrentIndex(index)
         update_tab_close_buttons(self.tabs, self.settings_tab, self._close_workspace_widget)
         return new_tab
 
+    # ---- session ----
+    def _restore_session(self) -> None:
+        """
+        Recreate the saved workspaces. Only the current one is built now;
+        the others stay placeholders until their tab is first activated.
+        """
+        store = getattr(self.ctx, "sessions", None)
+        workspaces, current = store.load() if store is not None else ([], 0)
+        if not workspaces:
+            self.add_workspace_tab()
+            return
+        for session in workspaces:
+            self._insert_workspace(_PendingWorkspace(session), session.title)
+        self.workspace_counter = len(workspaces)
+        self.tabs.setCurrentIndex(current)
+        self._materialize_workspace(current)
+
+    def _materialize_workspace(self, index: int) -> None:
+        placeholder = self.tabs.widget(index)
+        if not isinstance(placeholder, _PendingWorkspace):
+            return
+        tab = self._create_workspace_tab()
+        tab.load_session_state(placeholder.session.state)
+        self.workspace_tabs[self.workspace_tabs.index(placeholder)] = tab
+        self.tabs.blockSignals(True)
+        try:
+            self.tabs.removeTab(index)
+            self.tabs.insertTab(index, tab, placeholder.session.title)
+            self.tabs.setCurrentIndex(index)
+        finally:
+            self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+        update_tab_close_buttons(self.tabs, self.settings_tab, self._close_workspace_widget)
+
+    def save_session(self) -> None:
+        store = getattr(self.ctx, "sessions", None)
+        if store is None:
+            return
+        workspaces = [
+            WorkspaceSession(self.tabs.tabText(self.tabs.indexOf(tab)), tab.session_state())
+            for tab in self.workspace_tabs
+        ]
+        current = self.tabs.currentWidget()
+        index = self.workspace_tabs.index(current) if current in self.workspace_tabs else 0
+        try:
+            store.save(workspaces, index)
+        except OSError as exc:
+            QMessageBox.warning(self, "Save Workspaces", f"Could not save the open workspaces.\n{exc}")
+
     def close_workspace_tab(self, index: int) -> None:
         widget = self.tabs.widget(index)
         if widget is None or widget is self.settings_tab:
@@ -122,6 +188,8 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         try:
+            self.save_session()
             self.ctx.ssh.disconnect()
+            self.ctx.ssh_hosts.close()
         finally:
             super().closeEvent(event)
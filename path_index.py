@@ -0,0 +1,275 @@
+"""Searchable index of every file under a folder, built off the GUI thread."""
+from __future__ import annotations
+
+import os
+import re
+import time
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from git_utils import list_git_files
+from utils import list_files
+
+DEFAULT_RESULT_LIMIT = 200
+STALE_AFTER_SECONDS = 30.0
+MAX_CACHED_INDEXES = 4
+# Lines per block of the prefilter: a block is only scanned when its
+# characters (fuzzy queries) or hashed adjacent pairs (substrings) cover
+# those of the query
+BLOCK_LINES = 64
+PAIR_MASK_BITS = 1024
+
+
+def _line_starts(lines: list[str]) -> list[int]:
+    """Offsets of each line in ``"\\n".join(lines)``."""
+    return [0, *accumulate(len(line) + 1 for line in lines)][:len(lines)]
+
+
+def _char_mask(chars) -> int:
+    mask = 0
+    for ch in chars:
+        mask |= 1 << min(ord(ch), 127)
+    return mask
+
+
+def _pair_mask(pairs) -> int:
+    mask = 0
+    for pair in pairs:
+        mask |= 1 << (hash(pair) & PAIR_MASK_BITS - 1)
+    return mask
+
+
+class PathIndex:
+    """
+    Files under ``root`` prepared for fast picker queries.
+
+    Lowercased relative paths and base names are each joined into one
+    newline separated string, so a query is answered by ``str.find`` and
+    a single regular expression running over that text in C instead of a
+    Python loop over every path. Results are capped at ``limit``: base name
+    substring hits come first, then path substring hits; only when nothing
+    matches literally are fuzzy (ordered subsequence) matches returned.
+
+    Only blocks of lines whose characters (or adjacent character pairs, for
+    substrings) cover the query are scanned, and a query that extends the
+    previous one re-checks the previous hits when those were complete.
+    """
+
+    def __init__(self, root: str, paths: Iterable[str]):
+        self.root = root
+        self.paths = list(paths)
+        prefix = os.path.join(os.path.normpath(root), "")
+        rel_paths = [
+            (p[len(prefix):] if p.startswith(prefix) else os.path.relpath(p, root))
+            .replace(os.sep, "/")
+            for p in self.paths
+        ]
+        self.rel_paths = rel_paths
+        keys = [rel.lower() for rel in rel_paths]
+        names = [key.rpartition("/")[2] for key in keys]
+        self._keys = "\n".join(keys)
+        self._key_starts = _line_starts(keys)
+        self._names = "\n".join(names)
+        self._name_starts = _line_starts(names)
+        # Per block of lines: span in the key and name texts, character mask
+        # and adjacent pair mask of the keys
+        self._blocks: list[tuple[int, int, int, int, int, int]] = []
+        for first in range(0, len(keys), BLOCK_LINES):
+            last = first + BLOCK_LINES
+            start = self._key_starts[first]
+            end = self._key_starts[last] if last < len(keys) else len(self._keys)
+            name_start = self._name_starts[first]
+            name_end = self._name_starts[last] if last < len(names) else len(self._names)
+            text = self._keys[start:end]
+            self._blocks.append((
+                start, end, name_start, name_end,
+                _char_mask(set(text)), _pair_mask(set(zip(text, text[1:]))),
+            ))
+        # Previous query, its hits, whether they were fuzzy, whether complete
+        self._last: tuple[str, list[int], bool, bool] = ("", [], False, False)
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _line(self, text: str, starts: list[int], line: int) -> str:
+        end = starts[line + 1] - 1 if line + 1 < len(starts) else len(text)
+        return text[starts[line]:end]
+
+    @staticmethod
+    def _fuzzy_pattern(query: str):
+        # "a[^b\n]*b[^c\n]*c": each character is taken at its first
+        # occurrence after the previous one, which is enough to decide
+        # whether the query is a subsequence of the line.
+        return re.compile(
+            re.escape(query[0])
+            + "".join(f"[^{re.escape(ch)}\n]*{re.escape(ch)}" for ch in query[1:])
+        )
+
+    def search(self, query: str, limit: int = DEFAULT_RESULT_LIMIT) -> list[int]:
+        """Return the positions of up to ``limit`` paths matching ``query``."""
+        query = "".join(query.lower().split()).replace("\\", "/")
+        if not query or not self.paths:
+            return []
+        last_query, last_hits, last_fuzzy, complete = self._last
+        hits: list[int] = []
+        fuzzy = last_fuzzy
+        if complete and last_query and query.startswith(last_query):
+            # Typing on: every match of the longer query was a match of the
+            # previous one, and that result was not cut off at the limit.
+            hits = self._rank(query, last_hits, fuzzy)
+        if not hits:
+            hits, fuzzy = self._scan(query, limit)
+        self._last = (query, hits, fuzzy, len(hits) < limit)
+        return hits[:limit]
+
+    def _rank(self, query: str, lines: list[int], fuzzy: bool) -> list[int]:
+        if fuzzy:
+            match = self._fuzzy_pattern(query).search
+            return [line for line in lines if match(self._line(self._keys, self._key_starts, line))]
+        by_name, by_path = [], []
+        for line in lines:
+            key = self._line(self._keys, self._key_starts, line)
+            if query in key.rpartition("/")[2]:
+                by_name.append(line)
+            elif query in key:
+                by_path.append(line)
+        return by_name + by_path
+
+    def _scan(self, query: str, limit: int) -> tuple[list[int], bool]:
+        hits: list[int] = []
+        seen: set[int] = set()
+
+        def scan_blocks(text: str, starts: list[int], spans, find) -> bool:
+            for start, end in spans:
+                pos = find(text, start, end)
+                while pos >= 0:
+                    line = bisect_right(starts, pos) - 1
+                    if line not in seen:
+                        seen.add(line)
+                        hits.append(line)
+                        if len(hits) >= limit:
+                            return True
+                    if line + 1 >= len(starts):
+                        break
+                    pos = find(text, starts[line + 1], end)
+            return False
+
+        def substring(text: str, pos: int, end: int) -> int:
+            return text.find(query, pos, end)
+
+        chars = _char_mask(query)
+        pairs = _pair_mask(zip(query, query[1:]))
+        candidates = [b for b in self._blocks if b[4] & chars == chars and b[5] & pairs == pairs]
+        if scan_blocks(self._names, self._name_starts, [(b[2], b[3]) for b in candidates], substring):
+            return hits, False
+        scan_blocks(self._keys, self._key_starts, [(b[0], b[1]) for b in candidates], substring)
+        if hits:
+            return hits, False
+
+        pattern = self._fuzzy_pattern(query)
+
+        def fuzzy(text: str, pos: int, end: int) -> int:
+            match = pattern.search(text, pos, end)
+            return match.start() if match else -1
+
+        spans = [(b[0], b[1]) for b in self._blocks if b[4] & chars == chars]
+        scan_blocks(self._keys, self._key_starts, spans, fuzzy)
+        return hits, True
+
+
+def build_path_index(
+    root: str,
+    ignore_folders: Optional[Set[str]] = None,
+    respect_gitignore: bool = False,
+    use_git_index: bool = False,
+) -> PathIndex:
+    files = list_git_files(root, None, ignore_folders) if use_git_index else None
+    if files is None:
+        files = list_files(root, None, ignore_folders, respect_gitignore=respect_gitignore)
+    return PathIndex(root, files)
+
+
+class _IndexTask(QRunnable):
+    def __init__(self, key, build: Callable[[], PathIndex], done):
+        super().__init__()
+        self._key = key
+        self._build = build
+        self._done = done
+
+    def run(self):
+        try:
+            index = self._build()
+        except Exception:  # an unreadable tree yields an empty index
+            index = PathIndex(self._key[0], [])
+        self._done.emit(self._key, index)
+
+
+class PathIndexService(QObject):
+    """
+    Keeps the most recently used path indexes and rebuilds them in the
+    background.
+
+    :meth:`index_for` answers immediately with whatever is cached, even if it
+    is a little old, and starts a rebuild when there is no index yet or the
+    cached one is older than ``stale_after`` seconds. ``indexReady`` fires on
+    the GUI thread when a build finishes.
+    """
+
+    indexReady = pyqtSignal(object)  # PathIndex
+    _built = pyqtSignal(object, object)
+
+    def __init__(self, stale_after: float = STALE_AFTER_SECONDS, parent=None):
+        super().__init__(parent)
+        self._stale_after = stale_after
+        self._indexes: Dict[tuple, PathIndex] = {}
+        self._building: Set[tuple] = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._built.connect(self._store)
+
+    @staticmethod
+    def _key(root, ignore_folders, respect_gitignore, use_git_index) -> tuple:
+        return (
+            os.path.normcase(os.path.abspath(root)),
+            frozenset(ignore_folders or ()),
+            bool(respect_gitignore),
+            bool(use_git_index),
+        )
+
+    def index_for(
+        self,
+        root: str,
+        ignore_folders: Optional[Set[str]] = None,
+        respect_gitignore: bool = False,
+        use_git_index: bool = False,
+    ) -> Optional[PathIndex]:
+        key = self._key(root, ignore_folders, respect_gitignore, use_git_index)
+        index = self._indexes.get(key)
+        fresh = index is not None and time.monotonic() - index.built_at < self._stale_after
+        if not fresh and key not in self._building:
+            self._building.add(key)
+            build = lambda: build_path_index(root, ignore_folders, respect_gitignore, use_git_index)
+            self._pool.start(_IndexTask(key, build, self._built))
+        return index
+
+    def is_building(self, root: str) -> bool:
+        root = os.path.normcase(os.path.abspath(root))
+        return any(key[0] == root for key in self._building)
+
+    def _store(self, key: tuple, index: PathIndex) -> None:
+        self._building.discard(key)
+        self._indexes.pop(key, None)
+        self._indexes[key] = index
+        while len(self._indexes) > MAX_CACHED_INDEXES:
+            del self._indexes[next(iter(self._indexes))]
+        self.indexReady.emit(index)
+
+    def clear(self) -> None:
+        self._indexes.clear()
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
@@ -0,0 +1,217 @@
+"""Remote file contents kept on disk between runs."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from dataclasses import astuple, dataclass
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QStandardPaths
+
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+DEFAULT_MAX_MB = 512
+COMPRESS_LEVEL = 1
+
+
+def default_cache_dir() -> str:
+    base = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    return os.path.join(base, "Dynamint", "FileConcatenator", "remote_content")
+
+
+@dataclass
+class _Entry:
+    host: str
+    path: str
+    size: int
+    mtime: float
+    stored: int  # bytes on disk
+    compressed: bool
+    used: float
+
+
+class RemoteContentCache:
+    """
+    Least recently used cache of remote file contents, on disk.
+
+    An entry is keyed by host and path and is only returned while the
+    caller's ``size`` and ``mtime`` (from a batched stat) still match, so a
+    changed file is never served. Contents are compressed when that saves
+    space, and the oldest entries are evicted once the stored bytes exceed
+    ``max_bytes``. The index is written by :meth:`flush`; content files
+    the index does not know (left by a crash) are deleted on load.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, compress: bool = True):
+        self._directory = directory
+        self._max_bytes = max(0, max_bytes)
+        self._compress = compress
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, _Entry]] = None
+        self._bytes = 0
+        self._dirty = False
+
+    @property
+    def directory(self) -> str:
+        if self._directory is None:
+            self._directory = default_cache_dir()
+        return self._directory
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load()
+            return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    def set_limits(self, max_bytes: int, compress: bool) -> None:
+        with self._lock:
+            self._max_bytes = max(0, max_bytes)
+            self._compress = compress
+            self._load()
+            self._evict()
+
+    @staticmethod
+    def _key(host: str, path: str) -> str:
+        return hashlib.sha1(f"{host}\0{path}".encode("utf-8")).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load(self) -> Dict[str, _Entry]:
+        if self._entries is not None:
+            return self._entries
+        entries: Dict[str, _Entry] = {}
+        try:
+            with open(os.path.join(self.directory, INDEX_FILENAME), "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if data.get("version") == INDEX_VERSION:
+                for key, fields in data.get("entries", {}).items():
+                    entries[key] = _Entry(*fields)
+        except (OSError, ValueError, TypeError, AttributeError):
+            entries = {}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        on_disk = set(names)
+        for key in [k for k in entries if k not in on_disk]:
+            del entries[key]
+        for name in on_disk - set(entries) - {INDEX_FILENAME}:
+            try:
+                os.remove(self._file(name))
+            except OSError:
+                pass
+        self._entries = entries
+        self._bytes = sum(e.stored for e in entries.values())
+        self._evict()
+        return entries
+
+    def get(self, host: str, path: str, size: int, mtime: float) -> Optional[bytes]:
+        """Cached contents of ``path`` if it still has this size and mtime."""
+        if not self.enabled:
+            return None
+        key = self._key(host, path)
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is None or (entry.size, entry.mtime) != (size, mtime):
+                return None
+            try:
+                with open(self._file(key), "rb") as fh:
+                    raw = fh.read()
+                data = zlib.decompress(raw) if entry.compressed else raw
+            except (OSError, zlib.error):
+                self._drop(key)
+                return None
+            if len(data) != size:
+                self._drop(key)
+                return None
+            entry.used = time.time()
+            self._dirty = True
+            return data
+
+    def put(self, host: str, path: str, size: int, mtime: float, data: bytes) -> None:
+        if not self.enabled or len(data) != size:
+            return  # changed between the stat and the read
+        raw = data
+        compressed = False
+        if self._compress:
+            packed = zlib.compress(data, COMPRESS_LEVEL)
+            if len(packed) < len(data):
+                raw, compressed = packed, True
+        if len(raw) > self._max_bytes:
+            return
+        key = self._key(host, path)
+        with self._lock:
+            self._load()
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = self._file(key) + ".tmp"
+            try:
+                with open(temp_path, "wb") as fh:
+                    fh.write(raw)
+                os.replace(temp_path, self._file(key))
+            except OSError:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.stored
+            self._entries[key] = _Entry(host, path, size, mtime, len(raw), compressed, time.time())
+            self._bytes += len(raw)
+            self._dirty = True
+            self._evict()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.stored
+        self._dirty = True
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        if self._bytes <= self._max_bytes:
+            return
+        for key, _entry in sorted(self._entries.items(), key=lambda item: item[1].used):
+            if self._bytes <= self._max_bytes:
+                break
+            self._drop(key)
+
+    def flush(self) -> None:
+        """Write the index if entries were added, used or dropped."""
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            data = {
+                "version": INDEX_VERSION,
+                "entries": {key: astuple(entry) for key, entry in self._entries.items()},
+            }
+            index_path = os.path.join(self.directory, INDEX_FILENAME)
+            temp_path = index_path + ".tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as fh:
+                    json.dump(data, fh, separators=(",", ":"))
+                os.replace(temp_path, index_path)
+            except OSError:
+                return
+            self._dirty = False
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._load()):
+                self._drop(key)
+        self.flush()
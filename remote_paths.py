@@ -0,0 +1,69 @@
+"""Host profiles and host-qualified remote paths such as ``build1:/srv/app.py``."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+# At least two characters before the colon, so "C:/src" stays a drive path
+_HOST_PATH_RE = re.compile(r"^([A-Za-z0-9][A-Za-z0-9_.-]+):(/.*)$")
+_PROFILE_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]+$")
+
+
+@dataclass(frozen=True)
+class HostProfile:
+    name: str
+    host: str
+    username: str
+
+
+def split_host_path(path: str) -> Optional[tuple[str, str]]:
+    """``(profile name, path on the host)`` of a qualified path, else None."""
+    match = _HOST_PATH_RE.match(path or "")
+    if match is None:
+        return None
+    return match.group(1), match.group(2)
+
+
+def join_host_path(name: str, path: str) -> str:
+    return f"{name}:{path}"
+
+
+def is_host_path(path: str) -> bool:
+    return split_host_path(path) is not None
+
+
+def parse_host_profiles(text: str) -> Dict[str, HostProfile]:
+    """
+    Profiles from ``name=user@host`` entries separated by commas or newlines.
+
+    Malformed entries are skipped; a repeated name keeps its last entry.
+    """
+    profiles: Dict[str, HostProfile] = {}
+    for entry in re.split(r"[,\n]", text or ""):
+        name, sep, target = entry.partition("=")
+        username, at, host = target.strip().rpartition("@")
+        name = name.strip()
+        if not (sep and at and username and host) or not _PROFILE_NAME_RE.match(name):
+            continue
+        profiles[name] = HostProfile(name, host.strip(), username.strip())
+    return profiles
+
+
+def format_host_profiles(profiles: Mapping[str, HostProfile]) -> str:
+    return ", ".join(f"{p.name}={p.username}@{p.host}" for p in profiles.values())
+
+
+def remote_target(path: str, ssh_manager=None, ssh_hosts=None):
+    """
+    The manager that serves ``path`` and the path on its host, or None.
+
+    With a host registry, qualified paths go to their profile's connection
+    and plain absolute paths to the default one. Without it, absolute paths
+    are remote while ``ssh_manager`` has a session.
+    """
+    if ssh_hosts is not None:
+        return ssh_hosts.resolve(path)
+    if ssh_manager is not None and ssh_manager.has_session() and path.startswith("/"):
+        return ssh_manager, path
+    return None
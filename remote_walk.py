@@ -0,0 +1,192 @@
+"""Recursive listing of folders on the SSH host, streamed off the GUI thread."""
+from __future__ import annotations
+
+import fnmatch
+import posixpath
+import stat
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Dict, Optional, Set
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from gitignore_filters import GITIGNORE_FILENAME, GitIgnoreMatcher, parse_gitignore_lines
+
+# Directories listed at once; each listing borrows one pooled SFTP session
+LISTING_WORKERS = 4
+MAX_CONCURRENT_WALKS = 2
+
+
+def _list_directory(ssh_manager, path: str, read_gitignore: bool):
+    """Entries of ``path`` and, when asked, the patterns of its ``.gitignore``."""
+    with ssh_manager.sftp_session() as sftp:
+        entries = sftp.listdir_attr(path)
+        patterns = ()
+        if read_gitignore and any(
+            e.filename == GITIGNORE_FILENAME and not stat.S_ISDIR(e.st_mode or 0) for e in entries
+        ):
+            try:
+                with sftp.open(posixpath.join(path, GITIGNORE_FILENAME), "rb") as fh:
+                    text = fh.read().decode("utf-8", errors="replace")
+                patterns = parse_gitignore_lines(text.splitlines())
+            except OSError:
+                pass
+    return entries, patterns
+
+
+def list_remote_files(
+    ssh_manager,
+    directory: str,
+    extensions: Optional[list[str]] = None,
+    ignore_folders: Optional[Set[str]] = None,
+    respect_gitignore: bool = False,
+    on_batch: Optional[Callable[[list[str]], None]] = None,
+    cancelled: Optional[threading.Event] = None,
+    max_workers: int = LISTING_WORKERS,
+) -> list[str]:
+    """
+    Remote counterpart of :func:`utils.list_files`.
+
+    Up to ``max_workers`` directories are listed concurrently with
+    ``listdir_attr``, so the entry types come with the listing and no file
+    is stat'ed on its own. Ignored folders and, with ``respect_gitignore``,
+    ``.gitignore`` files found during the walk prune the tree before it is
+    descended. Only ``.gitignore`` files at or below ``directory`` are
+    honoured. The files of each directory are passed to ``on_batch`` as
+    soon as it is listed. Unreadable subdirectories are skipped; a failure
+    to list ``directory`` itself is raised.
+    """
+    selected: list[str] = []
+    normalized = [ext.lower() for ext in extensions] if extensions else None
+    root = directory.rstrip("/") or "/"
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        pending = {
+            executor.submit(_list_directory, ssh_manager, root, respect_gitignore): (root, "", GitIgnoreMatcher())
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            if cancelled is not None and cancelled.is_set():
+                for future in pending:
+                    future.cancel()
+                return selected
+            for future in done:
+                path, rel_root, matcher = pending.pop(future)
+                try:
+                    entries, patterns = future.result()
+                except OSError:
+                    if path == root:
+                        raise
+                    continue
+                matcher = matcher.child(rel_root, patterns)
+                prefix = rel_root + "/" if rel_root else ""
+                batch: list[str] = []
+                for entry in sorted(entries, key=lambda e: e.filename):
+                    name = entry.filename
+                    mode = entry.st_mode or 0
+                    if stat.S_ISDIR(mode):
+                        if ignore_folders and any(fnmatch.fnmatch(name, pattern) for pattern in ignore_folders):
+                            continue
+                        if respect_gitignore and (name == ".git" or matcher.is_ignored(prefix + name, True)):
+                            continue
+                        child = executor.submit(
+                            _list_directory, ssh_manager, posixpath.join(path, name), respect_gitignore
+                        )
+                        pending[child] = (posixpath.join(path, name), prefix + name, matcher)
+                        continue
+                    if not stat.S_ISREG(mode):
+                        continue
+                    if respect_gitignore and matcher.is_ignored(prefix + name, False):
+                        continue
+                    if normalized and posixpath.splitext(name)[1].lower() not in normalized:
+                        continue
+                    batch.append(posixpath.join(path, name))
+                if batch:
+                    selected.extend(batch)
+                    if on_batch is not None:
+                        on_batch(batch)
+    return selected
+
+
+class _WalkTask(QRunnable):
+    def __init__(self, walk_id: int, job: Callable[..., list[str]], cancelled: threading.Event, found, done):
+        super().__init__()
+        self._walk_id = walk_id
+        self._job = job
+        self._cancelled = cancelled
+        self._found = found
+        self._done = done
+
+    def run(self):
+        error = ""
+        try:
+            self._job(on_batch=lambda batch: self._found.emit(self._walk_id, batch), cancelled=self._cancelled)
+        except Exception as exc:  # never let a worker die silently
+            error = str(exc) or type(exc).__name__
+        self._done.emit(self._walk_id, error)
+
+
+class RemoteFolderWalker(QObject):
+    """
+    Runs :func:`list_remote_files` on worker threads.
+
+    Each walk gets an id. Files are announced per directory through
+    ``filesFound`` on the GUI thread while the walk continues, then
+    ``finished`` reports the total and an error message (empty on
+    success). Batches of a cancelled walk that are still in flight are
+    dropped.
+    """
+
+    filesFound = pyqtSignal(int, object)  # walk id, list of paths
+    finished = pyqtSignal(int, int, str)  # walk id, files found, error
+    _found = pyqtSignal(int, object)
+    _done = pyqtSignal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._active: Dict[int, threading.Event] = {}
+        self._counts: Dict[int, int] = {}
+        self._next_id = 1
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(MAX_CONCURRENT_WALKS)
+        self._found.connect(self._on_found)
+        self._done.connect(self._on_done)
+
+    def walk(
+        self,
+        ssh_manager,
+        folder: str,
+        extensions: Optional[list[str]] = None,
+        ignore_folders: Optional[Set[str]] = None,
+        respect_gitignore: bool = False,
+    ) -> int:
+        """Start walking ``folder`` and return the id of the walk."""
+        walk_id = self._next_id
+        self._next_id += 1
+        cancelled = threading.Event()
+        self._active[walk_id] = cancelled
+        self._counts[walk_id] = 0
+        job = partial(list_remote_files, ssh_manager, folder, extensions, ignore_folders, respect_gitignore)
+        self._pool.start(_WalkTask(walk_id, job, cancelled, self._found, self._done))
+        return walk_id
+
+    def is_walking(self, walk_id: int) -> bool:
+        return walk_id in self._active
+
+    def cancel(self, walk_id: int) -> None:
+        cancelled = self._active.pop(walk_id, None)
+        if cancelled is not None:
+            cancelled.set()
+            del self._counts[walk_id]
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _on_found(self, walk_id: int, batch: list[str]) -> None:
+        if walk_id in self._active:
+            self._counts[walk_id] += len(batch)
+            self.filesFound.emit(walk_id, batch)
+
+    def _on_done(self, walk_id: int, error: str) -> None:
+        if self._active.pop(walk_id, None) is not None:
+            self.finished.emit(walk_id, self._counts.pop(walk_id), error)
@@ -0,0 +1,90 @@
+"""Workspace tabs saved between runs in a small gzip compressed JSON file."""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from PyQt5.QtCore import QStandardPaths
+
+from tab_history import TabState
+
+SESSION_FILENAME = "session.json.gz"
+SESSION_VERSION = 1
+
+
+@dataclass(frozen=True)
+class WorkspaceSession:
+    title: str
+    state: TabState
+
+
+def default_session_path() -> str:
+    base = QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation)
+    return os.path.join(base, "Dynamint", "FileConcatenator", SESSION_FILENAME)
+
+
+def _state_from_dict(data: dict) -> TabState:
+    return TabState(
+        files=tuple(data.get("files", ())),
+        root_path=data.get("root_path"),
+        include_root=bool(data.get("include_root", False)),
+        prefix=data.get("prefix", ""),
+        suffix=data.get("suffix", ""),
+        preset=data.get("preset", "Markdown"),
+        folder_sources=tuple(data.get("folder_sources", ())),
+    )
+
+
+class SessionStore:
+    """
+    Reads and writes the open workspaces.
+
+    Paths are stored exactly as the workspace holds them, already
+    normalized and deduplicated, so a restore can take them as they are.
+    Writes go to a temporary file that replaces the session atomically.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            self._path = default_session_path()
+        return self._path
+
+    def load(self) -> tuple[list[WorkspaceSession], int]:
+        """Saved workspaces and the index of the current one; empty if unreadable."""
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, EOFError, ValueError):
+            return [], 0
+        if not isinstance(data, dict) or data.get("version") != SESSION_VERSION:
+            return [], 0
+        try:
+            workspaces = [
+                WorkspaceSession(str(item["title"]), _state_from_dict(item["state"]))
+                for item in data.get("workspaces", [])
+            ]
+        except (KeyError, TypeError):
+            return [], 0
+        current = data.get("current", 0)
+        if not isinstance(current, int) or not 0 <= current < len(workspaces):
+            current = 0
+        return workspaces, current
+
+    def save(self, workspaces: list[WorkspaceSession], current: int = 0) -> None:
+        data = {
+            "version": SESSION_VERSION,
+            "current": current,
+            "workspaces": [{"title": w.title, "state": asdict(w.state)} for w in workspaces],
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=6) as fh:
+            json.dump(data, fh, separators=(",", ":"))
+        os.replace(temp_path, self.path)
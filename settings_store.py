@@ -16,14 +16,21 @@ from ignore_filters import (
     get_ignore_set,
     parse_ignore_list,
 )
+from remote_cache import DEFAULT_MAX_MB as DEFAULT_REMOTE_CACHE_MB
+from remote_paths import HostProfile, format_host_profiles, parse_host_profiles
+from tab_history import DEFAULT_MAX_ENTRIES, DEFAULT_MAX_MEMORY_MB
 
 class AppSettings(QObject):
     # High-level signals
     changed = pyqtSignal()
     themeChanged = pyqtSignal(bool)
     sshConfigChanged = pyqtSignal(str, str)               # host, username
+    sshProfilesChanged = pyqtSignal(object)               # profile name -> HostProfile
     extensionFiltersChanged = pyqtSignal(object)          # new filters
     ignoreFiltersChanged = pyqtSignal(object)             # new ignore filters
+    metadataColumnsChanged = pyqtSignal(object)           # visible metadata column names
+    historyLimitsChanged = pyqtSignal(int, int)           # max entries, max memory (MB)
+    remoteCacheChanged = pyqtSignal(int, bool)            # max size (MB), compress
 
     def __init__(self, org: str = "Dynamint", app: str = "FileConcatenator"):
         super().__init__()
@@ -56,14 +63,28 @@ class AppSettings(QObject):
         self.ignore_preset: str = self._qs.value("ignore_preset", DEFAULT_IGNORE_PRESET, type=str)
         self.custom_ignore_list: str = self._qs.value("custom_ignore_list", "", type=str)
         self.ignore_filters: Set[str] = get_ignore_set(self.ignore_preset, self.custom_ignore_list)
+        self.respect_gitignore: bool = self._qs.value("respect_gitignore", False, type=bool)
+        self.use_git_index: bool = self._qs.value("use_git_index", False, type=bool)
         # --- End New ---
 
         self.ssh_host: str = self._qs.value("ssh_host", "", type=str)
         self.ssh_username: str = self._qs.value("ssh_username", "", type=str)
+        self.ssh_profiles: Dict[str, HostProfile] = parse_host_profiles(
+            self._qs.value("ssh_profiles", "", type=str)
+        )
+        self.remote_bulk_fetch: bool = self._qs.value("remote_bulk_fetch", False, type=bool)
+        self.remote_cache_max_mb: int = self._qs.value("remote_cache_max_mb", DEFAULT_REMOTE_CACHE_MB, type=int)
+        self.remote_cache_compress: bool = self._qs.value("remote_cache_compress", True, type=bool)
 
         self.last_preset: str = self._qs.value("last_preset", "Markdown", type=str)
         self.custom_prefix: str = self._qs.value("custom_prefix", "", type=str)
         self.custom_suffix: str = self._qs.value("custom_suffix", "", type=str)
+        columns_text = self._qs.value("metadata_columns", "", type=str)
+        self.metadata_columns: List[str] = [c for c in columns_text.split(",") if c]
+        self.history_max_entries: int = self._qs.value("history_max_entries", DEFAULT_MAX_ENTRIES, type=int)
+        self.history_max_memory_mb: int = self._qs.value(
+            "history_max_memory_mb", DEFAULT_MAX_MEMORY_MB, type=int
+        )
 
     # -------- persist ----------
     def save(self) -> None:
@@ -81,13 +102,22 @@ class AppSettings(QObject):
         # --- New ---
         self._qs.setValue("ignore_preset", self.ignore_preset or DEFAULT_IGNORE_PRESET)
         self._qs.setValue("custom_ignore_list", self.custom_ignore_list or "")
+        self._qs.setValue("respect_gitignore", self.respect_gitignore)
+        self._qs.setValue("use_git_index", self.use_git_index)
         # --- End New ---
 
         self._qs.setValue("ssh_host", self.ssh_host or "")
         self._qs.setValue("ssh_username", self.ssh_username or "")
+        self._qs.setValue("ssh_profiles", format_host_profiles(self.ssh_profiles))
+        self._qs.setValue("remote_bulk_fetch", self.remote_bulk_fetch)
+        self._qs.setValue("remote_cache_max_mb", self.remote_cache_max_mb)
+        self._qs.setValue("remote_cache_compress", self.remote_cache_compress)
         self._qs.setValue("last_preset", self.last_preset or "")
         self._qs.setValue("custom_prefix", self.custom_prefix or "")
         self._qs.setValue("custom_suffix", self.custom_suffix or "")
+        self._qs.setValue("metadata_columns", ",".join(self.metadata_columns))
+        self._qs.setValue("history_max_entries", self.history_max_entries)
+        self._qs.setValue("history_max_memory_mb", self.history_max_memory_mb)
         self.changed.emit()
 
     # -------- setters with signals ----------
@@ -115,6 +145,24 @@ class AppSettings(QObject):
             self.save()
             self.sshConfigChanged.emit(host, username)
 
+    def set_ssh_profiles(self, profiles: Dict[str, HostProfile]):
+        if profiles != self.ssh_profiles:
+            self.ssh_profiles = dict(profiles)
+            self.save()
+            self.sshProfilesChanged.emit(self.ssh_profiles)
+
+    def set_remote_bulk_fetch(self, value: bool):
+        if self.remote_bulk_fetch != value:
+            self.remote_bulk_fetch = value
+            self.save()
+
+    def set_remote_cache(self, max_mb: int, compress: bool):
+        if (max_mb, compress) != (self.remote_cache_max_mb, self.remote_cache_compress):
+            self.remote_cache_max_mb = max_mb
+            self.remote_cache_compress = compress
+            self.save()
+            self.remoteCacheChanged.emit(max_mb, compress)
+
     def set_extension_allow_all(self, value: bool):
         if self.extension_allow_all != value:
             self.extension_allow_all = value
@@ -146,6 +194,17 @@ class AppSettings(QObject):
             else:
                 self.save()
 
+    def set_respect_gitignore(self, value: bool):
+        if self.respect_gitignore != value:
+            self.respect_gitignore = value
+            self.save()
+            self.ignoreFiltersChanged.emit(self.ignore_filters)
+
+    def set_use_git_index(self, value: bool):
+        if self.use_git_index != value:
+            self.use_git_index = value
+            self.save()
+
     def reset_ignore_filters(self):
         self.ignore_preset = DEFAULT_IGNORE_PRESET
         self.custom_ignore_list = ""
@@ -174,6 +233,19 @@ class AppSettings(QObject):
             self.custom_suffix = suffix
             self.save()
 
+    def set_metadata_columns(self, columns: List[str]):
+        if columns != self.metadata_columns:
+            self.metadata_columns = list(columns)
+            self.save()
+            self.metadataColumnsChanged.emit(self.metadata_columns)
+
+    def set_history_limits(self, max_entries: int, max_memory_mb: int):
+        if (max_entries, max_memory_mb) != (self.history_max_entries, self.history_max_memory_mb):
+            self.history_max_entries = max_entries
+            self.history_max_memory_mb = max_memory_mb
+            self.save()
+            self.historyLimitsChanged.emit(max_entries, max_memory_mb)
+
     def _rebuild_filters(self):
         self.extension_filters = build_extension_filters(
             self.extension_categories, self.extension_allow_all, self.extension_groups
@@ -12,6 +12,7 @@ from PyQt5.QtWidgets import (
     QDialog,
     QDialogButtonBox,
     QTextEdit,
+    QSpinBox,
 )
 from PyQt5.QtCore import Qt
 from functools import partial
@@ -22,6 +23,7 @@ from ignore_filters import (
     get_ignore_set,
 )
 from app_context import AppContext
+from remote_paths import format_host_profiles, parse_host_profiles
 
 def default_password_prompt(parent=None, user="", host=""):
     from PyQt5.QtWidgets import QInputDialog, QLineEdit
@@ -37,6 +39,7 @@ class SettingsTab(QWidget):
         # Keep UI in sync with signals (if settings change elsewhere)
         self.ctx.settings.themeChanged.connect(lambda _: self.redraw())
         self.ctx.ssh.statusChanged.connect(self.update_ssh_status)
+        self.ctx.ssh.progress.connect(self.show_ssh_progress)
 
     def init_ui(self):
         outer_layout = QVBoxLayout()
@@ -58,6 +61,27 @@ class SettingsTab(QWidget):
         self.dark_mode_checkbox.stateChanged.connect(lambda s: self.ctx.settings.set_use_dark_mode(s == Qt.Checked))
         inner_layout.addWidget(self.dark_mode_checkbox)
 
+        history_row = QHBoxLayout()
+        history_row.addWidget(QLabel("Undo history limit:"))
+        self.history_entries_spin = QSpinBox()
+        self.history_entries_spin.setRange(2, 10000)
+        self.history_entries_spin.setSuffix(" steps")
+        self.history_entries_spin.setValue(self.ctx.settings.history_max_entries)
+        history_row.addWidget(self.history_entries_spin)
+        self.history_memory_spin = QSpinBox()
+        self.history_memory_spin.setRange(1, 4096)
+        self.history_memory_spin.setSuffix(" MB")
+        self.history_memory_spin.setValue(self.ctx.settings.history_max_memory_mb)
+        history_row.addWidget(self.history_memory_spin)
+        history_row.addStretch()
+        # Apply typed values once editing ends: "500" must not pass through
+        # a limit of 5, which would drop undo entries for good.
+        self.history_entries_spin.setKeyboardTracking(False)
+        self.history_memory_spin.setKeyboardTracking(False)
+        self.history_entries_spin.valueChanged.connect(self.update_history_limits)
+        self.history_memory_spin.valueChanged.connect(self.update_history_limits)
+        inner_layout.addLayout(history_row)
+
         ssh_label = QLabel("SSH Connection:")
         inner_layout.addWidget(ssh_label)
         ssh_row = QHBoxLayout()
@@ -71,6 +95,14 @@ class SettingsTab(QWidget):
         ssh_row.addWidget(self.ssh_user)
         inner_layout.addLayout(ssh_row)
 
+        profiles_row = QHBoxLayout()
+        profiles_row.addWidget(QLabel("Host profiles:"))
+        self.ssh_profiles_field = QLineEdit(format_host_profiles(self.ctx.settings.ssh_profiles))
+        self.ssh_profiles_field.setPlaceholderText("name=user@host, ...  (add files as name:/path)")
+        self.ssh_profiles_field.editingFinished.connect(self.update_ssh_profiles)
+        profiles_row.addWidget(self.ssh_profiles_field)
+        inner_layout.addLayout(profiles_row)
+
         ssh_status_row = QHBoxLayout()
         self.ssh_status_indicator = QLabel("\u25CF")
         self.ssh_status_indicator.setFixedWidth(16)
@@ -80,11 +112,34 @@ class SettingsTab(QWidget):
         ssh_status_row.addStretch()
 
         self.connect_button = QPushButton("Connect")
-        self.connect_button.clicked.connect(self.ctx.ssh.connect)
+        self.connect_button.clicked.connect(self.on_connect_clicked)
         ssh_status_row.addWidget(self.connect_button)
         inner_layout.addLayout(ssh_status_row)
         self.update_ssh_status(self.ctx.ssh.is_connected())
 
+        self.bulk_fetch_checkbox = QCheckBox("Fetch remote files as one archive stream (needs tar on the host)")
+        self.bulk_fetch_checkbox.setChecked(self.ctx.settings.remote_bulk_fetch)
+        self.bulk_fetch_checkbox.stateChanged.connect(lambda s: self.ctx.settings.set_remote_bulk_fetch(s == Qt.Checked))
+        inner_layout.addWidget(self.bulk_fetch_checkbox)
+
+        cache_row = QHBoxLayout()
+        cache_row.addWidget(QLabel("Remote file cache:"))
+        self.remote_cache_spin = QSpinBox()
+        self.remote_cache_spin.setRange(0, 65536)
+        self.remote_cache_spin.setSuffix(" MB")
+        self.remote_cache_spin.setSpecialValueText("Off")
+        self.remote_cache_spin.setValue(self.ctx.settings.remote_cache_max_mb)
+        cache_row.addWidget(self.remote_cache_spin)
+        self.remote_cache_compress_checkbox = QCheckBox("Compress")
+        self.remote_cache_compress_checkbox.setChecked(self.ctx.settings.remote_cache_compress)
+        cache_row.addWidget(self.remote_cache_compress_checkbox)
+        cache_row.addStretch()
+        # Typing "1024" must not evict down to 1 MB on the way
+        self.remote_cache_spin.setKeyboardTracking(False)
+        self.remote_cache_spin.valueChanged.connect(self.update_remote_cache)
+        self.remote_cache_compress_checkbox.stateChanged.connect(self.update_remote_cache)
+        inner_layout.addLayout(cache_row)
+
         # Extension filters
         ext_label = QLabel("File Type Filters:")
         inner_layout.addWidget(ext_label)
@@ -169,6 +224,20 @@ class SettingsTab(QWidget):
         self.custom_ignore_container.setLayout(custom_layout)
         inner_layout.addWidget(self.custom_ignore_container)
 
+        self.gitignore_checkbox = QCheckBox("Respect .gitignore files when adding folders")
+        self.gitignore_checkbox.setChecked(self.ctx.settings.respect_gitignore)
+        self.gitignore_checkbox.stateChanged.connect(
+            lambda s: self.ctx.settings.set_respect_gitignore(s == Qt.Checked)
+        )
+        inner_layout.addWidget(self.gitignore_checkbox)
+
+        self.git_index_checkbox = QCheckBox("List folders inside git repositories with git ls-files")
+        self.git_index_checkbox.setChecked(self.ctx.settings.use_git_index)
+        self.git_index_checkbox.stateChanged.connect(
+            lambda s: self.ctx.settings.set_use_git_index(s == Qt.Checked)
+        )
+        inner_layout.addWidget(self.git_index_checkbox)
+
         self.update_ignore_ui_state()
         # --- End Ignore Filters UI ---
 
@@ -322,13 +391,40 @@ class SettingsTab(QWidget):
         # hook if you later need to restyle per theme
         pass
 
+    def update_history_limits(self, _value=None):
+        self.ctx.settings.set_history_limits(
+            self.history_entries_spin.value(), self.history_memory_spin.value()
+        )
+
+    def update_remote_cache(self, _value=None):
+        self.ctx.settings.set_remote_cache(
+            self.remote_cache_spin.value(), self.remote_cache_compress_checkbox.isChecked()
+        )
+
     def update_ssh_settings(self):
         host = self.ssh_host.text().strip()
         user = self.ssh_user.text().strip()
         self.ctx.settings.set_ssh(host, user)
 
+    def update_ssh_profiles(self):
+        profiles = parse_host_profiles(self.ssh_profiles_field.text())
+        self.ctx.settings.set_ssh_profiles(profiles)
+        self.ssh_profiles_field.setText(format_host_profiles(profiles))
+
+    def on_connect_clicked(self):
+        if self.ctx.ssh.is_connecting():
+            self.ctx.ssh.cancel()
+        else:
+            self.ctx.ssh.connect()
+
+    def show_ssh_progress(self, stage: str):
+        self.ssh_status_indicator.setStyleSheet("color: #ffc107; font-size: 14px; margin-right: 4px;")
+        self.ssh_status_text.setText(f"{stage}\u2026")
+        self.connect_button.setText("Cancel")
+
     def update_ssh_status(self, connected: bool):
         color = "#28a745" if connected else "#dc3545"
         text = "Connected" if connected else "Disconnected"
         self.ssh_status_indicator.setStyleSheet(f"color: {color}; font-size: 14px; margin-right: 4px;")
         self.ssh_status_text.setText(text)
+        self.connect_button.setText("Connect")
@@ -1,65 +1,564 @@
 # ssh_controller.py
 from __future__ import annotations
-from typing import Optional, Callable
-from PyQt5.QtCore import QObject, pyqtSignal
+import socket
+import stat
+import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Mapping, Optional, Callable, Sequence, TypeVar
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 import paramiko
+from paramiko.sftp import CMD_ATTRS, CMD_STAT
+
+from remote_paths import HostProfile, split_host_path
+
+SSH_PORT = 22
+CONNECT_TIMEOUT = 10
+SFTP_POOL_SIZE = 4
+# Outstanding STAT requests per session; keeps replies within the channel window
+STAT_PIPELINE_DEPTH = 128
+# Names are read NUL-separated from stdin; -h sends the targets of symlinks
+ARCHIVE_COMMAND = "tar -chf - --null -T -"
+COMPRESSED_ARCHIVE_COMMAND = "tar -czhf - --null -T -"
+# Files at least this large are read with pipelined requests
+PREFETCH_MIN_BYTES = 256 * 1024
+# An SFTP reply that takes longer than this means the link is gone
+SFTP_TIMEOUT = 30
+# A dropped link is re-established this many times, waiting
+# RECONNECT_INITIAL_DELAY, then twice as long each time up to the maximum
+RECONNECT_ATTEMPTS = 5
+RECONNECT_INITIAL_DELAY = 1.0
+RECONNECT_MAX_DELAY = 16.0
+# Times an idempotent read is repeated after reconnecting
+READ_RETRIES = 2
+# A profile host that could not be reached is not tried again for this long
+ON_DEMAND_RETRY_SECONDS = 30
+
+T = TypeVar("T")
+
+# Progress of a connection attempt, reported in this order
+CONNECT_RESOLVING = "Resolving"
+CONNECT_CONNECTING = "Connecting"
+CONNECT_AUTHENTICATING = "Authenticating"
+
+def _on_gui_thread() -> bool:
+    # The Qt event loop runs on the main thread
+    return threading.current_thread() is threading.main_thread()
 
 class SSHError(Exception):
     pass
 
+class SSHConnectCanceled(SSHError):
+    pass
+
+@dataclass(frozen=True)
+class RemotePathInfo:
+    path: str
+    exists: bool
+    is_dir: bool = False
+    size: int = 0
+    mtime: float = 0.0
+
+    @property
+    def is_file(self) -> bool:
+        return self.exists and not self.is_dir
+
+    @classmethod
+    def from_attributes(cls, path: str, attrs: Optional[paramiko.SFTPAttributes]) -> "RemotePathInfo":
+        if attrs is None:
+            return cls(path, False)
+        return cls(path, True, stat.S_ISDIR(attrs.st_mode or 0), attrs.st_size or 0, attrs.st_mtime or 0.0)
+
+# Paramiko internals pipelined_stat drives; requirements.txt caps paramiko's
+# major version and the plain stat() path covers a release that drops them
+_PIPELINE_CLIENT_ATTRS = ("_async_request", "_read_packet", "_adjust_cwd", "_expecting", "_lock")
+
+def supports_pipelined_stat(sftp) -> bool:
+    return all(hasattr(sftp, name) for name in _PIPELINE_CLIENT_ATTRS) and hasattr(
+        paramiko.SFTPAttributes, "_from_msg"
+    )
+
+def pipelined_stat(sftp: paramiko.SFTPClient, paths: Sequence[str]) -> dict[str, paramiko.SFTPAttributes]:
+    """
+    Stat ``paths`` on one session, sending requests ahead of the replies.
+
+    Paramiko only exposes a blocking ``stat``, so this drives its request
+    plumbing directly, the way ``SFTPFile.prefetch`` does; when those
+    internals are missing it stats one path at a time instead. Paths that
+    are missing or unreadable are left out of the result. On failure the
+    session is closed so it never returns to a pool with replies in flight.
+    """
+    try:
+        if supports_pipelined_stat(sftp):
+            return _pipelined_stat(sftp, paths)
+        return _sequential_stat(sftp, paths)
+    except EOFError as exc:
+        sftp.close()
+        raise SSHError(f"Server connection dropped: {exc}") from exc
+    except BaseException:
+        sftp.close()
+        raise
+
+def _sequential_stat(sftp: paramiko.SFTPClient, paths: Sequence[str]) -> dict[str, paramiko.SFTPAttributes]:
+    found: dict[str, paramiko.SFTPAttributes] = {}
+    for path in paths:
+        try:
+            found[path] = sftp.stat(path)
+        except socket.timeout:
+            raise
+        except IOError:
+            continue
+    return found
+
+def _pipelined_stat(sftp: paramiko.SFTPClient, paths: Sequence[str]) -> dict[str, paramiko.SFTPAttributes]:
+    pending: dict[int, str] = {}
+    found: dict[str, paramiko.SFTPAttributes] = {}
+    queued = iter(paths)
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < STAT_PIPELINE_DEPTH:
+            path = next(queued, None)
+            if path is None:
+                exhausted = True
+                break
+            num = sftp._async_request(type(None), CMD_STAT, sftp._adjust_cwd(path))
+            pending[num] = path
+        if not pending:
+            return found
+        kind, data = sftp._read_packet()
+        msg = paramiko.Message(data)
+        num = msg.get_int()
+        with sftp._lock:
+            sftp._expecting.pop(num, None)
+        path = pending.pop(num, None)
+        if path is not None and kind == CMD_ATTRS:
+            found[path] = paramiko.SFTPAttributes._from_msg(msg)
+
+class SFTPSessionPool:
+    """
+    Thread-safe pool of long-lived SFTP sessions.
+
+    Sessions are opened lazily, up to ``max_sessions`` at a time; further
+    borrowers wait for one to be returned. A session whose channel has
+    closed is dropped and replaced on the next borrow. ``close`` also
+    retires sessions that are still borrowed: they are closed when
+    returned instead of going back to the pool.
+    """
+    def __init__(self, open_session: Callable[[], paramiko.SFTPClient], max_sessions: int = SFTP_POOL_SIZE):
+        self._open_session = open_session
+        self._max_sessions = max(1, max_sessions)
+        self._cond = threading.Condition()
+        self._idle: list[paramiko.SFTPClient] = []
+        self._open_count = 0
+        self._generation = 0
+
+    @staticmethod
+    def _is_healthy(sftp) -> bool:
+        channel = sftp.get_channel()
+        if channel is None or channel.closed:
+            return False
+        transport = channel.get_transport()
+        return transport is not None and transport.is_active()
+
+    @staticmethod
+    def _discard(sftp) -> None:
+        try:
+            sftp.close()
+        except Exception:
+            pass
+
+    def acquire(self) -> tuple[paramiko.SFTPClient, int]:
+        with self._cond:
+            while True:
+                while self._idle:
+                    sftp = self._idle.pop()
+                    if self._is_healthy(sftp):
+                        return sftp, self._generation
+                    self._open_count -= 1
+                    self._discard(sftp)
+                if self._open_count < self._max_sessions:
+                    self._open_count += 1
+                    generation = self._generation
+                    break
+                self._cond.wait()
+        try:
+            return self._open_session(), generation
+        except BaseException:
+            with self._cond:
+                if generation == self._generation:
+                    self._open_count -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, sftp: paramiko.SFTPClient, generation: int) -> None:
+        with self._cond:
+            if generation == self._generation:
+                if self._is_healthy(sftp):
+                    self._idle.append(sftp)
+                    self._cond.notify()
+                    return
+                self._open_count -= 1
+                self._cond.notify()
+        self._discard(sftp)
+
+    @contextmanager
+    def session(self) -> Iterator[paramiko.SFTPClient]:
+        sftp, generation = self.acquire()
+        try:
+            yield sftp
+        finally:
+            self.release(sftp, generation)
+
+    def idle_count(self) -> int:
+        with self._cond:
+            return len(self._idle)
+
+    def close(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open_count = 0
+            self._generation += 1
+            self._cond.notify_all()
+        for sftp in idle:
+            self._discard(sftp)
+
 class SSHConnectionManager:
-    """No Qt widgets here. Pure SSH logic."""
-    def __init__(self, host: Optional[str] = None, username: Optional[str] = None):
+    """
+    No Qt widgets here. Pure SSH logic.
+
+    With ``connect_on_demand`` the first remote operation connects (key
+    authentication only), as done for host profiles.
+    """
+    def __init__(self, host: Optional[str] = None, username: Optional[str] = None, connect_on_demand: bool = False):
         self.host = host or None
         self.username = username or None
+        self.connect_on_demand = connect_on_demand
+        self._demand_failure: Optional[tuple[float, str]] = None
         self.client: Optional[paramiko.SSHClient] = None
+        self._sftp_pool = SFTPSessionPool(self.open_sftp)
+        # Client whose host could not stream an archive
+        self._archive_unsupported: Optional[paramiko.SSHClient] = None
+        self._connect_lock = threading.Lock()
+        # Running try_connect calls: cancel event -> socket being connected
+        self._connect_attempts: dict[threading.Event, Optional[socket.socket]] = {}
+        # Kept for reconnecting without asking again
+        self._password: Optional[str] = None
+        self._reconnect_lock = threading.Lock()
+        self._stop_reconnect = threading.Event()
+        self._abandoned: Optional[paramiko.SSHClient] = None
+        self._reconnect_error = ""
+        self._reconnecting: Optional[threading.Event] = None
+        self._demand_connecting: Optional[threading.Event] = None
+        # Called with False when the link drops and True once it is back,
+        # from whichever thread noticed
+        self.connection_listener: Optional[Callable[[bool], None]] = None
 
     def configure(self, host: str, username: str) -> None:
         self.host = host or None
         self.username = username or None
+        self._archive_unsupported = None
+        self._password = None
+        self._demand_failure = None
         self.close()
 
     def close(self) -> None:
+        self._stop_reconnect.set()
+        self._stop_reconnect = threading.Event()
+        self._sftp_pool.close()
         if self.client is not None:
             self.client.close()
             self.client = None
 
+    def drop_client(self, client: Optional[paramiko.SSHClient]) -> None:
+        """Close the connection if ``client`` is still the current one."""
+        if client is not None and self.client is client:
+            self.close()
+
     def is_configured(self) -> bool:
         return bool(self.host and self.username)
 
+    @staticmethod
+    def _transport_alive(client: paramiko.SSHClient) -> bool:
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
     def is_connected(self) -> bool:
+        """Whether the link is up right now."""
+        client = self.client
+        return client is not None and self._transport_alive(client)
+
+    def has_session(self) -> bool:
+        """
+        Whether a connection was made and not closed since.
+
+        Unlike :meth:`is_connected` this stays true while a dropped link is
+        re-established, so remote paths keep being treated as remote.
+        """
         return self.client is not None
 
     def _require_client(self) -> paramiko.SSHClient:
+        if self.client is None and self.connect_on_demand:
+            self._connect_on_demand()
         if self.client is None:
             raise SSHError("SSH client is not connected.")
         return self.client
 
-    def try_connect(self, password: Optional[str] = None) -> bool:
-        if not self.is_configured():
-            return False
+    def connect_in_background(self) -> Optional[threading.Event]:
+        """
+        Start connecting on a background thread unless connected, already
+        connecting, or a recent attempt failed (then :class:`SSHError`).
 
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        Returns the event set when the attempt ends, or None if connected.
+        """
+        with self._reconnect_lock:
+            if self.client is not None:
+                return None
+            failure = self._demand_failure
+            if failure is not None and time.monotonic() - failure[0] < ON_DEMAND_RETRY_SECONDS:
+                raise SSHError(failure[1])
+            done = self._demand_connecting
+            if done is None:
+                done = self._demand_connecting = threading.Event()
+                threading.Thread(
+                    target=self._connect_in_background, args=(done,), name="ssh-connect", daemon=True
+                ).start()
+            return done
+
+    def _connect_on_demand(self) -> None:
+        """Connect a profile host; the GUI thread only starts it and fails at once."""
+        done = self.connect_in_background()
+        if done is None:
+            return
+        if _on_gui_thread():
+            raise SSHError(f"Connecting to {self.host} in the background; try again in a moment.")
+        done.wait()
+        if self.client is None:
+            failure = self._demand_failure
+            raise SSHError(failure[1] if failure is not None else f"Could not connect to {self.host}.")
+
+    def _connect_in_background(self, done: threading.Event) -> None:
+        message = None
         try:
-            if password:
-                client.connect(self.host, username=self.username, password=password, timeout=10, auth_timeout=10, banner_timeout=10)
-            else:
-                client.connect(self.host, username=self.username, timeout=10, auth_timeout=10, banner_timeout=10)
-            transport = client.get_transport()
-            if transport:
-                transport.set_keepalive(30)
+            self.try_connect(self._password)
         except paramiko.AuthenticationException:
-            raise
-        except Exception as exc:
-            raise SSHError(str(exc)) from exc
+            message = f"Authentication to {self.username}@{self.host} failed."
+        except Exception as exc:  # never let the thread die with callers waiting
+            message = f"Could not connect to {self.host}: {exc}"
+        finally:
+            with self._reconnect_lock:
+                self._demand_failure = None if message is None else (time.monotonic(), message)
+                self._demand_connecting = None
+            done.set()
+
+    def try_connect(
+        self,
+        password: Optional[str] = None,
+        progress: Optional[Callable[[str], None]] = None,
+        canceled: Optional[threading.Event] = None,
+    ) -> Optional[paramiko.SSHClient]:
+        """
+        Connect, reporting ``CONNECT_*`` stages to ``progress``, and return
+        the client this call made (None if no host is configured).
+
+        Blocks for up to the connect, banner and auth timeouts; the Qt
+        controller runs it on a worker. Setting ``canceled`` through
+        :meth:`cancel_connect` makes it raise :class:`SSHConnectCanceled`
+        and never leaves a client behind. Other threads may replace
+        :attr:`client` meanwhile, so callers act on the returned client.
+        """
+        if not self.is_configured():
+            return None
+        canceled = canceled or threading.Event()
+        with self._connect_lock:
+            self._connect_attempts[canceled] = None
+        report = progress or (lambda _stage: None)
+
+        def check_canceled():
+            if canceled.is_set():
+                raise SSHConnectCanceled("Connection canceled.")
+
+        try:
+            check_canceled()  # canceled before a worker picked it up
+            sock = self._open_socket(report, check_canceled, canceled)
+            report(CONNECT_AUTHENTICATING)
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            try:
+                if password:
+                    client.connect(self.host, username=self.username, password=password, sock=sock, timeout=CONNECT_TIMEOUT, auth_timeout=CONNECT_TIMEOUT, banner_timeout=CONNECT_TIMEOUT)
+                else:
+                    client.connect(self.host, username=self.username, sock=sock, timeout=CONNECT_TIMEOUT, auth_timeout=CONNECT_TIMEOUT, banner_timeout=CONNECT_TIMEOUT)
+                transport = client.get_transport()
+                if transport:
+                    transport.set_keepalive(30)
+            except paramiko.AuthenticationException:
+                client.close()
+                check_canceled()
+                raise
+            except Exception as exc:
+                client.close()
+                check_canceled()
+                raise SSHError(str(exc)) from exc
+
+            with self._connect_lock:
+                if canceled.is_set():
+                    client.close()
+                    raise SSHConnectCanceled("Connection canceled.")
+                self._sftp_pool.close()
+                previous, self.client = self.client, client
+                self._password = password or self._password
+            if previous is not None:
+                previous.close()
+            return client
+        finally:
+            with self._connect_lock:
+                self._connect_attempts.pop(canceled, None)
+
+    def _open_socket(
+        self, report: Callable[[str], None], check_canceled: Callable[[], None], attempt: threading.Event
+    ) -> socket.socket:
+        report(CONNECT_RESOLVING)
+        try:
+            addresses = socket.getaddrinfo(self.host, SSH_PORT, type=socket.SOCK_STREAM)
+        except OSError as exc:
+            raise SSHError(f"Could not resolve {self.host}: {exc}") from exc
+        check_canceled()
+        report(CONNECT_CONNECTING)
+        last_error: Optional[OSError] = None
+        for family, socktype, proto, _name, address in addresses:
+            sock = socket.socket(family, socktype, proto)
+            with self._connect_lock:
+                self._connect_attempts[attempt] = sock
+            sock.settimeout(CONNECT_TIMEOUT)
+            try:
+                sock.connect(address)
+            except OSError as exc:
+                sock.close()
+                check_canceled()
+                last_error = exc
+                continue
+            check_canceled()
+            return sock
+        raise SSHError(f"Could not connect to {self.host}: {last_error}")
+
+    def cancel_connect(self, canceled: Optional[threading.Event] = None) -> None:
+        """
+        Abort the :meth:`try_connect` given ``canceled`` on another thread,
+        or every running one when it is None.
+        """
+        with self._connect_lock:
+            attempts = [canceled] if canceled is not None else list(self._connect_attempts)
+            socks = []
+            for event in attempts:
+                event.set()
+                socks.append(self._connect_attempts.get(event))
+        for sock in socks:
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _notify(self, connected: bool) -> None:
+        if self.connection_listener is not None:
+            self.connection_listener(connected)
+
+    def _reconnect(self, lost: paramiko.SSHClient) -> None:
+        """
+        Wait for the dropped client ``lost`` to be replaced.
+
+        The reconnect itself runs on a background thread that every caller
+        which lost the same client shares. Worker threads wait for it; the
+        GUI thread only starts it and fails at once, so a dead link never
+        freezes the window. Once the attempts are used up, operations on
+        ``lost`` fail at once until the user connects again.
+        """
+        with self._reconnect_lock:
+            if self.client is not lost:
+                return
+            if self._abandoned is lost:
+                raise SSHError(f"Lost the connection to {self.host}: {self._reconnect_error}")
+            done = self._reconnecting
+            if done is None:
+                done = self._reconnecting = threading.Event()
+                threading.Thread(
+                    target=self._reconnect_in_background, args=(lost, done), name="ssh-reconnect", daemon=True
+                ).start()
+        if _on_gui_thread():
+            raise SSHError(f"Lost the connection to {self.host}; reconnecting in the background.")
+        done.wait()
+        client = self.client
+        if client is lost or client is None:
+            raise SSHError(f"Lost the connection to {self.host}: {self._reconnect_error}")
+
+    def _reconnect_in_background(self, lost: paramiko.SSHClient, done: threading.Event) -> None:
+        error = None
+        try:
+            error = self._connect_with_backoff()
+        except Exception as exc:  # never let the thread die with callers waiting
+            error = str(exc) or type(exc).__name__
+        finally:
+            with self._reconnect_lock:
+                if error is not None:
+                    self._abandoned = lost
+                    self._reconnect_error = error
+                self._reconnecting = None
+            done.set()
+
+    def _connect_with_backoff(self) -> Optional[str]:
+        """Reconnect with the remembered password; the reason it failed, or None."""
+        stop = self._stop_reconnect
+        self._notify(False)
+        delay = RECONNECT_INITIAL_DELAY
+        error = "no attempt made"
+        for attempt in range(RECONNECT_ATTEMPTS):
+            if attempt:
+                if stop.wait(delay):
+                    return "SSH connection was closed."
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+            try:
+                if self.try_connect(self._password):
+                    self._notify(True)
+                    return None
+                return "SSH connection is not configured."
+            except paramiko.AuthenticationException:
+                return "authentication failed"
+            except SSHConnectCanceled:
+                return "SSH connection was closed."
+            except SSHError as exc:
+                error = str(exc)
+        return error
+
+    def _link_lost(self, client: Optional[paramiko.SSHClient], exc: BaseException) -> bool:
+        if client is None:
+            return False
+        # A stalled reply on a transport that still looks active is a
+        # half-open link, e.g. after the machine slept
+        return isinstance(exc, socket.timeout) or not self._transport_alive(client)
 
-        self.client = client
-        return True
+    def _retrying(self, operation: Callable[[], T]) -> T:
+        """Run an idempotent remote ``operation``, reconnecting if the link drops under it."""
+        retries = 0
+        while True:
+            client = self.client
+            try:
+                return operation()
+            except (OSError, EOFError, paramiko.SSHException, SSHError) as exc:
+                if retries == READ_RETRIES or not self._link_lost(client, exc):
+                    raise
+            retries += 1
+            self._reconnect(client)
 
     def ensure_connection(self) -> paramiko.SSHClient:
-        if self.client is not None:
+        if self.is_connected():
             return self.client
+        if self.client is not None:
+            self._reconnect(self.client)
+            return self._require_client()
         if not self.is_configured():
             raise SSHError("SSH connection is not configured.")
         self.try_connect()
@@ -67,86 +566,377 @@ class SSHConnectionManager:
 
     def open_sftp(self):
         client = self._require_client()
-        return client.open_sftp()
+        sftp = client.open_sftp()
+        sftp.get_channel().settimeout(SFTP_TIMEOUT)
+        return sftp
+
+    def sftp_session(self):
+        """Borrow a pooled SFTP session: ``with manager.sftp_session() as sftp: ...``"""
+        self._require_client()
+        return self._sftp_pool.session()
 
     def path_exists(self, path: str) -> bool:
         try:
-            sftp = self.open_sftp()
+            self.stat(path)
+            return True
         except SSHError:
             return False
-        try:
-            sftp.stat(path)
-            return True
         except FileNotFoundError:
             return False
         except OSError:
             return False
-        finally:
-            sftp.close()
+
+    def stat_many(self, paths: Sequence[str]) -> list[RemotePathInfo]:
+        """
+        Existence, type and size of ``paths``, in order, for one round trip.
+
+        Like :meth:`path_exists`, paths on an unconnected manager are
+        reported as missing.
+        """
+        unique = list(dict.fromkeys(paths))
+        if not unique:
+            return []
+        def stat_all():
+            with self.sftp_session() as sftp:
+                return pipelined_stat(sftp, unique)
+
+        try:
+            found = self._retrying(stat_all)
+        except SSHError:
+            if self.client is not None:
+                raise
+            found = {}
+        return [RemotePathInfo.from_attributes(p, found.get(p)) for p in paths]
+
+    def stat(self, path: str) -> paramiko.SFTPAttributes:
+        def stat_one():
+            with self.sftp_session() as sftp:
+                return sftp.stat(path)
+
+        return self._retrying(stat_one)
+
+    def read_sample(self, path: str, size: int) -> bytes:
+        """Read at most ``size`` leading bytes of ``path``."""
+        def read():
+            with self.sftp_session() as sftp:
+                with sftp.open(path, "rb") as remote_file:
+                    return remote_file.read(size)
+
+        return self._retrying(read)
 
     def read_bytes(self, path: str) -> bytes:
+        """
+        Whole contents of ``path``.
+
+        Plain SFTP reads wait for each 32 KB request before sending the
+        next. Once a file proves larger than ``PREFETCH_MIN_BYTES`` the rest
+        is prefetched with many requests in flight, so large files transfer
+        at link speed while small ones cost no extra ``stat``.
+        """
+        def read():
+            with self.sftp_session() as sftp:
+                with sftp.open(path, "rb") as remote_file:
+                    head = remote_file.read(PREFETCH_MIN_BYTES)
+                    if len(head) < PREFETCH_MIN_BYTES:
+                        return head
+                    remote_file.prefetch()
+                    return head + remote_file.read()
+
+        return self._retrying(read)
+
+    def read_many(self, paths: Sequence[str], max_workers: int = SFTP_POOL_SIZE) -> dict[str, bytes]:
+        """
+        Contents of ``paths``, read concurrently over pooled sessions.
+
+        Files that could not be read are left out; reading them again with
+        :meth:`read_bytes` raises the actual error.
+        """
+        unique = list(dict.fromkeys(paths))
+        if not unique:
+            return {}
+
+        def read(path):
+            try:
+                return path, self.read_bytes(path)
+            except (OSError, EOFError, SSHError, paramiko.SSHException):
+                return path, None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as executor:
+            results = executor.map(read, unique)
+            return {path: data for path, data in results if data is not None}
+
+    def fetch_archive(self, paths: Sequence[str], compress: bool = True) -> dict[str, bytes]:
+        """
+        Contents of ``paths`` streamed by a single ``tar`` run on the host.
+
+        The names go to tar's stdin and the archive is unpacked as it
+        arrives, so a batch costs one round trip plus the transfer instead
+        of an open/read/close per file. Files tar could not read are left
+        out of the result. Raises :class:`SSHError` when no archive comes
+        back or the stream stalls for ``SFTP_TIMEOUT`` seconds; if the host
+        produced nothing at all (no tar or gzip), later calls on the same
+        connection fail immediately.
+        """
+        if self._archive_unsupported is not None and self._archive_unsupported is self.client:
+            raise SSHError("The SSH host cannot stream archives.")
+        return self._retrying(lambda: self._fetch_archive(paths, compress))
+
+    def _fetch_archive(self, paths: Sequence[str], compress: bool) -> dict[str, bytes]:
         client = self._require_client()
-        sftp = client.open_sftp()
+        stdin, stdout, _stderr = client.exec_command(
+            COMPRESSED_ARCHIVE_COMMAND if compress else ARCHIVE_COMMAND, timeout=SFTP_TIMEOUT
+        )
+
+        def send_names():
+            try:
+                stdin.write(b"".join(p.encode("utf-8") + b"\0" for p in paths))
+                stdin.channel.shutdown_write()
+            except (OSError, EOFError, paramiko.SSHException):
+                pass  # tar exited early; the read side reports it
+
+        # Written from another thread so a long name list and a large
+        # archive can't fill both channel windows and stall each other
+        writer = threading.Thread(target=send_names, daemon=True)
+        writer.start()
+        # GNU tar drops the leading "/" of member names
+        wanted = {p.lstrip("/"): p for p in paths}
+        found: dict[str, bytes] = {}
         try:
-            with sftp.open(path, "rb") as remote_file:
-                return remote_file.read()
+            with tarfile.open(fileobj=stdout, mode="r|*") as archive:
+                for member in archive:
+                    path = wanted.get(member.name.lstrip("/"))
+                    if path is not None and member.isfile():
+                        found[path] = archive.extractfile(member).read()
+        except socket.timeout as exc:
+            # A stalled tar is not a lost link; callers fall back to SFTP reads
+            raise SSHError("Bulk fetch timed out.") from exc
+        except (tarfile.TarError, EOFError, paramiko.SSHException) as exc:
+            if not found and isinstance(exc, tarfile.ReadError) and self._transport_alive(client):
+                self._archive_unsupported = client
+            raise SSHError(f"Bulk fetch failed: {exc}") from exc
         finally:
-            sftp.close()
+            writer.join()
+            stdout.channel.close()
+        return found
+
+class SSHHostRegistry:
+    """
+    One connection manager per host profile, next to the default one.
+
+    Qualified paths (``name:/path``) are served by the manager of profile
+    ``name`` and plain absolute paths by the default manager while it has
+    a session. Each manager has its own client and SFTP pool, so reads
+    against different hosts do not wait for each other. Profile managers
+    are created on first use and connect on demand.
+    """
+    def __init__(self, default: SSHConnectionManager, profiles: Mapping[str, HostProfile] = ()):
+        self.default = default
+        self._lock = threading.Lock()
+        self._profiles: dict[str, HostProfile] = dict(profiles)
+        self._managers: dict[str, SSHConnectionManager] = {}
+
+    @property
+    def profiles(self) -> dict[str, HostProfile]:
+        with self._lock:
+            return dict(self._profiles)
+
+    def set_profiles(self, profiles: Mapping[str, HostProfile]) -> None:
+        """Replace the profiles, closing connections whose profile changed."""
+        with self._lock:
+            stale = [
+                manager for name, manager in self._managers.items()
+                if profiles.get(name) != self._profiles.get(name)
+            ]
+            self._managers = {
+                name: manager for name, manager in self._managers.items()
+                if profiles.get(name) == self._profiles.get(name)
+            }
+            self._profiles = dict(profiles)
+        for manager in stale:
+            manager.close()
+
+    def manager(self, name: str) -> Optional[SSHConnectionManager]:
+        with self._lock:
+            manager = self._managers.get(name)
+            if manager is None:
+                profile = self._profiles.get(name)
+                if profile is None:
+                    return None
+                manager = SSHConnectionManager(profile.host, profile.username, connect_on_demand=True)
+                self._managers[name] = manager
+            return manager
+
+    def resolve(self, path: str) -> Optional[tuple[SSHConnectionManager, str]]:
+        """The manager serving ``path`` and the path on its host, or None if local."""
+        qualified = split_host_path(path)
+        if qualified is not None:
+            manager = self.manager(qualified[0])
+            if manager is not None:
+                return manager, qualified[1]
+            return None
+        if self.default.has_session() and path.startswith("/"):
+            return self.default, path
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            managers, self._managers = list(self._managers.values()), {}
+        for manager in managers:
+            manager.close()
 
 # ---------- Qt-aware controller ----------
 PasswordProvider = Callable[[], Optional[str]]
 
+# Outcomes of a connection attempt
+_CONNECTED = "connected"
+_AUTH_REQUIRED = "auth"
+_FAILED = "failed"
+_CANCELED = "canceled"
+
+class _ConnectTask(QRunnable):
+    def __init__(
+        self,
+        attempt: int,
+        manager: SSHConnectionManager,
+        password: Optional[str],
+        progress,
+        done,
+        canceled: threading.Event,
+    ):
+        super().__init__()
+        self._attempt = attempt
+        self._manager = manager
+        self._password = password
+        self._progress = progress
+        self._done = done
+        self._canceled = canceled
+
+    def run(self):
+        try:
+            # A background reconnect may replace manager.client meanwhile;
+            # only the returned client belongs to this attempt
+            client = self._manager.try_connect(
+                password=self._password,
+                progress=lambda stage: self._progress.emit(self._attempt, stage),
+                canceled=self._canceled,
+            )
+            self._done.emit(self._attempt, _CONNECTED if client else _FAILED, "", client)
+        except paramiko.AuthenticationException:
+            self._done.emit(self._attempt, _AUTH_REQUIRED, "", None)
+        except SSHConnectCanceled:
+            self._done.emit(self._attempt, _CANCELED, "", None)
+        except Exception as exc:  # never let a worker die silently
+            self._done.emit(self._attempt, _FAILED, str(exc), None)
+
 class SSHController(QObject):
+    """
+    Connects on a worker thread so the window never waits on the network.
+
+    ``progress`` reports the ``CONNECT_*`` stage of a running attempt and
+    ``statusChanged`` its result. Only the password prompt, needed when
+    key authentication fails, runs on the GUI thread between two attempts.
+    """
     statusChanged = pyqtSignal(bool)   # connected?
     error = pyqtSignal(str)
+    progress = pyqtSignal(str)         # CONNECT_* stage
+    _progress = pyqtSignal(int, str)
+    _done = pyqtSignal(int, str, str, object)  # attempt, outcome, error message, new client
+    _linkChanged = pyqtSignal(bool)
 
     def __init__(self, manager: SSHConnectionManager, password_provider: Optional[PasswordProvider] = None):
         super().__init__()
         self.manager = manager
         self.password_provider = password_provider
+        self._attempt = 0
+        self._connecting = False
+        self._with_password = False
+        self._canceled: Optional[threading.Event] = None
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._progress.connect(self._on_progress)
+        self._done.connect(self._on_done)
+        self._linkChanged.connect(self._on_link_changed)
+        # Reconnects happen on whichever thread was reading
+        self.manager.connection_listener = self._linkChanged.emit
 
     def configure(self, host: str, username: str):
+        self.cancel()
         self.manager.configure(host, username)
         self.statusChanged.emit(self.manager.is_connected())
 
     def connect(self):
+        if self._connecting:
+            return
         if not self.manager.is_configured():
             self.error.emit("Please enter an SSH host and username before connecting.")
             self.statusChanged.emit(False)
             return
+        self._start_attempt(None)
 
-        try:
-            ok = self.manager.try_connect(password=None)
-            if ok:
-                self.statusChanged.emit(True)
-                return
-        except paramiko.AuthenticationException:
-            pass  # fall through to password prompt
-        except Exception as exc:
-            self.error.emit(str(exc))
-            self.statusChanged.emit(False)
+    def _start_attempt(self, password: Optional[str]) -> None:
+        self._attempt += 1
+        self._connecting = True
+        self._with_password = bool(password)
+        self._canceled = threading.Event()
+        self._pool.start(
+            _ConnectTask(self._attempt, self.manager, password, self._progress, self._done, self._canceled)
+        )
+
+    def is_connecting(self) -> bool:
+        return self._connecting
+
+    def cancel(self):
+        """Stop waiting for the running attempt; its result is ignored."""
+        if not self._connecting:
             return
+        self._connecting = False
+        self._attempt += 1
+        self.manager.cancel_connect(self._canceled)
+        self.statusChanged.emit(False)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _on_progress(self, attempt: int, stage: str):
+        if attempt == self._attempt and self._connecting:
+            self.progress.emit(stage)
+
+    def _on_link_changed(self, connected: bool):
+        if not self._connecting:
+            self.statusChanged.emit(connected)
+
+    def _on_done(self, attempt: int, outcome: str, message: str, client=None):
+        if attempt != self._attempt or not self._connecting:
+            if outcome == _CONNECTED:
+                # A canceled attempt got through anyway; nobody asked for it
+                self.manager.drop_client(client)
+            return
+        if outcome == _AUTH_REQUIRED:
+            if self._with_password:
+                outcome, message = _FAILED, "Authentication failed."
+            else:
+                password = self._ask_password()
+                if password:
+                    self._start_attempt(password)
+                    return
+        self._connecting = False
+        if outcome == _FAILED and message:
+            self.error.emit(message)
+        self.statusChanged.emit(outcome == _CONNECTED)
 
+    def _ask_password(self) -> Optional[str]:
         # Ask for password if provider is available
         if self.password_provider is None:
             self.error.emit("Authentication required but no password provider is available.")
-            self.statusChanged.emit(False)
-            return
-
+            return None
         pwd = self.password_provider()
         if not pwd:
             self.error.emit("Authentication canceled.")
-            self.statusChanged.emit(False)
-            return
-
-        try:
-            ok = self.manager.try_connect(password=pwd)
-            self.statusChanged.emit(bool(ok))
-        except Exception as exc:
-            self.error.emit(str(exc))
-            self.statusChanged.emit(False)
+            return None
+        return pwd
 
     def disconnect(self):
+        self.cancel()
         self.manager.close()
         self.statusChanged.emit(False)
 
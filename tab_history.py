@@ -0,0 +1,183 @@
+"""Undo history of a concatenator tab, stored as diffs of the file list."""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Optional, Sequence
+
+DEFAULT_MAX_ENTRIES = 200
+DEFAULT_MAX_MEMORY_MB = 64
+# Rough per-entry cost of the entry object, its diff and its tuples
+_ENTRY_OVERHEAD_BYTES = 400
+_POINTER_BYTES = 8
+
+
+@dataclass(frozen=True)
+class TabState:
+    files: tuple[str, ...]
+    root_path: Optional[str]
+    include_root: bool
+    prefix: str
+    suffix: str
+    preset: str
+    folder_sources: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class FileListDiff:
+    """Rows ``start .. start + len(removed)`` were replaced by ``inserted``."""
+
+    start: int
+    removed: tuple[str, ...]
+    inserted: tuple[str, ...]
+
+    def apply(self, files: tuple[str, ...]) -> tuple[str, ...]:
+        return files[:self.start] + self.inserted + files[self.start + len(self.removed):]
+
+    def revert(self, files: tuple[str, ...]) -> tuple[str, ...]:
+        return files[:self.start] + self.removed + files[self.start + len(self.inserted):]
+
+    def cost(self) -> int:
+        """Approximate bytes kept alive by this diff."""
+        paths = self.removed + self.inserted
+        return _POINTER_BYTES * len(paths) + sum(map(len, paths))
+
+
+def diff_files(old: Sequence[str], new: Sequence[str]) -> Optional[FileListDiff]:
+    """Smallest single splice turning ``old`` into ``new``, or None if equal."""
+    limit = min(len(old), len(new))
+    if len(old) <= len(new) and old == new[:len(old)]:
+        prefix = len(old)  # appended (or unchanged)
+    else:
+        prefix = next((i for i in range(limit) if old[i] != new[i]), limit)
+    if prefix == len(old) == len(new):
+        return None
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return FileListDiff(
+        prefix,
+        tuple(old[prefix:len(old) - suffix]),
+        tuple(new[prefix:len(new) - suffix]),
+    )
+
+
+@dataclass(frozen=True)
+class HistoryStep:
+    """A state to restore and the splice that turns the current list into it."""
+
+    state: TabState
+    start: int
+    stop: int
+    paths: tuple[str, ...]
+
+
+@dataclass
+class _Entry:
+    state: TabState  # with an empty ``files`` tuple
+    diff: Optional[FileListDiff]  # from the previous entry's files to this one's
+
+    def cost(self) -> int:
+        return _ENTRY_OVERHEAD_BYTES + (self.diff.cost() if self.diff else 0)
+
+
+class TabHistory:
+    """
+    Undo/redo stack of :class:`TabState` snapshots.
+
+    Only the current file list is held in full. Each entry keeps its other
+    fields plus the splice from the previous list, and the path strings in
+    a splice are the same objects as in the live list, so a change of a few
+    rows in a 50k file workspace costs a few hundred bytes. The oldest
+    entries are dropped once ``max_entries`` or ``max_memory_mb`` is
+    exceeded.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_memory_mb: int = DEFAULT_MAX_MEMORY_MB):
+        self._max_entries = max(2, max_entries)
+        self._max_bytes = max(1, max_memory_mb) * 1024 * 1024
+        self._entries: list[_Entry] = []
+        self._index = -1
+        self._files: tuple[str, ...] = ()
+        self._bytes = 0
+
+    def set_limits(self, max_entries: int, max_memory_mb: int) -> None:
+        self._max_entries = max(2, max_entries)
+        self._max_bytes = max(1, max_memory_mb) * 1024 * 1024
+        self._trim()
+
+    def reset(self, state: TabState) -> None:
+        self._files = tuple(state.files)
+        self._entries = [_Entry(replace(state, files=()), None)]
+        self._index = 0
+        self._bytes = self._entries[0].cost()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def current(self) -> TabState:
+        return replace(self._entries[self._index].state, files=self._files)
+
+    def record(self, state: TabState) -> bool:
+        """Add ``state`` after the current entry; False if nothing changed."""
+        files = tuple(state.files)
+        diff = diff_files(self._files, files)
+        rest = replace(state, files=())
+        if diff is None and rest == self._entries[self._index].state:
+            return False
+        for dropped in self._entries[self._index + 1:]:
+            self._bytes -= dropped.cost()
+        del self._entries[self._index + 1:]
+        entry = _Entry(rest, diff)
+        self._entries.append(entry)
+        self._bytes += entry.cost()
+        self._index = len(self._entries) - 1
+        self._files = files
+        self._trim()
+        return True
+
+    def _trim(self) -> None:
+        while self._index > 0 and (
+            len(self._entries) > self._max_entries or self._bytes > self._max_bytes
+        ):
+            self._bytes -= self._entries[0].cost()
+            del self._entries[0]
+            self._index -= 1
+            # The new oldest entry is the baseline; its diff leads nowhere.
+            first = self._entries[0]
+            self._bytes -= first.cost()
+            first.diff = None
+            self._bytes += first.cost()
+
+    def can_undo(self) -> bool:
+        return self._index > 0
+
+    def can_redo(self) -> bool:
+        return self._index < len(self._entries) - 1
+
+    def undo(self) -> Optional[HistoryStep]:
+        if not self.can_undo():
+            return None
+        diff = self._entries[self._index].diff
+        self._index -= 1
+        if diff is None:
+            return self._step(0, 0, ())
+        self._files = diff.revert(self._files)
+        return self._step(diff.start, diff.start + len(diff.inserted), diff.removed)
+
+    def redo(self) -> Optional[HistoryStep]:
+        if not self.can_redo():
+            return None
+        self._index += 1
+        diff = self._entries[self._index].diff
+        if diff is None:
+            return self._step(0, 0, ())
+        self._files = diff.apply(self._files)
+        return self._step(diff.start, diff.start + len(diff.removed), diff.inserted)
+
+    def _step(self, start: int, stop: int, paths: tuple[str, ...]) -> HistoryStep:
+        return HistoryStep(self.current(), start, stop, paths)
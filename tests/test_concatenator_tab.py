@@ -1,11 +1,19 @@
 import os
+import tempfile
+import threading
 import unittest
 from types import SimpleNamespace
 from unittest import mock
 
+from PyQt5.QtCore import QMimeData, QPointF, Qt, QUrl
+from PyQt5.QtGui import QDropEvent
 from PyQt5.QtWidgets import QApplication
 
+import concatenator_tab
+import file_list_widget
 from concatenator_tab import ConcatenatorTab, PRESETS
+from ssh_controller import RemotePathInfo
+from tab_history import TabState
 
 os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
 os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
@@ -22,6 +30,7 @@ class DummySettings:
         self.use_dark_mode = False
         self.extension_allow_all = True
         self.extension_filters = []
+        self.ignore_filters = set()
 
     def set_last_preset(self, preset: str):
         self.last_preset = preset
@@ -41,9 +50,15 @@ class DummySSHManager:
     def is_connected(self) -> bool:
         return self._connected
 
+    def has_session(self) -> bool:
+        return self._connected
+
     def path_exists(self, _path: str) -> bool:
         return True
 
+    def stat_many(self, paths):
+        return [RemotePathInfo(p, True) for p in paths]
+
 
 class DummySSHController:
     def __init__(self, connected: bool):
@@ -90,6 +105,21 @@ class TestSelectRootPath(unittest.TestCase):
         self.assertEqual(tab.root_path, "/local")
 
 
+    @mock.patch("concatenator_tab.QInputDialog.getText", return_value=("build1:/srv", True))
+    @mock.patch("concatenator_tab.QFileDialog.getExistingDirectory")
+    def test_profile_root_offered_without_default_connection(self, mock_get_dir, mock_get_text):
+        ctx = create_ctx_stub(False)
+        ctx.ssh_hosts = SimpleNamespace(profiles={"build1": object()})
+        tab = ConcatenatorTab(ctx)
+        tab.list_widget.files = ["build1:/srv/app/a.py", "build1:/srv/lib/b.py"]
+        tab.select_root_path()
+        mock_get_text.assert_called_once_with(
+            tab, "Insert Host Path", "Enter remote root path:", text="build1:/srv"
+        )
+        mock_get_dir.assert_not_called()
+        self.assertEqual(tab.root_path, "build1:/srv")
+
+
 class TestTabHistory(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -113,6 +143,89 @@ class TestTabHistory(unittest.TestCase):
         self.assertTrue(tab.can_undo())
         self.assertFalse(tab.can_redo())
 
+    def test_undo_splices_without_renormalizing(self):
+        tab = self.create_tab()
+        files = [f"/tmp/project/{i}.py" for i in range(20)]
+        tab.list_widget.add_files(files, enforce_filter=False)
+        tab.list_widget.remove_paths(["/tmp/project/7.py"])
+        with mock.patch.object(tab.list_widget, "set_files") as set_files, mock.patch.object(
+            tab.list_widget, "_normalize_incoming_path"
+        ) as normalize:
+            tab.undo()
+            self.assertEqual(tab.list_widget.files, files)
+            tab.redo()
+            self.assertNotIn("/tmp/project/7.py", tab.list_widget.files)
+        set_files.assert_not_called()
+        normalize.assert_not_called()
+        self.assertEqual(tab.list_widget.index_of("/tmp/project/8.py"), 7)
+
+    def test_drop_adds_files_and_folders_as_one_history_entry(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            folder = os.path.join(tmpdir, "pkg")
+            os.mkdir(folder)
+            paths = []
+            for name in ("a.py", "b.py", os.path.join("pkg", "c.py")):
+                path = os.path.join(tmpdir, name)
+                with open(path, "w") as fh:
+                    fh.write("x")
+                paths.append(path)
+            tab = self.create_tab()
+            mime = QMimeData()
+            mime.setUrls([QUrl.fromLocalFile(p) for p in (paths[0], paths[1], folder)])
+            event = QDropEvent(QPointF(0, 0), Qt.CopyAction, mime, Qt.LeftButton, Qt.NoModifier)
+
+            tab.dropEvent(event)
+
+            self.assertEqual(sorted(tab.list_widget.files), sorted(paths))
+            tab.undo()
+            self.assertEqual(tab.list_widget.files, [])
+            self.assertFalse(tab.can_undo())
+
+    def test_remote_drop_stats_all_paths_in_one_batch(self):
+        ctx = create_ctx_stub(True)
+        ctx.ssh.manager.stat_many = mock.Mock(return_value=[
+            RemotePathInfo("/srv/a.py", True, size=3),
+            RemotePathInfo("/srv/pkg", True, is_dir=True),
+            RemotePathInfo("/srv/gone.py", False),
+        ])
+        tab = ConcatenatorTab(ctx)
+        mime = QMimeData()
+        mime.setText("/srv/a.py\n/srv/pkg\n/srv/gone.py")
+        event = QDropEvent(QPointF(0, 0), Qt.CopyAction, mime, Qt.LeftButton, Qt.NoModifier)
+
+        tab.dropEvent(event)
+
+        ctx.ssh.manager.stat_many.assert_called_once_with(["/srv/a.py", "/srv/pkg", "/srv/gone.py"])
+        self.assertEqual(tab.list_widget.files, ["/srv/a.py"])
+
+    def test_failed_remote_check_warns_instead_of_raising(self):
+        ctx = create_ctx_stub(True)
+        ctx.ssh.manager.stat_many = mock.Mock(side_effect=EOFError("link dropped"))
+        tab = ConcatenatorTab(ctx)
+        mime = QMimeData()
+        mime.setText("/srv/a.py")
+        event = QDropEvent(QPointF(0, 0), Qt.CopyAction, mime, Qt.LeftButton, Qt.NoModifier)
+
+        with mock.patch("file_list_widget.QMessageBox.warning") as warning:
+            tab.dropEvent(event)
+
+        warning.assert_called_once()
+        self.assertEqual(tab.list_widget.files, [])
+
+    def test_filter_box_narrows_list_and_maps_removals(self):
+        tab = self.create_tab()
+        tab.list_widget.add_files(["/tmp/a/main.py", "/tmp/b/util.py", "/tmp/c/main_test.py"])
+        tab.filter_input.setText("util")
+        view_model = tab.list_widget.model()
+        self.assertEqual(view_model.rowCount(), 1)
+        self.assertFalse(tab.list_widget.dragEnabled())
+
+        tab.list_widget.remove_item(view_model.index(0, 0))
+        self.assertEqual(tab.list_widget.files, ["/tmp/a/main.py", "/tmp/c/main_test.py"])
+        tab.filter_input.clear()
+        self.assertEqual(view_model.rowCount(), 2)
+        self.assertTrue(tab.list_widget.dragEnabled())
+
     def test_tabs_have_independent_prefixes(self):
         tab_one = self.create_tab()
         tab_two = self.create_tab()
@@ -123,6 +236,92 @@ class TestTabHistory(unittest.TestCase):
         self.assertNotEqual(tab_one.prefix_input.text(), tab_two.prefix_input.text())
 
 
+class TestSessionRestore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_saved_list_is_restored_as_is_and_folders_walk_in_background(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            saved, unsaved, gone = (os.path.join(tmpdir, name) for name in ("a.py", "b.py", "gone.py"))
+            for path in (saved, unsaved):
+                with open(path, "w") as fh:
+                    fh.write("x")
+            state = TabState((saved, gone), None, False, "", "", "Custom", (tmpdir,))
+            walked_on = []
+            real_list_files = file_list_widget.list_files
+
+            def list_files(*args, **kwargs):
+                walked_on.append(threading.current_thread())
+                return real_list_files(*args, **kwargs)
+
+            tab = ConcatenatorTab(create_ctx_stub(False))
+            with mock.patch("file_list_widget.list_files", side_effect=list_files):
+                tab.load_session_state(state)
+                self.assertEqual(tab.list_widget.files, [saved, gone])
+                self.assertEqual(tab.list_widget.folder_sources, [os.path.normpath(tmpdir)])
+                tab.list_widget._folder_sync.wait_for_done()
+                QApplication.processEvents()
+            self.assertTrue(walked_on)
+            self.assertNotIn(threading.main_thread(), walked_on)
+
+            added = os.path.join(tmpdir, "c.py")
+            with open(added, "w") as fh:
+                fh.write("x")
+            tab.list_widget._folder_sync._queue(tmpdir)
+            tab.list_widget._folder_sync.flush()
+            self.assertEqual(tab.list_widget.files, [saved, gone, added])
+            tab.list_widget._folder_sync.clear()
+
+
+class TestWatchMode(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_change_to_watched_file_recopies(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a.py")
+            with open(path, "w") as fh:
+                fh.write("first")
+            tab = ConcatenatorTab(create_ctx_stub(False))
+            tab.list_widget.add_file(path, enforce_filter=False)
+            threads = []
+            real_build = concatenator_tab.build_concatenation
+
+            def build(*args, **kwargs):
+                threads.append(threading.current_thread())
+                return real_build(*args, **kwargs)
+
+            with mock.patch("concatenator_tab.build_concatenation", side_effect=build) as concat, \
+                    mock.patch("file_concatenator.QMessageBox") as boxes, \
+                    mock.patch("file_concatenator.QApplication") as app:
+                tab.watch_checkbox.setChecked(True)
+                self.assertEqual(tab._workspace_watcher._paths, {path})
+                tab._workspace_watcher.schedule([path])
+                tab._workspace_watcher.flush()
+                tab.wait_for_concatenation()
+                QApplication.processEvents()
+            concat.assert_called_once()
+            self.assertIs(concat.call_args.kwargs["content_cache"], tab._content_cache)
+            self.assertNotIn(threading.main_thread(), threads)
+            self.assertIn("first", app.clipboard.return_value.setText.call_args[0][0])
+            self.assertFalse(boxes.method_calls)
+            self.assertIn("copied to clipboard", tab.watch_status_label.text())
+            self.assertTrue(tab.concat_button.isEnabled())
+            tab._show_watch_status("Files Not Found", "skipped:\n" + path)
+            self.assertIn("Files Not Found", tab.watch_status_label.text())
+            self.assertEqual(tab.watch_status_label.toolTip(), "skipped:\n" + path)
+
+            tab.list_widget.add_file(os.path.join(tmpdir, "gone.py"), enforce_filter=False)
+            tab.list_widget.add_file("build1:/srv/app.py", enforce_filter=False)
+            self.assertEqual(len(tab.list_widget.files), 3)
+            self.assertEqual(tab._workspace_watcher._paths, {path})
+
+            tab.watch_checkbox.setChecked(False)
+            self.assertEqual(tab._workspace_watcher._paths, set())
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -50,6 +50,7 @@ class ConcatenateFilesTest(unittest.TestCase):
         import importlib
         mod = importlib.import_module('file_concatenator')
         self.concatenate_files = mod.concatenate_files
+        self.mod = mod
         qtwidgets.QMessageBox.warning.reset_mock()
         DummyQApplication._clipboard.text = ""
 
@@ -159,5 +160,157 @@ class ConcatenateFilesTest(unittest.TestCase):
             self.assertIn("file1.txt", clip_text)
             qtwidgets.QMessageBox.warning.assert_not_called()
 
+    def test_missing_files_are_skipped_with_warning(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file1 = os.path.join(tmpdir, 'file1.txt')
+            missing = os.path.join(tmpdir, 'gone.txt')
+            with open(file1, 'w') as f:
+                f.write('one')
+
+            qtwidgets.QMessageBox.critical.reset_mock()
+            self.concatenate_files([missing, file1], root_path=tmpdir,
+                                   prefix='<$filepath>', suffix='</>',
+                                   show_success_message=False)
+
+            clip_text = DummyQApplication._clipboard.text
+            self.assertIn('<file1.txt>', clip_text)
+            self.assertNotIn('gone.txt', clip_text)
+            qtwidgets.QMessageBox.critical.assert_not_called()
+            qtwidgets.QMessageBox.warning.assert_called_once()
+            self.assertIn(missing, qtwidgets.QMessageBox.warning.call_args[0][2])
+
+    def test_notify_replaces_message_boxes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file1 = os.path.join(tmpdir, 'file1.txt')
+            missing = os.path.join(tmpdir, 'gone.txt')
+            with open(file1, 'w') as f:
+                f.write('one')
+            notes = []
+            qtwidgets.QMessageBox.information.reset_mock()
+            self.concatenate_files([missing, file1], root_path=tmpdir, prefix='', suffix='',
+                                   notify=lambda title, text: notes.append((title, text)))
+            self.concatenate_files([file1], root_path=tmpdir, prefix='', suffix='',
+                                   notify=lambda title, text: notes.append((title, text)))
+
+            qtwidgets.QMessageBox.warning.assert_not_called()
+            qtwidgets.QMessageBox.information.assert_not_called()
+            self.assertEqual([title for title, _ in notes], ['Files Not Found', 'Success'])
+            self.assertIn(missing, notes[0][1])
+
+    def test_content_cache_drops_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for name in ('a', 'b', 'c'):
+                paths.append(os.path.join(tmpdir, name))
+                with open(paths[-1], 'w') as f:
+                    f.write(name * 4)
+            cache = self.mod.ContentCache(max_bytes=10)
+            cache.read(paths[0])
+            cache.read(paths[1])
+            cache.read(paths[0])
+            cache.read(paths[2])
+            self.assertIn(paths[0], cache)
+            self.assertNotIn(paths[1], cache)
+            self.assertEqual(cache.memory_bytes, 8)
+            cache.invalidate([paths[0]])
+            self.assertEqual(cache.memory_bytes, 4)
+
+    def test_content_cache_rereads_only_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file1 = os.path.join(tmpdir, 'file1.txt')
+            file2 = os.path.join(tmpdir, 'file2.txt')
+            for path, text in ((file1, 'one'), (file2, 'two')):
+                with open(path, 'w') as f:
+                    f.write(text)
+            cache = self.mod.ContentCache()
+
+            self.concatenate_files([file1, file2], prefix='', suffix='',
+                                   show_success_message=False, content_cache=cache)
+            with open(file2, 'w') as f:
+                f.write('changed')
+            cache.invalidate([file2])
+            with patch.object(self.mod, 'read_file_text',
+                              wraps=self.mod.read_file_text) as reader:
+                self.concatenate_files([file1, file2], prefix='', suffix='',
+                                       show_success_message=False, content_cache=cache)
+
+            reader.assert_called_once_with(file2)
+            self.assertIn('one', DummyQApplication._clipboard.text)
+            self.assertIn('changed', DummyQApplication._clipboard.text)
+
+    def test_content_cache_detects_modified_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'file.txt')
+            with open(path, 'w') as f:
+                f.write('one')
+            cache = self.mod.ContentCache()
+            self.assertEqual(cache.read(path), 'one')
+            with open(path, 'w') as f:
+                f.write('longer')
+            self.assertEqual(cache.read(path), 'longer')
+            cache.retain([])
+            self.assertEqual(len(cache), 0)
+
+    def test_remote_bulk_fetch_falls_back_per_file(self):
+        paths = [f'/srv/{i}.py' for i in range(5)]
+        ssh = MagicMock()
+        ssh.has_session.return_value = True
+        ssh.fetch_archive.return_value = {p: p.encode() for p in paths[:4]}
+        ssh.read_many.return_value = {'/srv/4.py': b'late'}
+
+        self.concatenate_files(paths, prefix='', suffix='', show_success_message=False,
+                               ssh_manager=ssh, remote_bulk_fetch=True)
+
+        ssh.fetch_archive.assert_called_once_with(paths)
+        ssh.read_many.assert_called_once_with(['/srv/4.py'])
+        text = DummyQApplication._clipboard.text
+        self.assertLess(text.index('/srv/3.py'), text.index('late'))
+
+    def test_remote_bulk_fetch_failure_reads_files_concurrently(self):
+        paths = [f'/srv/{i}.py' for i in range(4)]
+        ssh = MagicMock()
+        ssh.has_session.return_value = True
+        ssh.fetch_archive.side_effect = RuntimeError('no tar')
+        ssh.read_many.return_value = {p: b'x' for p in paths}
+
+        self.concatenate_files(paths, prefix='', suffix='', show_success_message=False,
+                               ssh_manager=ssh, remote_bulk_fetch=True)
+
+        ssh.read_many.assert_called_once_with(paths)
+        ssh.read_bytes.assert_not_called()
+
+    def test_remote_files_are_fetched_in_batches(self):
+        paths = [f'/srv/{i}.py' for i in range(5)]
+        ssh = MagicMock()
+        ssh.has_session.return_value = True
+        ssh.read_many.side_effect = lambda batch: {p: p.encode() for p in batch}
+
+        with patch.object(self.mod, 'PREFETCH_BATCH_FILES', 2):
+            result = self.mod.build_concatenation(paths, prefix='', suffix='', ssh_manager=ssh)
+
+        self.assertEqual([c.args[0] for c in ssh.read_many.call_args_list],
+                         [paths[0:2], paths[2:4], paths[4:]])
+        self.assertEqual(result.text, ''.join(f'\n{p}\n\n' for p in paths))
+        self.assertFalse(result.error)
+        qtwidgets.QMessageBox.warning.assert_not_called()
+
+    def test_hosts_are_read_in_parallel(self):
+        import threading
+        both_reading = threading.Barrier(2, timeout=5)
+        build1, build2 = MagicMock(), MagicMock()
+        for manager, data in ((build1, b'one'), (build2, b'two')):
+            manager.read_many.side_effect = (
+                lambda paths, data=data: both_reading.wait() is not None and {p: data for p in paths}
+            )
+        targets = {'build1:/srv/a.py': (build1, '/srv/a.py'), 'build2:/srv/a.py': (build2, '/srv/a.py')}
+        hosts = MagicMock()
+        hosts.resolve.side_effect = targets.get
+
+        self.concatenate_files(list(targets), root_path='build1:/srv', prefix='<$filepath>', suffix='',
+                               show_success_message=False, ssh_hosts=hosts)
+
+        build1.read_many.assert_called_once_with(['/srv/a.py'])
+        self.assertEqual(DummyQApplication._clipboard.text, '<a.py>\none\n\n<build2:/srv/a.py>\ntwo\n\n')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,182 @@
+import os
+import random
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
+os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
+
+from PyQt5.QtCore import QPersistentModelIndex, Qt
+from PyQt5.QtTest import QAbstractItemModelTester
+from PyQt5.QtWidgets import QApplication
+
+import file_filter_model
+from file_filter_model import FileFilterProxyModel, MatchedRows, compile_query
+from file_list_model import COLUMN_PATH, FileListModel
+from file_list_widget import FileListWidget
+
+
+class TestCompileQuery(unittest.TestCase):
+    def test_terms_match_as_ordered_subsequences(self):
+        match = compile_query("flw py")
+        self.assertTrue(match("src/file_list_widget.py"))
+        self.assertFalse(match("src/widget_list_file.py"))
+        self.assertFalse(match("src/file_list_widget.txt"))
+        self.assertIsNone(compile_query("   "))
+
+    def test_regex_characters_are_literal(self):
+        self.assertTrue(compile_query("a.b")("xa.by"))
+        self.assertFalse(compile_query("a.b")("axb"))
+
+
+class TestMatchedRows(unittest.TestCase):
+    def test_edits_match_a_plain_list(self):
+        rng = random.Random(7)
+        expected = sorted(rng.sample(range(0, 3000, 3), 400))
+        with mock.patch.object(MatchedRows, "BLOCK_SIZE", 16):
+            rows = MatchedRows(expected)
+            for _ in range(300):
+                position = rng.randrange(len(expected) + 1)
+                if rng.random() < 0.5 and position < len(expected):
+                    hi = min(len(expected), position + rng.randrange(1, 40))
+                    # The source range removed spans the deleted matches
+                    delta = expected[position] - expected[hi - 1] - 1
+                    del expected[position:hi]
+                    rows.delete(position, hi)
+                else:
+                    start = expected[position - 1] + 1 if position else 0
+                    new = list(range(start, start + rng.randrange(1, 50)))
+                    delta = len(new)
+                    expected[position:position] = new
+                    rows.insert(position, new)
+                    position += len(new)
+                for i in range(position, len(expected)):
+                    expected[i] += delta
+                rows.shift(position, delta)
+                self.assertEqual(list(rows), expected)
+                self.assertEqual(len(rows), len(expected))
+            for position, source in enumerate(expected):
+                self.assertEqual(rows[position], source)
+                self.assertEqual(rows.index_of(source), position)
+                self.assertEqual(rows.position(source), position)
+
+
+class TestFileFilterProxyModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.source = FileListModel()
+        self.source.set_files(["/r/src/main.py", "/r/src/util.py", "/r/docs/readme.md", "/r/tests/test_main.py"])
+        self.source.set_root_path("/r")
+        self.proxy = FileFilterProxyModel()
+        self.proxy.setSourceModel(self.source)
+        self.tester = QAbstractItemModelTester(
+            self.proxy, QAbstractItemModelTester.FailureReportingMode.Fatal
+        )
+
+    def _visible(self):
+        return [self.proxy.index(r).data(Qt.UserRole) for r in range(self.proxy.rowCount())]
+
+    def test_filter_and_clear(self):
+        self.proxy.set_filter_text("MAIN")
+        self.assertEqual(self._visible(), ["/r/src/main.py", "/r/tests/test_main.py"])
+        self.assertEqual(self.proxy.mapToSource(self.proxy.index(1)).row(), 3)
+        self.assertEqual(self.proxy.mapFromSource(self.source.index(1)).row(), -1)
+        self.proxy.set_filter_text("")
+        self.assertFalse(self.proxy.is_filtering())
+        self.assertEqual(len(self._visible()), 4)
+
+    def test_extending_query_only_rescans_previous_matches(self):
+        self.proxy.set_filter_text("m")
+        checked = []
+        real = compile_query("ma")
+        with mock.patch.object(
+            file_filter_model, "compile_query", return_value=lambda s: checked.append(s) or real(s)
+        ):
+            self.proxy.set_filter_text("ma")
+        self.assertEqual(len(checked), 3)
+        self.assertEqual(self._visible(), ["/r/src/main.py", "/r/tests/test_main.py"])
+
+    def test_source_edits_while_filtering(self):
+        self.proxy.set_filter_text("main")
+        self.source.append_rows(["/r/lib/other.py", "/r/lib/main_helpers.py"])
+        self.assertEqual(self._visible()[-1], "/r/lib/main_helpers.py")
+        self.source.remove_rows([0, 2])
+        self.assertEqual(self._visible(), ["/r/tests/test_main.py", "/r/lib/main_helpers.py"])
+
+    def test_root_change_refilters_on_new_display_paths(self):
+        self.proxy.set_filter_text("tests")
+        self.assertEqual(self._visible(), ["/r/tests/test_main.py"])
+        self.source.set_root_path("/r/tests")
+        self.assertEqual(self._visible(), [])
+
+    def test_source_sort_keeps_selection_mapping(self):
+        self.proxy.set_filter_text("py")
+        persistent = QPersistentModelIndex(self.proxy.index(0))
+        self.source.sort(COLUMN_PATH, Qt.DescendingOrder)
+        self.assertEqual(self._visible(), ["/r/tests/test_main.py", "/r/src/util.py", "/r/src/main.py"])
+        self.assertEqual(persistent.row(), 2)
+
+    def test_drops_are_refused_while_filtering(self):
+        mime = self.proxy.mimeData([self.proxy.index(3)])
+        self.proxy.set_filter_text("py")
+        self.assertFalse(self.proxy.dropMimeData(mime, Qt.MoveAction, 0, 0, self.proxy.index(0).parent()))
+        self.proxy.set_filter_text("")
+        self.assertTrue(self.proxy.dropMimeData(mime, Qt.MoveAction, 0, 0, self.proxy.index(0).parent()))
+        self.assertEqual(self.source.files[0], "/r/tests/test_main.py")
+
+
+class TestLargeListView(unittest.TestCase):
+    """Single edits must not relay out every row of a 100k entry list."""
+
+    ROWS = 100_000
+    BUDGET = 0.15  # seconds; a per-row relayout takes about a second here
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.widget = FileListWidget()
+        self.widget.resize(640, 480)
+        self.widget.show()
+        self.model = self.widget._model
+        self.model.set_root_path("/r")
+        self.model.set_files([f"/r/d{i % 100}/f{i}.py" for i in range(self.ROWS)])
+        self.app.processEvents()
+
+    def tearDown(self):
+        self.widget.close()
+        self.widget.deleteLater()
+        self.app.processEvents()
+
+    def _timed(self, edit) -> float:
+        start = time.perf_counter()
+        edit()
+        self.app.processEvents()
+        return time.perf_counter() - start
+
+    def test_single_add_and_remove(self):
+        self.assertLess(self._timed(lambda: self.model.append_rows(["/r/new.py"])), self.BUDGET)
+        self.assertLess(self._timed(lambda: self.model.remove_rows([5])), self.BUDGET)
+        self.assertEqual(self.widget._proxy.rowCount(), self.ROWS)
+
+    def test_edits_under_a_filter(self):
+        proxy = self.widget._proxy
+        proxy.set_filter_text("f1")
+        self.assertLess(self._timed(lambda: self.model.append_rows(["/r/f1new.py"])), self.BUDGET)
+        self.assertLess(self._timed(lambda: self.model.remove_rows([10])), self.BUDGET)
+        # 1k separate ranges: each must not renumber every matched row
+        self.assertLess(self._timed(lambda: self.model.remove_rows(range(0, 50_000, 50))), 1.0)
+        matched = proxy.rowCount()
+        self.assertLess(self._timed(lambda: proxy.set_filter_text("")), self.BUDGET)
+        self.assertEqual(proxy.rowCount(), len(self.model.files))
+        self.assertLess(matched, proxy.rowCount())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
+os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
+
+from PyQt5.QtCore import QModelIndex, Qt
+from PyQt5.QtTest import QAbstractItemModelTester, QSignalSpy
+from PyQt5.QtWidgets import QApplication
+
+from file_list_model import COLUMN_LINES, COLUMN_PATH, COLUMN_SIZE, FileListModel
+from file_metadata import FileMetadata
+
+
+class TestFileListModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.model = FileListModel()
+        self.tester = QAbstractItemModelTester(
+            self.model, QAbstractItemModelTester.FailureReportingMode.Fatal
+        )
+
+    def _display(self):
+        return [self.model.index(r).data() for r in range(self.model.rowCount())]
+
+    def test_append_notifies_only_new_rows(self):
+        self.model.set_files(["/r/a.py"])
+        spy = QSignalSpy(self.model.rowsInserted)
+        self.model.append_rows(["/r/b.py", "/r/c.py"])
+        self.assertEqual(len(spy), 1)
+        self.assertEqual((spy[0][1], spy[0][2]), (1, 2))
+        self.assertEqual(self.model.files, ["/r/a.py", "/r/b.py", "/r/c.py"])
+
+    def test_remove_rows_groups_contiguous_ranges(self):
+        self.model.set_files([f"/r/{i}.py" for i in range(6)])
+        spy = QSignalSpy(self.model.rowsRemoved)
+        self.model.remove_rows([1, 2, 4])
+        self.assertEqual(len(spy), 2)
+        self.assertEqual(self.model.files, ["/r/0.py", "/r/3.py", "/r/5.py"])
+
+    def test_removing_a_large_range_is_linear(self):
+        model = FileListModel()
+        model.set_files([f"/r/{i}.py" for i in range(100_000)])
+        spy = QSignalSpy(model.rowsRemoved)
+        start = time.perf_counter()
+        model.remove_rows(range(100_000))
+        self.assertLess(time.perf_counter() - start, 0.3)
+        self.assertEqual(len(spy), 1)
+        self.assertEqual(model.files, [])
+
+    def test_display_is_relative_to_root(self):
+        self.model.set_files(["/r/a.py", "/r/sub/b.py"])
+        self.assertEqual(self._display(), ["a.py", "b.py"])
+        self.model.set_root_path("/r")
+        self.assertEqual(self._display(), ["a.py", os.path.join("sub", "b.py")])
+        self.assertEqual(self.model.index(1).data(Qt.UserRole), "/r/sub/b.py")
+
+    def test_host_root_strips_its_prefix(self):
+        self.model.set_files(["build1:/srv/app/a.py", "build2:/srv/app/b.py"])
+        self.model.set_root_path("build1:/srv")
+        self.assertEqual(self.model.root_prefix, "build1:/srv/")
+        self.assertEqual(self._display()[0], "app/a.py")
+
+    def test_move_row_down_and_up(self):
+        self.model.set_files(["a", "b", "c"])
+        spy = QSignalSpy(self.model.rowsReordered)
+        self.assertTrue(self.model.move_row(0, 3))
+        self.assertEqual(self.model.files, ["b", "c", "a"])
+        self.assertTrue(self.model.move_row(2, 0))
+        self.assertEqual(self.model.files, ["a", "b", "c"])
+        self.assertFalse(self.model.move_row(1, 2))
+        self.assertEqual(len(spy), 2)
+
+    def test_drop_mime_data_moves_row(self):
+        self.model.set_files(["a", "b", "c"])
+        mime = self.model.mimeData([self.model.index(2)])
+        self.assertTrue(self.model.dropMimeData(mime, Qt.MoveAction, 0, 0, QModelIndex()))
+        self.assertEqual(self.model.files, ["c", "a", "b"])
+        self.assertFalse(self.model.removeRows(0, 1))
+
+    def _with_metadata(self, lines_by_path):
+        entries = {p: FileMetadata(p, 10, 0, lines=n) for p, n in lines_by_path.items()}
+        service = mock.Mock()
+        service.cached.side_effect = entries.get
+        service.get.side_effect = AssertionError("painting must not stat files")
+        self.model.set_metadata_service(service)
+        return service
+
+    def test_metadata_columns_request_missing_values(self):
+        service = self._with_metadata({"/r/a.py": 12})
+        self.model.set_files(["/r/a.py", "/r/b.py"])
+        self.assertEqual(self.model.index(0, COLUMN_LINES).data(), "12")
+        self.assertEqual(self.model.index(0, COLUMN_SIZE).data(), "10 B")
+        self.assertEqual(self.model.index(1, COLUMN_LINES).data(), "")
+        service.request.assert_called_with(["/r/b.py"])
+
+        spy = QSignalSpy(self.model.dataChanged)
+        self.model.update_metadata(1, FileMetadata("/r/b.py", 20, 0, lines=3))
+        self.assertEqual(len(spy), 1)
+        self.assertEqual(self.model.index(1, COLUMN_LINES).data(), "3")
+
+    def test_removed_rows_leave_the_metadata_service(self):
+        service = self._with_metadata({})
+        self.model.set_files(["/r/a.py", "/r/b.py", "/r/c.py"])
+        self.model.remove_rows([1])
+        service.invalidate.assert_called_with(["/r/b.py"])
+        self.model.set_files(["/r/c.py"])
+        self.assertEqual(list(service.invalidate.call_args[0][0]), ["/r/a.py"])
+
+    def test_sort_reorders_files_and_keeps_unknown_last(self):
+        service = self._with_metadata({"/r/a.py": 30, "/r/b.py": 5, "/r/d.py": 12})
+        self.model.set_files(["/r/a.py", "/r/c.py", "/r/b.py", "/r/d.py"])
+        spy = QSignalSpy(self.model.rowsReordered)
+        service.request.reset_mock()
+        self.model.sort(COLUMN_LINES, Qt.DescendingOrder)
+        self.assertEqual(self.model.files, ["/r/a.py", "/r/d.py", "/r/b.py", "/r/c.py"])
+        service.request.assert_not_called()  # sorting uses cached values only
+        self.model.sort(COLUMN_PATH, Qt.AscendingOrder)
+        self.assertEqual(self.model.files, ["/r/a.py", "/r/b.py", "/r/c.py", "/r/d.py"])
+        self.model.sort(COLUMN_PATH, Qt.AscendingOrder)
+        self.assertEqual(len(spy), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
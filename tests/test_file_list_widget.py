@@ -1,6 +1,7 @@
 import sys
 import unittest
 from types import ModuleType, SimpleNamespace
+from unittest import mock
 from unittest.mock import patch
 import os
 
@@ -11,18 +12,55 @@ os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
 class FileListWidgetTest(unittest.TestCase):
     def setUp(self):
         Dummy = type('Dummy', (), {})
+
+        class StubTableModel:
+            def __init__(self, parent=None):
+                pass
+
+            def beginResetModel(self):
+                pass
+
+            def endResetModel(self):
+                pass
+
+            def beginInsertRows(self, *args):
+                pass
+
+            def endInsertRows(self):
+                pass
+
+            def beginRemoveRows(self, *args):
+                pass
+
+            def endRemoveRows(self):
+                pass
+
         qtwidgets = ModuleType('PyQt5.QtWidgets')
-        qtwidgets.QListWidget = Dummy
-        qtwidgets.QListWidgetItem = Dummy
+        qtwidgets.QAbstractItemView = Dummy
+        qtwidgets.QHeaderView = Dummy
+        qtwidgets.QTableView = Dummy
         qtwidgets.QMenu = Dummy
         qtwidgets.QMessageBox = Dummy
         qtwidgets.QFileDialog = Dummy
+        qtwidgets.QInputDialog = Dummy
         qtwidgets.QApplication = Dummy
         qtgui = ModuleType('PyQt5.QtGui')
         qtgui.QClipboard = Dummy
         qtcore = ModuleType('PyQt5.QtCore')
         qtcore.QDateTime = Dummy
-        qtcore.Qt = Dummy
+        qtcore.Qt = type('Qt', (), {'DisplayRole': 0, 'ToolTipRole': 3, 'UserRole': 256, 'AscendingOrder': 0})
+        qtcore.QObject = Dummy
+        qtcore.QFileSystemWatcher = Dummy
+        qtcore.QTimer = Dummy
+        qtcore.pyqtSignal = lambda *args, **kwargs: None
+        qtcore.QAbstractTableModel = StubTableModel
+        qtcore.QAbstractProxyModel = StubTableModel
+        qtcore.QPersistentModelIndex = Dummy
+        qtcore.QRunnable = Dummy
+        qtcore.QThreadPool = Dummy
+        qtcore.QByteArray = Dummy
+        qtcore.QMimeData = Dummy
+        qtcore.QModelIndex = Dummy
         dummy_chardet = ModuleType('chardet')
         dummy_chardet.detect = lambda data: {'encoding': 'utf-8'}
         modules = {
@@ -36,11 +74,12 @@ class FileListWidgetTest(unittest.TestCase):
         self.patch.start()
         import importlib
         self.fw_module = importlib.import_module('file_list_widget')
+        self.model_module = importlib.import_module('file_list_model')
 
     def tearDown(self):
         self.patch.stop()
-        if 'file_list_widget' in sys.modules:
-            del sys.modules['file_list_widget']
+        for name in ('file_list_widget', 'file_list_model', 'file_filter_model'):
+            sys.modules.pop(name, None)
 
     def create_widget(self, allow_all=False, filters=None):
         obj = self.fw_module.FileListWidget.__new__(self.fw_module.FileListWidget)
@@ -50,6 +89,7 @@ class FileListWidgetTest(unittest.TestCase):
         )
         ssh = SimpleNamespace(manager=None, is_connected=lambda: False)
         obj.ctx = SimpleNamespace(settings=settings, ssh=ssh)
+        obj._model = self.model_module.FileListModel()
         obj.files = []
         obj.root_path = None
         obj.update_list_display = lambda: None
@@ -147,5 +187,85 @@ class FileListWidgetTest(unittest.TestCase):
             ],
         )
 
+    def test_add_changed_files_applies_filters_and_skips_existing(self):
+        widget = self.create_widget(False, ['.py'])
+        widget.files = ['/repo/a.py']
+        changed = ['/repo/a.py', '/repo/b.py', '/repo/notes.md']
+
+        with patch('file_list_widget.list_changed_files', return_value=changed) as mock_changed:
+            widget.add_changed_files('/repo', 'main...HEAD')
+
+        mock_changed.assert_called_once_with('/repo', 'main...HEAD')
+        self.assertEqual(widget.files, ['/repo/a.py', '/repo/b.py'])
+
+    def test_add_files_dedups_and_notifies_once(self):
+        widget = self.create_widget(False, ['.py'])
+        widget.files = ['/tmp/a.py']
+        notifications = []
+        widget._notify_change = lambda: notifications.append(list(widget.files))
+
+        added = widget.add_files(
+            ['/tmp/a.py', '/tmp/b.py', '/tmp/./b.py', '/tmp/notes.md', '/tmp/c.py']
+        )
+
+        self.assertEqual(added, ['/tmp/b.py', '/tmp/c.py'])
+        self.assertEqual(notifications, [['/tmp/a.py', '/tmp/b.py', '/tmp/c.py']])
+        self.assertEqual(widget.add_files(['/tmp/a.py']), [])
+        self.assertEqual(len(notifications), 1)
+
+    def test_membership_does_not_rescan_existing_entries(self):
+        widget = self.create_widget(True, [])
+        widget.set_files([f'/tmp/file{i}.py' for i in range(100)], notify=False)
+
+        with patch.object(widget, '_canonical_key', wraps=widget._canonical_key) as key:
+            self.assertTrue(widget._path_exists_in_list('/tmp/file42.py'))
+            self.assertFalse(widget._path_exists_in_list('/tmp/other.py'))
+        self.assertEqual(key.call_count, 2)
+
+    def test_key_index_follows_add_remove_and_reorder(self):
+        widget = self.create_widget(True, [])
+        widget._notify_change = lambda: None
+        widget.add_file('/tmp/a.py', enforce_filter=False)
+        widget.add_file('/tmp/b.py', enforce_filter=False)
+        widget.add_file('/tmp/c.py', enforce_filter=False)
+        self.assertEqual(widget.index_of('/tmp/c.py'), 2)
+
+        widget._remove_rows([0])
+        self.assertFalse(widget._path_exists_in_list('/tmp/a.py'))
+        self.assertEqual(widget.index_of('/tmp/c.py'), 1)
+
+        widget.files = ['/tmp/c.py', '/tmp/b.py']
+        self.assertEqual(widget.index_of('/tmp/c.py'), 0)
+        widget.add_file('/tmp/./b.py', enforce_filter=False)
+        self.assertEqual(widget.files, ['/tmp/c.py', '/tmp/b.py'])
+
+    def test_windows_keys_are_case_insensitive(self):
+        widget = self.create_widget(True, [])
+        widget.set_files(['C:\\Src\\Main.py'], notify=False)
+        self.assertTrue(widget._path_exists_in_list('c:/src/main.py'))
+
+    def test_host_qualified_paths_keep_posix_separators(self):
+        widget = self.create_widget(True, [])
+        widget.set_files(['build1:/srv/./app/main.py', 'C:/src/main.py'], notify=False)
+        self.assertEqual(widget.files, ['build1:/srv/app/main.py', 'C:\\src\\main.py'])
+        self.assertFalse(widget._path_exists_in_list('BUILD1:/srv/app/main.py'))
+
+    def test_inspection_waits_for_background_metadata(self):
+        widget = self.create_widget(True, [])
+        widget._pending_inspections = {}
+        service = mock.Mock()
+        service.get.return_value = None
+        widget.ctx.metadata = service
+        shown = []
+        widget._inspect('/srv/a.py', shown.append)
+        widget._inspect('/srv/a.py', shown.append)
+        self.assertEqual(shown, [])
+        self.assertEqual(service.request.call_count, 2)
+        widget._on_metadata_ready('/srv/a.py', 'metadata')
+        self.assertEqual(shown, ['metadata', 'metadata'])
+        service.get.return_value = 'cached'
+        widget._inspect('/srv/a.py', shown.append)
+        self.assertEqual(shown[-1], 'cached')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,174 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
+os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
+
+from PyQt5.QtWidgets import QApplication
+
+import file_metadata
+from file_metadata import (
+    MetadataService,
+    compute_metadata,
+    compute_remote_metadata,
+    detect_encoding,
+    format_size,
+)
+
+
+class TestComputeMetadata(unittest.TestCase):
+    def test_counts_lines_tokens_and_encoding(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a.py")
+            with open(path, "wb") as fh:
+                fh.write("print('é')\nx = 1\ny".encode("utf-8"))
+            metadata = compute_metadata(path)
+        self.assertEqual(metadata.lines, 3)
+        self.assertEqual(metadata.size, 19)
+        self.assertEqual(metadata.tokens, 5)
+        self.assertEqual(metadata.encoding, "utf-8")
+        self.assertIsNone(metadata.error)
+
+    def test_lines_span_read_chunks(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "big.txt")
+            with open(path, "wb") as fh:
+                fh.write(b"line\n" * 1000)
+            with mock.patch.object(file_metadata, "ENCODING_SAMPLE_BYTES", 7), \
+                    mock.patch.object(file_metadata, "READ_CHUNK_BYTES", 13):
+                metadata = compute_metadata(path)
+        self.assertEqual(metadata.lines, 1000)
+        self.assertEqual(metadata.encoding, "ascii")
+
+    def test_missing_file_reports_error(self):
+        metadata = compute_metadata(os.path.join(tempfile.gettempdir(), "does-not-exist.py"))
+        self.assertIsNotNone(metadata.error)
+
+    def test_sample_cut_inside_multibyte_sequence_is_utf8(self):
+        sample = "aé".encode("utf-8")[:-1]
+        self.assertEqual(detect_encoding(sample, truncated=True)[0], "utf-8")
+
+    def test_format_size(self):
+        self.assertEqual(format_size(512), "512 B")
+        self.assertEqual(format_size(1536), "1.5 KB")
+        self.assertEqual(format_size(3 * 1024 ** 3), "3.0 GB")
+
+
+def _remote_manager(content: bytes, mtime: int = 1_700_000_000):
+    manager = mock.Mock()
+    manager.has_session.return_value = True
+    manager.stat.return_value = mock.Mock(st_size=len(content), st_mtime=mtime)
+    manager.read_sample.side_effect = lambda path, size: content[:size]
+    return manager
+
+
+class TestComputeRemoteMetadata(unittest.TestCase):
+    def test_small_file_is_fully_sampled(self):
+        manager = _remote_manager(b"one\ntwo")
+        metadata = compute_remote_metadata("/srv/a.py", manager)
+        self.assertEqual((metadata.size, metadata.lines, metadata.encoding), (7, 2, "ascii"))
+        manager.read_sample.assert_called_once_with("/srv/a.py", file_metadata.ENCODING_SAMPLE_BYTES)
+
+    def test_large_file_reads_only_a_sample(self):
+        manager = _remote_manager(b"x\n" * file_metadata.ENCODING_SAMPLE_BYTES)
+        metadata = compute_remote_metadata("/srv/big.log", manager)
+        self.assertIsNone(metadata.lines)
+        self.assertEqual(metadata.tokens, file_metadata.ENCODING_SAMPLE_BYTES // 2)
+
+    def test_unchanged_file_reuses_previous_entry(self):
+        manager = _remote_manager(b"data\n")
+        previous = compute_remote_metadata("/srv/a.py", manager)
+        manager.read_sample.reset_mock()
+        self.assertIs(compute_remote_metadata("/srv/a.py", manager, previous), previous)
+        manager.read_sample.assert_not_called()
+
+
+class TestMetadataService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def _drain(self, service):
+        service.wait()
+        QApplication.processEvents()
+
+    def test_results_are_cached_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a.txt")
+            with open(path, "w") as fh:
+                fh.write("one\n")
+            compute = mock.Mock(side_effect=compute_metadata)
+            service = MetadataService(compute=compute)
+            ready = []
+            service.metadataReady.connect(lambda p, m: ready.append((p, m.lines)))
+
+            service.request([path, path])
+            self._drain(service)
+            service.request([path])
+            self._drain(service)
+            self.assertEqual(compute.call_count, 1)
+            self.assertEqual(ready, [(path, 1)])
+            self.assertEqual(service.get(path).lines, 1)
+
+            with open(path, "w") as fh:
+                fh.write("one\ntwo\nthree\n")
+            self.assertIsNone(service.get(path))
+            service.request([path])
+            self._drain(service)
+            self.assertEqual(compute.call_count, 2)
+            self.assertEqual(service.get(path).lines, 3)
+
+    def test_requests_and_cached_lookups_never_stat_on_the_gui_thread(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a.txt")
+            with open(path, "w") as fh:
+                fh.write("one\n")
+            service = MetadataService()
+            real_stat = os.stat
+            gui_stats = []
+
+            def stat(p, *args, **kwargs):
+                if threading.current_thread() is threading.main_thread():
+                    gui_stats.append(p)
+                return real_stat(p, *args, **kwargs)
+
+            with mock.patch("file_metadata.os.stat", side_effect=stat):
+                service.request([path])
+                self._drain(service)
+                self.assertEqual(service.cached(path).lines, 1)
+                service.request([path])
+                self._drain(service)
+            self.assertEqual(gui_stats, [])
+            service.invalidate([path])
+            self.assertIsNone(service.cached(path))
+            self.assertEqual(len(service), 0)
+
+    def test_remote_paths_use_sftp_and_skip_local_stat(self):
+        manager = _remote_manager(b"remote\n")
+        compute = mock.Mock(side_effect=compute_metadata)
+        service = MetadataService(compute=compute, ssh_manager=manager)
+        service.request(["/srv/app/main.py"])
+        self._drain(service)
+        compute.assert_not_called()
+        with mock.patch("file_metadata.os.stat") as local_stat:
+            self.assertEqual(service.get("/srv/app/main.py").lines, 1)
+            local_stat.assert_not_called()
+        service.request(["/srv/app/main.py"])
+        self._drain(service)
+        manager.stat.assert_called_once()
+
+        with mock.patch("file_metadata.time.monotonic", return_value=time.monotonic() + 3600):
+            self.assertIsNone(service.get("/srv/app/main.py"))
+            service.request(["/srv/app/main.py"])
+            self._drain(service)
+        self.assertEqual(manager.stat.call_count, 2)
+        manager.read_sample.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import threading
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
+os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
+
+from PyQt5.QtWidgets import QApplication
+
+from folder_sync import FolderSync
+from utils import list_files
+
+
+class TestFolderSync(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        os.makedirs(os.path.join(self.root, "sub"))
+        self._touch("a.py")
+        self._touch("sub", "b.py")
+        self.events = []
+        self.sync = FolderSync(self._list_folder, self._accept)
+        self.sync.changed.connect(lambda added, removed: self.events.append((added, removed)))
+        _files, walked = self._list_folder(self.root)
+        self.sync.add_source(self.root, walked)
+
+    def tearDown(self):
+        self.sync.clear()
+        self.tmpdir.cleanup()
+
+    def _touch(self, *parts):
+        with open(os.path.join(self.root, *parts), "w") as fh:
+            fh.write("x")
+
+    def _list_folder(self, folder):
+        walked = []
+        return list_files(folder, [".py"], {"ignored"}, visited_dirs=walked), walked
+
+    def _accept(self, path, is_dir):
+        if is_dir:
+            return os.path.basename(path) != "ignored"
+        return path.endswith(".py")
+
+    def _flush(self, *dirs):
+        for directory in dirs:
+            self.sync._queue(directory)
+        self.sync.flush()
+
+    def test_sources_are_recorded(self):
+        self.assertEqual(self.sync.sources, [os.path.normpath(self.root)])
+
+    def test_new_and_deleted_files_reported(self):
+        self._touch("c.py")
+        self._touch("notes.txt")
+        os.remove(os.path.join(self.root, "sub", "b.py"))
+        self._flush(self.root, os.path.join(self.root, "sub"))
+        self.assertEqual(
+            self.events,
+            [([os.path.join(self.root, "c.py")], [os.path.join(self.root, "sub", "b.py")])],
+        )
+
+    def test_new_subdirectory_is_walked_and_watched(self):
+        os.makedirs(os.path.join(self.root, "pkg", "deep"))
+        self._touch("pkg", "deep", "d.py")
+        os.makedirs(os.path.join(self.root, "ignored"))
+        self._touch("ignored", "e.py")
+        self._flush(self.root)
+        self.assertEqual(self.events, [([os.path.join(self.root, "pkg", "deep", "d.py")], [])])
+
+        self._touch("pkg", "deep", "f.py")
+        self._flush(os.path.join(self.root, "pkg", "deep"))
+        self.assertEqual(self.events[-1], ([os.path.join(self.root, "pkg", "deep", "f.py")], []))
+
+    def test_renamed_directory_moves_files(self):
+        os.rename(os.path.join(self.root, "sub"), os.path.join(self.root, "renamed"))
+        self._flush(self.root, os.path.join(self.root, "sub"))
+        self.assertEqual(
+            self.events,
+            [([os.path.join(self.root, "renamed", "b.py")], [os.path.join(self.root, "sub")])],
+        )
+
+    def test_unchanged_directory_emits_nothing(self):
+        self._flush(self.root)
+        self.assertEqual(self.events, [])
+
+    def test_set_sources_walks_in_the_background(self):
+        walked_on = []
+
+        def walk(folder):
+            walked_on.append(threading.current_thread())
+            return self._list_folder(folder)
+
+        sync = FolderSync(self._list_folder, self._accept, walk_folder=walk, max_watched_dirs=1)
+        sync.changed.connect(lambda added, removed: self.events.append((added, removed)))
+        sync.set_sources([self.root])
+        self.assertEqual(sync.sources, [os.path.normpath(self.root)])
+        sync.wait_for_done()
+        QApplication.processEvents()
+        self.assertNotIn(threading.main_thread(), walked_on)
+        self.assertEqual(len(sync._snapshots), 1)  # over budget: only the first directory
+        self._touch("c.py")
+        sync._queue(self.root)
+        sync.flush()
+        self.assertEqual(self.events, [([os.path.join(self.root, "c.py")], [])])
+        sync.clear()
+
+    def test_clear_forgets_sources(self):
+        self.sync.clear()
+        self._touch("c.py")
+        self._flush(self.root)
+        self.assertEqual(self.sync.sources, [])
+        self.assertEqual(self.events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+import git_utils
+from git_utils import excludes_file, list_changed_files, list_git_files
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+@unittest.skipUnless(shutil.which("git"), "git executable not available")
+class TestListGitFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        _git(self.root, "init", "-q")
+        for rel, content in {
+            ".gitignore": "generated/\n",
+            "a.py": "",
+            "b.txt": "",
+            "gone.py": "",
+            "node_modules/dep.py": "",
+            "pkg/mod.py": "",
+            "generated/big.py": "",
+        }.items():
+            path = os.path.join(self.root, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fh:
+                fh.write(content)
+        _git(self.root, "add", "a.py", "gone.py", "pkg/mod.py", "node_modules/dep.py")
+        os.remove(os.path.join(self.root, "gone.py"))
+        with open(os.path.join(self.root, "new.py"), "w") as fh:
+            fh.write("")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _rel(self, paths):
+        return {os.path.relpath(p, self.root).replace(os.sep, "/") for p in paths}
+
+    def test_tracked_and_untracked_files_without_ignored_or_deleted(self):
+        result = list_git_files(self.root)
+        self.assertEqual(
+            self._rel(result),
+            {".gitignore", "a.py", "b.txt", "new.py", "node_modules/dep.py", "pkg/mod.py"},
+        )
+
+    def test_extension_and_folder_filters_applied(self):
+        result = list_git_files(self.root, [".py"], {"node_modules"})
+        self.assertEqual(self._rel(result), {"a.py", "new.py", "pkg/mod.py"})
+
+    def test_visited_dirs_include_folders_without_matching_files(self):
+        os.makedirs(os.path.join(self.root, "docs", "guide"))
+        with open(os.path.join(self.root, "docs", "guide", "intro.txt"), "w") as fh:
+            fh.write("")
+        visited = []
+        list_git_files(self.root, [".py"], {"node_modules"}, visited)
+        self.assertEqual(self._rel(visited), {".", "pkg", "docs", "docs/guide"})
+
+    def test_subdirectory_lists_only_its_files(self):
+        result = list_git_files(os.path.join(self.root, "pkg"))
+        self.assertEqual(self._rel(result), {"pkg/mod.py"})
+
+    def test_excludes_file_reads_repository_config(self):
+        target = os.path.join(self.root, "global-ignore")
+        _git(self.root, "config", "core.excludesFile", target)
+        self.assertEqual(excludes_file(os.path.join(self.root, "pkg")), target)
+
+
+@unittest.skipUnless(shutil.which("git"), "git executable not available")
+class TestListChangedFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        _git(self.root, "init", "-q")
+        self._write("a.py", "one")
+        self._write("b.py", "one")
+        self._write("c.py", "one")
+        self._commit("base")
+        _git(self.root, "tag", "base")
+        self._write("a.py", "two")
+        os.remove(os.path.join(self.root, "c.py"))
+        self._commit("change")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, rel, content):
+        with open(os.path.join(self.root, rel), "w") as fh:
+            fh.write(content)
+
+    def _commit(self, message):
+        _git(self.root, "add", "-A")
+        _git(
+            self.root,
+            "-c", "user.name=test", "-c", "user.email=test@example.com",
+            "commit", "-q", "-m", message,
+        )
+
+    def _rel(self, paths):
+        return sorted(os.path.relpath(p, self.root) for p in paths)
+
+    def test_working_tree_changes_include_untracked(self):
+        self._write("b.py", "dirty")
+        self._write("new.py", "")
+        self.assertEqual(self._rel(list_changed_files(self.root)), ["b.py", "new.py"])
+
+    def test_clean_work_tree_has_no_changes(self):
+        self.assertEqual(list_changed_files(self.root), [])
+
+    def test_revision_range_skips_deleted_files(self):
+        self.assertEqual(self._rel(list_changed_files(self.root, "base HEAD")), ["a.py"])
+
+    def test_unknown_revision_returns_none(self):
+        self.assertIsNone(list_changed_files(self.root, "no-such-ref"))
+
+    def test_options_are_rejected(self):
+        self.assertIsNone(list_changed_files(self.root, "--output=/tmp/x"))
+
+
+class TestListGitFilesFallback(unittest.TestCase):
+    def test_returns_none_outside_work_tree(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch.object(git_utils, "is_inside_work_tree", return_value=False):
+            self.assertIsNone(list_git_files(tmpdir))
+
+    def test_returns_none_when_git_missing(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch("git_utils.subprocess.run", side_effect=FileNotFoundError):
+            self.assertIsNone(list_git_files(tmpdir))
+
+
+if __name__ == "__main__":
+    unittest.main()
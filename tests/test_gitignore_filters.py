@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import gitignore_filters
+from gitignore_filters import (
+    GitIgnoreMatcher,
+    matcher_for_directory,
+    parse_gitignore_lines,
+)
+from utils import list_files
+
+
+def _matcher(text: str) -> GitIgnoreMatcher:
+    return GitIgnoreMatcher("", parse_gitignore_lines(text.splitlines()))
+
+
+class TestGitIgnorePatterns(unittest.TestCase):
+    def test_comments_and_blank_lines_skipped(self):
+        patterns = parse_gitignore_lines(["# comment", "", "   ", "*.log"])
+        self.assertEqual([p.pattern for p in patterns], ["*.log"])
+
+    def test_unanchored_pattern_matches_at_any_depth(self):
+        matcher = _matcher("*.log")
+        self.assertTrue(matcher.is_ignored("a.log", False))
+        self.assertTrue(matcher.is_ignored("deep/dir/a.log", False))
+        self.assertFalse(matcher.is_ignored("a.txt", False))
+
+    def test_anchored_pattern_only_matches_from_base(self):
+        matcher = _matcher("/build\nsrc/gen")
+        self.assertTrue(matcher.is_ignored("build", True))
+        self.assertFalse(matcher.is_ignored("sub/build", True))
+        self.assertTrue(matcher.is_ignored("src/gen", True))
+        self.assertFalse(matcher.is_ignored("other/src/gen", True))
+
+    def test_directory_only_pattern(self):
+        matcher = _matcher("out/")
+        self.assertTrue(matcher.is_ignored("out", True))
+        self.assertFalse(matcher.is_ignored("out", False))
+
+    def test_negation_last_match_wins(self):
+        matcher = _matcher("*.txt\n!keep.txt")
+        self.assertTrue(matcher.is_ignored("a.txt", False))
+        self.assertFalse(matcher.is_ignored("keep.txt", False))
+
+    def test_double_star(self):
+        matcher = _matcher("**/cache\nlogs/**\na/**/z")
+        self.assertTrue(matcher.is_ignored("x/y/cache", True))
+        self.assertTrue(matcher.is_ignored("cache", True))
+        self.assertTrue(matcher.is_ignored("logs/today.txt", False))
+        self.assertTrue(matcher.is_ignored("a/z", False))
+        self.assertTrue(matcher.is_ignored("a/b/c/z", False))
+
+    def test_child_matcher_overrides_parent(self):
+        parent = _matcher("*.gen")
+        child = parent.child("sub", parse_gitignore_lines(["!*.gen"]))
+        self.assertTrue(child.is_ignored("x.gen", False))
+        self.assertFalse(child.is_ignored("sub/x.gen", False))
+
+    def test_child_without_patterns_reuses_parent(self):
+        parent = _matcher("*.gen")
+        self.assertIs(parent.child("sub", ()), parent)
+
+
+class TestListFilesGitignore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        layout = {
+            ".gitignore": "generated/\n*.tmp\n!keep.tmp\n/top.txt\n",
+            ".git/info/exclude": "secret.txt\n",
+            ".git/config": "",
+            "top.txt": "",
+            "a.py": "",
+            "x.tmp": "",
+            "keep.tmp": "",
+            "secret.txt": "",
+            "generated/big.py": "",
+            "pkg/top.txt": "",
+            "pkg/.gitignore": "local.py\n",
+            "pkg/local.py": "",
+            "pkg/mod.py": "",
+        }
+        for rel, content in layout.items():
+            path = os.path.join(self.root, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fh:
+                fh.write(content)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _rel(self, paths):
+        return {os.path.relpath(p, self.root).replace(os.sep, "/") for p in paths}
+
+    def test_gitignore_respected(self):
+        result = list_files(self.root, respect_gitignore=True)
+        self.assertEqual(
+            self._rel(result),
+            {".gitignore", "a.py", "keep.tmp", "pkg/top.txt", "pkg/.gitignore", "pkg/mod.py"},
+        )
+
+    def test_gitignore_disabled_by_default(self):
+        result = self._rel(list_files(self.root))
+        self.assertIn("generated/big.py", result)
+        self.assertIn(".git/config", result)
+
+    def test_subdirectory_inherits_parent_rules(self):
+        result = list_files(
+            os.path.join(self.root, "pkg"), extensions=[".py"], respect_gitignore=True
+        )
+        self.assertEqual(self._rel(result), {"pkg/mod.py"})
+
+    def test_matcher_for_nested_directory_uses_worktree_root(self):
+        matcher, root = matcher_for_directory(os.path.join(self.root, "pkg"))
+        self.assertEqual(os.path.realpath(root), os.path.realpath(self.root))
+        self.assertTrue(matcher.is_ignored("pkg/generated", True))
+        self.assertTrue(matcher.is_ignored("pkg/secret.txt", False))
+
+    def test_global_excludes_file_applied_below_repository_rules(self):
+        global_file = os.path.join(self.root, "global-ignore")
+        with open(global_file, "w") as fh:
+            fh.write("*.py\n!keep.tmp\n")
+        with mock.patch.object(gitignore_filters, "_excludes_file", return_value=global_file):
+            result = self._rel(list_files(self.root, respect_gitignore=True))
+        self.assertNotIn("a.py", result)
+        self.assertNotIn("pkg/mod.py", result)
+        self.assertNotIn("x.tmp", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
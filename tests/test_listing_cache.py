@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
+os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
+
+from PyQt5.QtWidgets import QApplication
+
+import listing_cache
+from listing_cache import DirectoryListingCache
+
+
+class TestDirectoryListingCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        os.makedirs(os.path.join(self.root, "sub"))
+        for rel in ("a.py", "b.txt", os.path.join("sub", "c.py")):
+            with open(os.path.join(self.root, rel), "w") as fh:
+                fh.write("x")
+        self.cache = DirectoryListingCache()
+
+    def tearDown(self):
+        self.cache.clear()
+        self.tmpdir.cleanup()
+
+    def test_repeated_listing_does_not_walk_again(self):
+        with mock.patch.object(listing_cache, "list_files", wraps=listing_cache.list_files) as walk:
+            first = self.cache.list_files(self.root, [".py"], {"node_modules"})
+            second = self.cache.list_files(self.root, [".PY"], {"node_modules"})
+        self.assertEqual(walk.call_count, 1)
+        self.assertEqual(sorted(first), sorted(second))
+        self.assertEqual(len(first), 2)
+
+    def test_different_filters_are_cached_separately(self):
+        py_files = self.cache.list_files(self.root, [".py"])
+        txt_files = self.cache.list_files(self.root, [".txt"])
+        self.assertEqual(len(py_files), 2)
+        self.assertEqual(len(txt_files), 1)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_returned_list_is_a_copy(self):
+        files = self.cache.list_files(self.root)
+        files.clear()
+        self.assertEqual(len(self.cache.list_files(self.root)), 3)
+
+    def test_change_in_subdirectory_invalidates_entry(self):
+        self.cache.list_files(self.root, [".py"])
+        self.cache.list_files(self.root, [".txt"])
+        with open(os.path.join(self.root, "sub", "d.py"), "w") as fh:
+            fh.write("x")
+        self.cache.invalidate_directory(os.path.join(self.root, "sub"))
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(len(self.cache.list_files(self.root, [".py"])), 3)
+
+    def test_inherited_ignore_files_invalidate_entry(self):
+        sub = os.path.join(self.root, "sub")
+        global_file = os.path.join(self.root, "global-ignore")
+        for rel in (".git/info/exclude", ".gitignore", "global-ignore"):
+            path = os.path.join(self.root, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+        with mock.patch("gitignore_filters._excludes_file", return_value=global_file):
+            for changed in (".git/info/exclude", ".gitignore", "global-ignore"):
+                self.assertEqual(len(self.cache.list_files(sub, respect_gitignore=True)), 1)
+                self.assertEqual(len(self.cache), 1)
+                self.cache._on_file_changed(os.path.join(self.root, *changed.split("/")))
+                self.assertEqual(len(self.cache), 0, changed)
+
+    def test_missing_ancestor_gitignore_watches_its_folder(self):
+        os.makedirs(os.path.join(self.root, ".git"))
+        sub = os.path.join(self.root, "sub")
+        self.cache.list_files(sub, respect_gitignore=True)
+        self.cache.invalidate_directory(self.root)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_trees_over_watch_budget_are_not_cached(self):
+        cache = DirectoryListingCache(max_watched_dirs=1)
+        self.assertEqual(len(cache.list_files(self.root)), 3)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,10 +5,18 @@ os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
 os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion") 
 os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
 
+import tempfile
+
+from PyQt5.QtCore import QStandardPaths
 from PyQt5.QtWidgets import QApplication
 
-from main_window import MainWindow
+from main_window import MainWindow, _PendingWorkspace
 from app_context import AppContext
+from session_store import SessionStore, WorkspaceSession
+from tab_history import TabState
+
+# Keep window tests away from the real session file
+QStandardPaths.setTestModeEnabled(True)
 
 
 class TestMainWindowTabs(unittest.TestCase):
@@ -16,8 +24,17 @@ class TestMainWindowTabs(unittest.TestCase):
     def setUpClass(cls):
         cls.app = QApplication.instance() or QApplication([])
 
-    def test_add_and_close_workspace_tabs(self):
+    def _ctx(self, session_path=None):
         ctx = AppContext()
+        if session_path is None:
+            self._tmpdir = tempfile.TemporaryDirectory()
+            self.addCleanup(self._tmpdir.cleanup)
+            session_path = os.path.join(self._tmpdir.name, "session.json.gz")
+        ctx.sessions = SessionStore(session_path)
+        return ctx
+
+    def test_add_and_close_workspace_tabs(self):
+        ctx = self._ctx()
         window = MainWindow(ctx)
         try:
             initial_count = len(window.workspace_tabs)
@@ -39,6 +56,43 @@ class TestMainWindowTabs(unittest.TestCase):
         finally:
             window.close()
 
+    def test_workspaces_are_saved_and_restored_lazily(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "session.json.gz")
+            state = TabState(
+                files=("/srv/a.py", "/srv/b.py"),
+                root_path="/srv",
+                include_root=True,
+                prefix="<<",
+                suffix=">>",
+                preset="Custom",
+            )
+            SessionStore(path).save(
+                [WorkspaceSession("Workspace 1", state), WorkspaceSession("Backend", state)], current=1
+            )
+            window = MainWindow(self._ctx(path))
+            try:
+                first, second = window.workspace_tabs
+                self.assertIsInstance(first, _PendingWorkspace)
+                self.assertEqual(second.list_widget.files, ["/srv/a.py", "/srv/b.py"])
+                self.assertEqual(second.prefix_input.text(), "<<")
+                self.assertFalse(second.can_undo())
+                self.assertEqual(window.tabs.tabText(1), "Backend")
+
+                window.tabs.setCurrentIndex(0)
+                restored = window.workspace_tabs[0]
+                self.assertNotIsInstance(restored, _PendingWorkspace)
+                self.assertIs(window.tabs.widget(0), restored)
+                self.assertEqual(restored.root_path, "/srv")
+
+                restored.list_widget.remove_paths(["/srv/a.py"])
+            finally:
+                window.close()
+            workspaces, current = SessionStore(path).load()
+            self.assertEqual(current, 0)
+            self.assertEqual([w.title for w in workspaces], ["Workspace 1", "Backend"])
+            self.assertEqual(workspaces[0].state.files, ("/srv/b.py",))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,116 @@
+import os
+import random
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
+os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
+
+from PyQt5.QtWidgets import QApplication
+
+import path_index
+from path_index import PathIndex, PathIndexService
+
+
+def _rel(index, hits):
+    return [index.rel_paths[i] for i in hits]
+
+
+class TestPathIndex(unittest.TestCase):
+    def setUp(self):
+        root = os.path.join(os.sep, "proj")
+        self.files = [
+            os.path.join(root, *rel.split("/"))
+            for rel in (
+                "src/main.py",
+                "src/widgets/file_list_widget.py",
+                "docs/main_page.md",
+                "main/readme.txt",
+                "tests/test_widget.py",
+            )
+        ]
+        self.index = PathIndex(root, self.files)
+
+    def test_name_matches_rank_before_path_matches(self):
+        self.assertEqual(
+            _rel(self.index, self.index.search("Main")),
+            ["src/main.py", "docs/main_page.md", "main/readme.txt"],
+        )
+
+    def test_fuzzy_is_only_a_fallback(self):
+        self.assertEqual(_rel(self.index, self.index.search("flw")), ["src/widgets/file_list_widget.py"])
+        self.assertEqual(_rel(self.index, self.index.search("src/wid")), ["src/widgets/file_list_widget.py"])
+        self.assertEqual(self.index.search("zzz"), [])
+        self.assertEqual(self.index.search("  "), [])
+
+    def test_limit_caps_results(self):
+        self.assertEqual(len(self.index.search("s", limit=2)), 2)
+
+    def test_narrowing_matches_full_scan(self):
+        rng = random.Random(7)
+        words = ["core", "util", "view", "model", "test", "api"]
+        files = [
+            f"/r/{rng.choice(words)}{i % 7}/{rng.choice(words)}_{rng.choice(words)}_{i}.py"
+            for i in range(3000)
+        ]
+        with mock.patch.object(path_index, "BLOCK_LINES", 16):
+            typed = PathIndex("/r", files)
+            fresh = PathIndex("/r", files)
+        query = "viewmodel_12"
+        for end in range(1, len(query) + 1):
+            self.assertEqual(typed.search(query[:end], limit=50), fresh.search(query[:end], limit=50))
+            fresh._last = ("", [], False, False)
+
+
+class TestPathIndexService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_builds_in_background_and_serves_cached_index(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(os.path.join(tmpdir, "node_modules"))
+            for rel in ("a.py", "b.txt", os.path.join("node_modules", "dep.js")):
+                with open(os.path.join(tmpdir, rel), "w") as fh:
+                    fh.write("x")
+            service = PathIndexService()
+            ready = []
+            service.indexReady.connect(ready.append)
+
+            self.assertIsNone(service.index_for(tmpdir, {"node_modules"}))
+            self.assertTrue(service.is_building(tmpdir))
+            service.wait()
+            QApplication.processEvents()
+
+            self.assertEqual(len(ready), 1)
+            self.assertEqual(sorted(ready[0].rel_paths), ["a.py", "b.txt"])
+            with mock.patch.object(path_index, "build_path_index") as build:
+                self.assertIs(service.index_for(tmpdir, {"node_modules"}), ready[0])
+            build.assert_not_called()
+
+
+class TestFilePickerDialog(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_query_lists_matches_and_returns_absolute_paths(self):
+        from file_picker import FilePickerDialog
+
+        index = PathIndex("/proj", ["/proj/src/main.py", "/proj/src/util.py", "/proj/README.md"])
+        service = mock.Mock()
+        service.index_for.return_value = index
+        service.is_building.return_value = False
+        dialog = FilePickerDialog(SimpleNamespace(path_index=service, settings=None), "/proj")
+
+        dialog.query_input.setText("util")
+        self.assertEqual(dialog.results.count(), 1)
+        self.assertEqual(dialog.selected_paths(), ["/proj/src/util.py"])
+        self.assertIn("3 files indexed", dialog.status_label.text())
+
+
+if __name__ == "__main__":
+    unittest.main()
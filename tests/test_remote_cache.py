@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from remote_cache import INDEX_FILENAME, RemoteContentCache
+from ssh_controller import RemotePathInfo
+from file_concatenator import ContentCache, build_concatenation, prefetch_remote_files
+
+TEXT = b"print('hello')\n" * 200
+
+
+class TestRemoteContentCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_entries_match_only_the_same_size_and_mtime(self):
+        cache = RemoteContentCache(self.dir)
+        cache.put("box", "/srv/a.py", len(TEXT), 100, TEXT)
+        self.assertEqual(cache.get("box", "/srv/a.py", len(TEXT), 100), TEXT)
+        self.assertIsNone(cache.get("box", "/srv/a.py", len(TEXT), 101))
+        self.assertIsNone(cache.get("other", "/srv/a.py", len(TEXT), 100))
+
+    def test_contents_are_compressed_when_smaller(self):
+        cache = RemoteContentCache(self.dir)
+        cache.put("box", "/srv/a.py", len(TEXT), 100, TEXT)
+        self.assertLess(cache.total_bytes, len(TEXT) // 10)
+        raw = RemoteContentCache(tempfile.mkdtemp(dir=self.dir), compress=False)
+        raw.put("box", "/srv/a.py", len(TEXT), 100, TEXT)
+        self.assertEqual(raw.total_bytes, len(TEXT))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        data = os.urandom(1000)
+        cache = RemoteContentCache(self.dir, max_bytes=2500, compress=False)
+        with mock.patch("remote_cache.time.time", side_effect=range(100)):
+            cache.put("box", "/a", 1000, 1, data)
+            cache.put("box", "/b", 1000, 1, data)
+            cache.get("box", "/a", 1000, 1)
+            cache.put("box", "/c", 1000, 1, data)
+        self.assertIsNotNone(cache.get("box", "/a", 1000, 1))
+        self.assertIsNone(cache.get("box", "/b", 1000, 1))
+        self.assertEqual(cache.total_bytes, 2000)
+
+    def test_index_survives_restarts_and_orphans_are_removed(self):
+        cache = RemoteContentCache(self.dir)
+        cache.put("box", "/srv/a.py", len(TEXT), 100, TEXT)
+        cache.flush()
+        with open(os.path.join(self.dir, "orphan"), "wb") as fh:
+            fh.write(b"left by a crash")
+
+        reloaded = RemoteContentCache(self.dir)
+        self.assertEqual(reloaded.get("box", "/srv/a.py", len(TEXT), 100), TEXT)
+        self.assertEqual(sorted(os.listdir(self.dir)), sorted([INDEX_FILENAME, reloaded._key("box", "/srv/a.py")]))
+
+    def test_corrupt_index_starts_empty(self):
+        with open(os.path.join(self.dir, INDEX_FILENAME), "w") as fh:
+            fh.write("{not json")
+        self.assertEqual(len(RemoteContentCache(self.dir)), 0)
+
+
+class TestPrefetchWithCache(unittest.TestCase):
+    def test_unchanged_files_are_not_downloaded_again(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = RemoteContentCache(tmpdir)
+            cache.put("box", "/srv/a.py", 3, 10, b"old")
+            ssh = mock.Mock(host="box")
+            ssh.has_session.return_value = True
+            ssh.stat_many.return_value = [
+                RemotePathInfo("/srv/a.py", True, size=3, mtime=10),
+                RemotePathInfo("/srv/b.py", True, size=3, mtime=10),
+                RemotePathInfo("/srv/gone.py", False),
+            ]
+            ssh.read_many.return_value = {"/srv/b.py": b"new"}
+
+            fetched = prefetch_remote_files(["/srv/a.py", "/srv/b.py", "/srv/gone.py"], ssh, remote_cache=cache)
+
+            self.assertEqual(fetched, {"/srv/a.py": b"old", "/srv/b.py": b"new"})
+            ssh.read_many.assert_called_once_with(["/srv/b.py"])
+            self.assertEqual(RemoteContentCache(tmpdir).get("box", "/srv/b.py", 3, 10), b"new")
+
+    def test_decoded_text_is_kept_in_the_content_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = RemoteContentCache(tmpdir)
+            texts = ContentCache()
+            ssh = mock.Mock(host="box")
+            ssh.has_session.return_value = True
+            ssh.stat_many.return_value = [RemotePathInfo("/srv/a.py", True, size=3, mtime=10)]
+            ssh.read_many.return_value = {"/srv/a.py": b"new"}
+
+            first = build_concatenation(["/srv/a.py"], prefix="", suffix="", ssh_manager=ssh,
+                                        content_cache=texts, remote_cache=cache)
+            with mock.patch.object(cache, "get") as from_disk:
+                second = build_concatenation(["/srv/a.py"], prefix="", suffix="", ssh_manager=ssh,
+                                             content_cache=texts, remote_cache=cache)
+
+            self.assertEqual(first.text, "\nnew\n\n")
+            self.assertEqual(second.text, first.text)
+            ssh.read_many.assert_called_once()
+            ssh.read_bytes.assert_not_called()
+            from_disk.assert_not_called()
+
+            ssh.stat_many.return_value = [RemotePathInfo("/srv/a.py", True, size=7, mtime=11)]
+            ssh.read_many.return_value = {"/srv/a.py": b"changed"}
+            third = build_concatenation(["/srv/a.py"], prefix="", suffix="", ssh_manager=ssh,
+                                        content_cache=texts, remote_cache=cache)
+            self.assertEqual(third.text, "\nchanged\n\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+from remote_paths import (
+    HostProfile,
+    format_host_profiles,
+    join_host_path,
+    parse_host_profiles,
+    remote_target,
+    split_host_path,
+)
+
+
+class TestHostPaths(unittest.TestCase):
+    def test_split_and_join(self):
+        self.assertEqual(split_host_path("build1:/srv/app.py"), ("build1", "/srv/app.py"))
+        self.assertEqual(join_host_path("build1", "/srv/app.py"), "build1:/srv/app.py")
+
+    def test_drive_letters_and_plain_paths_are_not_qualified(self):
+        for path in ("C:/src/app.py", "C:\\src\\app.py", "/srv/app.py", "build1:relative", ""):
+            self.assertIsNone(split_host_path(path), path)
+
+    def test_profiles_round_trip(self):
+        profiles = parse_host_profiles("build1=alice@10.0.0.5, bad entry,\nci-2 = bob@ci.example.com")
+        self.assertEqual(
+            profiles,
+            {
+                "build1": HostProfile("build1", "10.0.0.5", "alice"),
+                "ci-2": HostProfile("ci-2", "ci.example.com", "bob"),
+            },
+        )
+        self.assertEqual(parse_host_profiles(format_host_profiles(profiles)), profiles)
+
+    def test_remote_target_without_registry(self):
+        manager = mock.Mock()
+        manager.has_session.return_value = True
+        self.assertEqual(remote_target("/srv/a.py", manager), (manager, "/srv/a.py"))
+        self.assertIsNone(remote_target("relative.py", manager))
+        manager.has_session.return_value = False
+        self.assertIsNone(remote_target("/srv/a.py", manager))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
+os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
+
+import paramiko
+from PyQt5.QtTest import QSignalSpy
+from PyQt5.QtWidgets import QApplication
+
+from file_list_widget import FileListWidget
+from remote_walk import RemoteFolderWalker, list_remote_files
+
+TREE = {
+    "main.py": "x",
+    "notes.md": "x",
+    ".gitignore": "build/\n*.log\n",
+    "src/app.py": "x",
+    "src/debug.log": "x",
+    "src/.gitignore": "generated.py\n",
+    "src/generated.py": "x",
+    "build/out.py": "x",
+    "node_modules/dep.py": "x",
+}
+
+
+class FakeSFTP:
+    """Serves a local directory as if it were mounted at ``/srv`` on the host."""
+
+    def __init__(self, base):
+        self.base = base
+        self.listed = []
+
+    def _local(self, path):
+        return os.path.join(self.base, os.path.relpath(path, "/srv"))
+
+    def listdir_attr(self, path):
+        self.listed.append(path)
+        local = self._local(path)
+        return [
+            paramiko.SFTPAttributes.from_stat(os.lstat(os.path.join(local, name)), name)
+            for name in os.listdir(local)
+        ]
+
+    def open(self, path, mode="r"):
+        return open(self._local(path), mode)
+
+
+class FakeManager:
+    def __init__(self, base):
+        self.sftp = FakeSFTP(base)
+
+    def is_connected(self):
+        return True
+
+    @contextmanager
+    def sftp_session(self):
+        yield self.sftp
+
+
+class RemoteWalkTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        for rel, text in TREE.items():
+            path = os.path.join(self._tmp.name, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fh:
+                fh.write(text)
+        self.manager = FakeManager(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+
+class TestListRemoteFiles(RemoteWalkTestCase):
+    def test_filters_and_gitignore_prune_the_walk(self):
+        batches = []
+        files = list_remote_files(
+            self.manager, "/srv/", [".py"], {"node_modules"}, respect_gitignore=True, on_batch=batches.append
+        )
+        self.assertEqual(sorted(files), ["/srv/main.py", "/srv/src/app.py"])
+        self.assertEqual(sorted(batches), [["/srv/main.py"], ["/srv/src/app.py"]])
+        self.assertEqual(sorted(self.manager.sftp.listed), ["/srv", "/srv/src"])
+
+    def test_without_gitignore_everything_but_ignored_folders_is_listed(self):
+        files = list_remote_files(self.manager, "/srv", None, {"node_modules"})
+        self.assertIn("/srv/build/out.py", files)
+        self.assertIn("/srv/src/debug.log", files)
+        self.assertNotIn("/srv/node_modules/dep.py", files)
+
+    def test_cancelled_walk_stops_early(self):
+        cancelled = threading.Event()
+        cancelled.set()
+        self.assertEqual(list_remote_files(self.manager, "/srv", cancelled=cancelled), [])
+
+    def test_missing_root_is_reported(self):
+        with self.assertRaises(OSError):
+            list_remote_files(self.manager, "/srv/missing")
+
+
+class TestRemoteFolderAdd(RemoteWalkTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_remote_folder_streams_into_one_history_entry(self):
+        settings = SimpleNamespace(
+            extension_allow_all=True,
+            extension_filters=[],
+            ignore_filters={"node_modules", "build"},
+            respect_gitignore=False,
+        )
+        ssh = SimpleNamespace(manager=self.manager, is_connected=lambda: True)
+        walker = RemoteFolderWalker()
+        changes = []
+        widget = FileListWidget(
+            ctx=SimpleNamespace(settings=settings, ssh=ssh, remote_walker=walker),
+            change_callback=lambda: changes.append(list(widget.files)),
+        )
+
+        spy = QSignalSpy(walker.finished)
+        widget.add_folder("/srv")
+        self.assertTrue(spy.wait(5000))
+
+        self.assertEqual(
+            sorted(widget.files),
+            sorted("/srv/" + rel for rel in TREE if not rel.startswith(("build", "node_modules"))),
+        )
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(spy[0][2], "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from session_store import SessionStore, WorkspaceSession
+from tab_history import TabState
+
+
+def _state(files):
+    return TabState(
+        files=tuple(files),
+        root_path="/work",
+        include_root=True,
+        prefix="",
+        suffix="",
+        preset="Markdown",
+        folder_sources=("/work/src",),
+    )
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.path = os.path.join(self._tmpdir.name, "nested", "session.json.gz")
+
+    def test_round_trip(self):
+        files = [f"/work/src/module_{i}.py" for i in range(5000)]
+        workspaces = [WorkspaceSession("Workspace 1", _state(files)), WorkspaceSession("Docs", _state([]))]
+        SessionStore(self.path).save(workspaces, current=1)
+        self.assertLess(os.path.getsize(self.path), 20 * 1024)
+        self.assertEqual(SessionStore(self.path).load(), (workspaces, 1))
+
+    def test_missing_or_corrupt_session_loads_empty(self):
+        store = SessionStore(self.path)
+        self.assertEqual(store.load(), ([], 0))
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "wb") as fh:
+            fh.write(b"not gzip")
+        self.assertEqual(store.load(), ([], 0))
+        with gzip.open(self.path, "wt") as fh:
+            fh.write('{"version": 99, "workspaces": []}')
+        self.assertEqual(store.load(), ([], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
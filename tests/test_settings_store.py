@@ -143,5 +143,36 @@ class TestSettingsStore(unittest.TestCase):
         self.assertEqual(settings.custom_ignore_list, "")
         self.assertEqual(settings.ignore_filters, IGNORE_PRESETS[DEFAULT_IGNORE_PRESET])
 
+    def test_set_respect_gitignore_persists(self):
+        settings = AppSettings()
+        self.assertFalse(settings.respect_gitignore)
+
+        settings.set_respect_gitignore(True)
+
+        self.assertTrue(settings.respect_gitignore)
+        self.assertTrue(settings._qs.store["respect_gitignore"])
+        settings.ignoreFiltersChanged.emit.assert_called_with(settings.ignore_filters)
+
+    def test_metadata_columns_round_trip(self):
+        settings = AppSettings()
+        self.assertEqual(settings.metadata_columns, [])
+
+        settings.set_metadata_columns(["size", "tokens"])
+
+        self.assertEqual(settings._qs.store["metadata_columns"], "size,tokens")
+        settings.metadataColumnsChanged.emit.assert_called_with(["size", "tokens"])
+        self.assertEqual(AppSettings().metadata_columns, ["size", "tokens"])
+
+    def test_history_limits_round_trip(self):
+        settings = AppSettings()
+        self.assertEqual((settings.history_max_entries, settings.history_max_memory_mb), (200, 64))
+
+        settings.set_history_limits(50, 16)
+
+        self.assertEqual(settings._qs.store["history_max_entries"], 50)
+        settings.historyLimitsChanged.emit.assert_called_with(50, 16)
+        reloaded = AppSettings()
+        self.assertEqual((reloaded.history_max_entries, reloaded.history_max_memory_mb), (50, 16))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -3,11 +3,14 @@ import unittest
 from types import SimpleNamespace
 from unittest import mock
 
+from PyQt5.QtCore import Qt
+from PyQt5.QtTest import QTest
 from PyQt5.QtWidgets import QApplication
 
 from settings_tab import SettingsTab
 from settings_store import AppSettings # We will mock this
 from extension_filters import EXTENSION_GROUP_DEFAULTS # Import defaults
+from tab_history import TabHistory, TabState
 
 os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
 os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
@@ -21,6 +24,12 @@ class DummySettingsStore(mock.MagicMock):
         self.interpret_escape_sequences = True
         self.ssh_host = "host"
         self.ssh_username = "user"
+        self.ssh_profiles = {}
+        self.remote_bulk_fetch = True
+        self.remote_cache_max_mb = 512
+        self.remote_cache_compress = True
+        self.history_max_entries = 200
+        self.history_max_memory_mb = 64
         self.extension_allow_all = False
         self.extension_categories = ["Code Files"]
         
@@ -33,6 +42,8 @@ class DummySettingsStore(mock.MagicMock):
 
         self.ignore_preset = "Global-Lean"
         self.custom_ignore_list = ""
+        self.respect_gitignore = False
+        self.use_git_index = False
         self.themeChanged = mock.MagicMock()
         self.sshConfigChanged = mock.MagicMock()
         self.extensionFiltersChanged = mock.MagicMock()
@@ -42,10 +53,14 @@ class DummySSHController(mock.MagicMock):
      def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.statusChanged = mock.MagicMock()
+        self.progress = mock.MagicMock()
 
      def is_connected(self):
          return False
 
+     def is_connecting(self):
+         return False
+
 class DummyAppContext(SimpleNamespace):
     def __init__(self):
         self.settings = DummySettingsStore()
@@ -118,5 +133,35 @@ class TestSettingsTabIgnoreUI(unittest.TestCase):
         self.tab.custom_ignore_field.setVisible.assert_called_with(False)
         # --- End Fix ---
 
+
+class TestSettingsTabLimits(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.ctx = DummyAppContext()
+        self.tab = SettingsTab(self.ctx)
+
+    def _type(self, spin, text):
+        spin.lineEdit().selectAll()
+        QTest.keyClicks(spin, text)
+        QTest.keyClick(spin, Qt.Key_Return)
+
+    def test_typing_history_limit_keeps_undo_entries(self):
+        history = TabHistory(max_entries=200)
+        history.reset(TabState((), None, False, "", "", ""))
+        for i in range(50):
+            history.record(TabState((f"/f{i}",), None, False, "", "", ""))
+        self.ctx.settings.set_history_limits.side_effect = history.set_limits
+        self._type(self.tab.history_entries_spin, "500")
+        self.ctx.settings.set_history_limits.assert_called_once_with(500, 64)
+        self.assertEqual(len(history), 51)
+
+    def test_typing_remote_cache_size_applies_it_once(self):
+        self._type(self.tab.remote_cache_spin, "1024")
+        self.ctx.settings.set_remote_cache.assert_called_once_with(1024, True)
+
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,7 +1,13 @@
+import io
 import os
+import socket
 import sys
+import tarfile
+import tempfile
+import threading
 import types
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
@@ -37,7 +43,26 @@ except ModuleNotFoundError:  # pragma: no cover - fallback for test environment
     paramiko.SSHClient = SSHClient
     sys.modules["paramiko"] = paramiko
 
-from ssh_controller import SSHConnectionManager, SSHController
+from PyQt5.QtTest import QSignalSpy
+from PyQt5.QtWidgets import QApplication
+
+from ssh_controller import (
+    CONNECT_AUTHENTICATING,
+    CONNECT_CONNECTING,
+    CONNECT_RESOLVING,
+    PREFETCH_MIN_BYTES,
+    RECONNECT_ATTEMPTS,
+    SFTP_TIMEOUT,
+    SFTPSessionPool,
+    SSHConnectCanceled,
+    SSHConnectionManager,
+    SSHController,
+    SSHError,
+    SSHHostRegistry,
+    pipelined_stat,
+    supports_pipelined_stat,
+)
+from remote_paths import HostProfile
 
 
 class TestSSHConnectionManager(unittest.TestCase):
@@ -46,10 +71,50 @@ class TestSSHConnectionManager(unittest.TestCase):
         mock_client = mock.Mock()
         mock_client_cls.return_value = mock_client
         manager = SSHConnectionManager("host", "user")
-        manager.try_connect()
+        sock = mock.Mock()
+        with mock.patch.object(SSHConnectionManager, "_open_socket", return_value=sock):
+            manager.try_connect()
         args, kwargs = mock_client.connect.call_args
         self.assertEqual(args[0], "host")
         self.assertEqual(kwargs["username"], "user")
+        self.assertIs(kwargs["sock"], sock)
+
+    @mock.patch("paramiko.SSHClient")
+    def test_canceled_connect_leaves_no_client(self, mock_client_cls):
+        manager = SSHConnectionManager("host", "user")
+        stages = []
+
+        def open_socket(report, check_canceled, _attempt):
+            report(CONNECT_RESOLVING)
+            manager.cancel_connect()
+            check_canceled()
+
+        with mock.patch.object(SSHConnectionManager, "_open_socket", side_effect=open_socket):
+            with self.assertRaises(SSHConnectCanceled):
+                manager.try_connect(progress=stages.append)
+        self.assertEqual(stages, [CONNECT_RESOLVING])
+        self.assertIsNone(manager.client)
+        mock_client_cls.return_value.connect.assert_not_called()
+
+    @mock.patch("paramiko.SSHClient")
+    def test_cancel_reaches_only_its_own_attempt(self, mock_client_cls):
+        manager = SSHConnectionManager("host", "user")
+        mine, other = threading.Event(), threading.Event()
+
+        def open_socket(report, check_canceled, attempt):
+            self.assertIs(attempt, mine)
+            manager.cancel_connect(other)  # e.g. a dialog canceling its own attempt
+            check_canceled()
+            return mock.Mock()
+
+        with mock.patch.object(SSHConnectionManager, "_open_socket", side_effect=open_socket):
+            client = manager.try_connect(canceled=mine)
+        self.assertIs(client, mock_client_cls.return_value)
+        self.assertIs(manager.client, client)
+        manager.cancel_connect(mine)
+        with self.assertRaises(SSHConnectCanceled):
+            manager.try_connect(canceled=mine)
+        self.assertIs(manager.client, client)
 
     @mock.patch("paramiko.SSHClient")
     def test_read_bytes(self, mock_client_cls):
@@ -67,25 +132,570 @@ class TestSSHConnectionManager(unittest.TestCase):
         self.assertEqual(data, b"data")
         mock_client.open_sftp.assert_called_once()
 
+    @staticmethod
+    def _sftp(healthy=True):
+        sftp = mock.MagicMock()
+        channel = sftp.get_channel.return_value
+        channel.closed = not healthy
+        channel.get_transport.return_value.is_active.return_value = True
+        return sftp
+
+    def test_stat_and_read_sample_reuse_a_pooled_session(self):
+        mock_client = mock.Mock()
+        mock_sftp = self._sftp()
+        mock_sftp.stat.return_value = types.SimpleNamespace(st_size=10, st_mtime=5)
+        mock_file = mock.MagicMock()
+        mock_file.read.return_value = b"head"
+        mock_sftp.open.return_value.__enter__.return_value = mock_file
+        mock_client.open_sftp.return_value = mock_sftp
+
+        manager = SSHConnectionManager("host", "user")
+        manager.client = mock_client
+        self.assertEqual(manager.stat("/tmp/file").st_size, 10)
+        self.assertEqual(manager.read_sample("/tmp/file", 4), b"head")
+        self.assertTrue(manager.path_exists("/tmp/file"))
+        mock_file.read.assert_called_once_with(4)
+        mock_client.open_sftp.assert_called_once()
+        mock_sftp.close.assert_not_called()
+
+        manager.close()
+        mock_sftp.close.assert_called_once()
+
+    def test_large_files_are_prefetched(self):
+        sftp = self._sftp()
+        remote_file = sftp.open.return_value.__enter__.return_value
+        head = b"x" * PREFETCH_MIN_BYTES
+        remote_file.read.side_effect = [head, b"tail"]
+        manager = SSHConnectionManager("host", "user")
+        manager.client = mock.Mock(open_sftp=mock.Mock(return_value=sftp))
+        self.assertEqual(manager.read_bytes("/big.log"), head + b"tail")
+        remote_file.prefetch.assert_called_once_with()
+
+        remote_file.read.side_effect = [b"small"]
+        self.assertEqual(manager.read_bytes("/small.py"), b"small")
+        remote_file.prefetch.assert_called_once_with()
+
+    def test_read_many_skips_unreadable_files(self):
+        manager = SSHConnectionManager("host", "user")
+        contents = {"/a": b"1", "/b": b"2"}
+
+        def read_bytes(path):
+            if path not in contents:
+                raise FileNotFoundError(path)
+            return contents[path]
+
+        with mock.patch.object(manager, "read_bytes", side_effect=read_bytes):
+            self.assertEqual(manager.read_many(["/a", "/gone", "/b", "/a"]), contents)
+
+    def test_dead_sessions_are_replaced(self):
+        dead, fresh = self._sftp(), self._sftp()
+        mock_client = mock.Mock()
+        mock_client.open_sftp.side_effect = [dead, fresh]
+        manager = SSHConnectionManager("host", "user")
+        manager.client = mock_client
+        manager.stat("/a")
+        dead.get_channel.return_value.closed = True
+        manager.stat("/b")
+        dead.close.assert_called_once()
+        fresh.stat.assert_called_once_with("/b")
+
+    def test_session_returned_after_failure_and_retired_on_close(self):
+        sftp = self._sftp()
+        sftp.stat.side_effect = FileNotFoundError()
+        pool = SFTPSessionPool(mock.Mock(return_value=sftp), max_sessions=1)
+        manager = SSHConnectionManager("host", "user")
+        manager.client = mock.Mock()
+        manager._sftp_pool = pool
+        self.assertFalse(manager.path_exists("/missing"))
+        self.assertEqual(pool.idle_count(), 1)
+
+        with pool.session() as borrowed:
+            pool.close()
+            borrowed.close.assert_not_called()
+        borrowed.close.assert_called_once()
+        self.assertEqual(pool.idle_count(), 0)
+
+    def test_pool_limits_concurrent_sessions(self):
+        opened = []
+        pool = SFTPSessionPool(lambda: opened.append(self._sftp()) or opened[-1], max_sessions=2)
+        first, gen = pool.acquire()
+        second, _ = pool.acquire()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire()[0]))
+        waiter.start()
+        waiter.join(0.05)
+        self.assertTrue(waiter.is_alive())
+        pool.release(first, gen)
+        waiter.join(1)
+        self.assertEqual(got, [first])
+        self.assertEqual(len(opened), 2)
+
+
+class FakeStatServer:
+    """SFTP client stand-in that answers queued STATs newest first."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._lock = threading.Lock()
+        self._expecting = {}
+        self.queue = []
+        self.max_in_flight = 0
+        self.closed = False
+
+    def _adjust_cwd(self, path):
+        return path
+
+    def _async_request(self, fileobj, _t, path):
+        num = len(self._expecting) + len(self.queue) + 1000
+        self._expecting[num] = fileobj
+        self.queue.append((num, path))
+        self.max_in_flight = max(self.max_in_flight, len(self.queue))
+        return num
+
+    def _read_packet(self):
+        from paramiko.sftp import CMD_ATTRS, CMD_STATUS
+        num, path = self.queue.pop()
+        msg = paramiko.Message()
+        msg.add_int(num)
+        if path in self.entries:
+            attrs = paramiko.SFTPAttributes()
+            attrs.st_mode, attrs.st_size = self.entries[path]
+            attrs._pack(msg)
+            return CMD_ATTRS, msg.asbytes()
+        msg.add_int(2)
+        msg.add_string("No such file")
+        msg.add_string("")
+        return CMD_STATUS, msg.asbytes()
+
+    def close(self):
+        self.closed = True
+
+
+class TestStatMany(unittest.TestCase):
+    def test_pipelined_stat_matches_out_of_order_replies(self):
+        server = FakeStatServer({"/a.py": (0o100644, 12), "/src": (0o040755, 0)})
+        found = pipelined_stat(server, ["/a.py", "/missing", "/src"])
+        self.assertEqual(server.max_in_flight, 3)
+        self.assertEqual(sorted(found), ["/a.py", "/src"])
+        self.assertEqual(found["/a.py"].st_size, 12)
+        self.assertEqual(server._expecting, {})
+
+    def test_stat_many_reports_type_and_size_in_order(self):
+        server = FakeStatServer({"/a.py": (0o100644, 12), "/src": (0o040755, 0)})
+        pool = SFTPSessionPool(mock.Mock(return_value=server))
+        manager = SSHConnectionManager("host", "user")
+        manager.client = mock.Mock()
+        manager._sftp_pool = pool
+        with mock.patch.object(SFTPSessionPool, "_is_healthy", return_value=True):
+            infos = manager.stat_many(["/src", "/a.py", "/missing", "/a.py"])
+        self.assertEqual([i.path for i in infos], ["/src", "/a.py", "/missing", "/a.py"])
+        self.assertEqual([(i.exists, i.is_dir, i.size) for i in infos[:3]], [(True, True, 0), (True, False, 12), (False, False, 0)])
+        self.assertTrue(infos[1].is_file)
+        self.assertEqual(pool.idle_count(), 1)
+
+    def test_stat_many_without_connection_reports_missing(self):
+        infos = SSHConnectionManager("host", "user").stat_many(["/a"])
+        self.assertFalse(infos[0].exists)
+
+    def test_missing_paramiko_internals_fall_back_to_plain_stat(self):
+        attrs = paramiko.SFTPAttributes()
+        attrs.st_size = 5
+        sftp = mock.Mock(spec=["stat", "close"])
+        sftp.stat.side_effect = lambda p: attrs if p == "/a" else (_ for _ in ()).throw(IOError(2, "missing"))
+        self.assertFalse(supports_pipelined_stat(sftp))
+        self.assertEqual(pipelined_stat(sftp, ["/a", "/b"]), {"/a": attrs})
+        sftp.close.assert_not_called()
+
+    def test_failed_batch_closes_the_session(self):
+        server = FakeStatServer({})
+        server._read_packet = mock.Mock(side_effect=EOFError("gone"))
+        with self.assertRaises(Exception):
+            pipelined_stat(server, ["/a"])
+        self.assertTrue(server.closed)
+
+
+@unittest.skipUnless(hasattr(paramiko, "Transport"), "paramiko not installed")
+class TestPipelinedStatOverParamiko(unittest.TestCase):
+    """pipelined_stat against a real SFTPClient talking to an in-process server."""
+
+    def setUp(self):
+        class Server(paramiko.ServerInterface):
+            def get_allowed_auths(self, username):
+                return "none"
+
+            def check_auth_none(self, username):
+                return paramiko.AUTH_SUCCESSFUL
+
+            def check_channel_request(self, kind, chanid):
+                return paramiko.OPEN_SUCCEEDED
+
+        class LocalSFTP(paramiko.SFTPServerInterface):
+            def stat(self, path):
+                try:
+                    return paramiko.SFTPAttributes.from_stat(os.stat(path))
+                except OSError as exc:
+                    return paramiko.SFTPServer.convert_errno(exc.errno)
+
+            lstat = stat
+
+        server_sock, client_sock = socket.socketpair()
+        self.server = paramiko.Transport(server_sock)
+        self.server.add_server_key(paramiko.RSAKey.generate(1024))
+        self.server.set_subsystem_handler("sftp", paramiko.SFTPServer, LocalSFTP)
+        self.server.start_server(event=threading.Event(), server=Server())
+        self.client = paramiko.Transport(client_sock)
+        self.client.connect()
+        self.client.auth_none("user")
+        self.sftp = paramiko.SFTPClient.from_transport(self.client)
+
+    def tearDown(self):
+        self.sftp.close()
+        self.client.close()
+        self.server.close()
+
+    def test_installed_paramiko_is_pipelined(self):
+        self.assertTrue(supports_pipelined_stat(self.sftp))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(300):  # more than one pipeline window
+                path = os.path.join(tmpdir, f"f{i}.txt")
+                with open(path, "w") as fh:
+                    fh.write("x" * i)
+                paths.append(path)
+            found = pipelined_stat(self.sftp, paths + [os.path.join(tmpdir, "missing")])
+            self.assertEqual(sorted(found), sorted(paths))
+            self.assertEqual([found[p].st_size for p in paths], list(range(300)))
+            # The session is left in step for ordinary requests
+            self.assertEqual(self.sftp.stat(tmpdir).st_mode, os.stat(tmpdir).st_mode)
+
+
+class ChannelStream(io.BytesIO):
+    def __init__(self, data=b""):
+        super().__init__(data)
+        self.channel = mock.Mock()
+
+
+class TestFetchArchive(unittest.TestCase):
+    @staticmethod
+    def _archive(files):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for name, data in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        return buffer.getvalue()
+
+    def _manager(self, stdout):
+        self.stdin = ChannelStream()
+        client = mock.Mock()
+        client.exec_command.return_value = (self.stdin, stdout, mock.Mock())
+        manager = SSHConnectionManager("host", "user")
+        manager.client = client
+        return manager
+
+    def test_files_are_unpacked_from_one_stream(self):
+        stdout = ChannelStream(self._archive({"srv/a.py": b"alpha", "srv/b.py": b"beta"}))
+        manager = self._manager(stdout)
+        found = manager.fetch_archive(["/srv/a.py", "/srv/b.py", "/srv/gone.py"])
+        self.assertEqual(found, {"/srv/a.py": b"alpha", "/srv/b.py": b"beta"})
+        manager.client.exec_command.assert_called_once()
+        self.assertEqual(manager.client.exec_command.call_args.kwargs["timeout"], SFTP_TIMEOUT)
+        self.assertEqual(self.stdin.getvalue(), b"/srv/a.py\0/srv/b.py\0/srv/gone.py\0")
+        self.stdin.channel.shutdown_write.assert_called_once()
+
+    def test_host_without_tar_is_remembered(self):
+        manager = self._manager(ChannelStream())
+        with self.assertRaises(SSHError):
+            manager.fetch_archive(["/srv/a.py"])
+        with self.assertRaises(SSHError):
+            manager.fetch_archive(["/srv/a.py"])
+        manager.client.exec_command.assert_called_once()
+
+        # A new connection, e.g. after a reconnect, gets another try
+        stdout = ChannelStream(self._archive({"srv/a.py": b"alpha"}))
+        manager.client = self._manager(stdout).client
+        self.assertEqual(manager.fetch_archive(["/srv/a.py"]), {"/srv/a.py": b"alpha"})
+
+    def test_stalled_archive_fails_without_reconnecting(self):
+        stdout = mock.Mock()
+        stdout.read.side_effect = socket.timeout()
+        manager = self._manager(stdout)
+        with mock.patch.object(manager, "_reconnect") as reconnect:
+            with self.assertRaises(SSHError):
+                manager.fetch_archive(["/srv/a.py"])
+        reconnect.assert_not_called()
+
+
+class TestReconnect(unittest.TestCase):
+    @staticmethod
+    def _client(active=True, data=b"data"):
+        client = mock.Mock()
+        client.get_transport.return_value.is_active.return_value = active
+        sftp = mock.MagicMock()
+        client.open_sftp.return_value = sftp
+        sftp.get_channel.return_value.closed = False
+        sftp.get_channel.return_value.get_transport.return_value.is_active.return_value = active
+        remote_file = sftp.open.return_value.__enter__.return_value
+        remote_file.read.return_value = data
+        return client
+
+    def _manager(self, replacements):
+        manager = SSHConnectionManager("host", "user")
+        manager._password = "secret"
+        self.events = []
+        manager.connection_listener = self.events.append
+
+        def try_connect(password=None):
+            result = replacements.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            manager._sftp_pool.close()
+            manager.client = result
+            return True
+
+        manager.try_connect = mock.Mock(side_effect=try_connect)
+        return manager
+
+    @staticmethod
+    def _in_worker(function, *args):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(function, *args).result(timeout=5)
+
+    def test_liveness_follows_the_transport(self):
+        manager = SSHConnectionManager("host", "user")
+        manager.client = self._client(active=False)
+        self.assertFalse(manager.is_connected())
+        self.assertTrue(manager.has_session())
+
+    @mock.patch("ssh_controller.RECONNECT_INITIAL_DELAY", 0)
+    def test_read_is_repeated_on_a_new_connection(self):
+        dropped = self._client()
+        dropped.open_sftp.return_value.open.side_effect = EOFError()
+        dropped.get_transport.return_value.is_active.return_value = False
+        manager = self._manager([SSHError("unreachable"), self._client(data=b"fresh")])
+        manager.client = dropped
+
+        self.assertEqual(self._in_worker(manager.read_bytes, "/srv/a.py"), b"fresh")
+        self.assertEqual(manager.try_connect.call_args_list, [mock.call("secret")] * 2)
+        self.assertEqual(self.events, [False, True])
+
+    def test_errors_on_a_live_link_are_not_retried(self):
+        live = self._client()
+        live.open_sftp.return_value.stat.side_effect = FileNotFoundError()
+        manager = self._manager([])
+        manager.client = live
+        with self.assertRaises(FileNotFoundError):
+            manager.stat("/srv/gone.py")
+        manager.try_connect.assert_not_called()
+
+    @mock.patch("ssh_controller.RECONNECT_INITIAL_DELAY", 0)
+    def test_gives_up_after_the_last_attempt(self):
+        dropped = self._client(active=False)
+        dropped.open_sftp.return_value.stat.side_effect = EOFError()
+        dropped.open_sftp.return_value.open.side_effect = EOFError()
+        manager = self._manager([SSHError("unreachable")] * RECONNECT_ATTEMPTS)
+        manager.client = dropped
+        with self.assertRaises(SSHError):
+            self._in_worker(manager.stat, "/srv/a.py")
+        self.assertEqual(manager.try_connect.call_count, RECONNECT_ATTEMPTS)
+
+        # Further reads fail at once until the user connects again
+        with self.assertRaises(SSHError):
+            manager.read_bytes("/srv/a.py")
+        self.assertEqual(manager.try_connect.call_count, RECONNECT_ATTEMPTS)
+
+    def test_gui_thread_does_not_wait_for_the_reconnect(self):
+        dropped = self._client(active=False)
+        dropped.open_sftp.return_value.stat.side_effect = EOFError()
+        dropped.open_sftp.return_value.open.side_effect = EOFError()
+        manager = self._manager([self._client(data=b"fresh")])
+        manager.client = dropped
+        reachable = threading.Event()
+        connect = manager.try_connect.side_effect
+        manager.try_connect.side_effect = lambda password=None: reachable.wait(5) and connect(password)
+
+        with self.assertRaises(SSHError):
+            manager.stat("/srv/a.py")
+        reachable.set()
+        self.assertEqual(self._in_worker(manager.read_bytes, "/srv/a.py"), b"fresh")
+        manager.try_connect.assert_called_once_with("secret")
+
+
+class TestSSHHostRegistry(unittest.TestCase):
+    def setUp(self):
+        self.default = SSHConnectionManager("main", "me")
+        self.registry = SSHHostRegistry(
+            self.default, {"build1": HostProfile("build1", "10.0.0.5", "alice")}
+        )
+
+    def test_paths_are_routed_to_their_host(self):
+        manager, path = self.registry.resolve("build1:/srv/a.py")
+        self.assertEqual((manager.host, manager.username, path), ("10.0.0.5", "alice", "/srv/a.py"))
+        self.assertIs(self.registry.resolve("build1:/srv/b.py")[0], manager)
+        self.assertIsNot(manager._sftp_pool, self.default._sftp_pool)
+        self.assertIsNone(self.registry.resolve("unknown:/srv/a.py"))
+        self.assertIsNone(self.registry.resolve("/srv/a.py"))
+
+        self.default.client = mock.Mock()
+        self.assertEqual(self.registry.resolve("/srv/a.py"), (self.default, "/srv/a.py"))
+
+    def test_changed_profiles_close_their_connection(self):
+        manager = self.registry.manager("build1")
+        manager.client = client = mock.Mock()
+        self.registry.set_profiles({"build1": HostProfile("build1", "10.0.0.6", "alice")})
+        client.close.assert_called_once()
+        self.assertEqual(self.registry.manager("build1").host, "10.0.0.6")
+
+    @staticmethod
+    def _in_worker(operation):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(operation).result(timeout=5)
+
+    def test_unreachable_profile_host_fails_fast(self):
+        manager = self.registry.manager("build1")
+        with mock.patch.object(manager, "try_connect", side_effect=SSHError("timed out")) as try_connect:
+            with self.assertRaises(SSHError):
+                self._in_worker(lambda: manager.read_bytes("/srv/a.py"))
+            with self.assertRaises(SSHError):
+                self._in_worker(lambda: manager.stat("/srv/a.py"))
+        try_connect.assert_called_once_with(None)
+
+    def test_gui_thread_does_not_wait_for_a_profile_host(self):
+        manager = self.registry.manager("build1")
+        release = threading.Event()
+        client = mock.Mock()
+
+        def try_connect(_password):
+            release.wait(5)
+            manager.client = client
+            return True
+
+        with mock.patch.object(manager, "try_connect", side_effect=try_connect) as connect:
+            with self.assertRaises(SSHError):
+                manager.stat("/srv/a.py")
+            release.set()
+            done = manager.connect_in_background()
+            if done is not None:
+                self.assertTrue(done.wait(5))
+        connect.assert_called_once_with(None)
+        self.assertIs(manager.client, client)
+        self.assertIsNone(manager.connect_in_background())
+
 
 class TestSSHController(unittest.TestCase):
-    def test_connect_prompts_for_password_on_auth_failure(self):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def _manager(self):
         manager = mock.create_autospec(SSHConnectionManager, instance=True)
         manager.is_configured.return_value = True
+        manager.is_connected.return_value = False
+        manager.client = None
+        return manager
+
+    def _finish(self, controller):
+        # The password prompt between attempts runs on this thread
+        for _ in range(3):
+            controller.wait_for_done()
+            QApplication.processEvents()
+            if not controller.is_connecting():
+                return
+        self.fail("connect did not finish")
+
+    def test_connect_prompts_for_password_on_auth_failure(self):
+        manager = self._manager()
         manager.try_connect.side_effect = [
             paramiko.AuthenticationException(),
             True,
         ]
-        manager.is_connected.return_value = False
 
         password_provider = mock.Mock(return_value="secret")
         controller = SSHController(manager, password_provider=password_provider)
+        status = QSignalSpy(controller.statusChanged)
 
         controller.connect()
+        self._finish(controller)
 
         self.assertEqual(manager.try_connect.call_count, 2)
-        manager.try_connect.assert_called_with(password="secret")
+        self.assertEqual(manager.try_connect.call_args.kwargs["password"], "secret")
         password_provider.assert_called_once()
+        self.assertEqual(list(status), [[True]])
+
+    def test_connect_runs_off_the_gui_thread_and_reports_progress(self):
+        manager = self._manager()
+        threads = []
+
+        def try_connect(password=None, progress=None, canceled=None):
+            threads.append(threading.current_thread())
+            for stage in (CONNECT_RESOLVING, CONNECT_CONNECTING, CONNECT_AUTHENTICATING):
+                progress(stage)
+            return True
+
+        manager.try_connect.side_effect = try_connect
+        controller = SSHController(manager)
+        stages = []
+        controller.progress.connect(stages.append)
+        status = QSignalSpy(controller.statusChanged)
+
+        controller.connect()
+        self.assertTrue(controller.is_connecting())
+        self._finish(controller)
+
+        self.assertIsNot(threads[0], threading.main_thread())
+        self.assertEqual(stages, [CONNECT_RESOLVING, CONNECT_CONNECTING, CONNECT_AUTHENTICATING])
+        self.assertEqual(list(status), [[True]])
+
+    def test_cancel_ignores_the_running_attempt(self):
+        manager = self._manager()
+        release = threading.Event()
+        manager.try_connect.side_effect = lambda **_kwargs: release.wait(5) or True
+        controller = SSHController(manager)
+        status = QSignalSpy(controller.statusChanged)
+
+        controller.connect()
+        controller.cancel()
+        release.set()
+        controller.wait_for_done()
+        QApplication.processEvents()
+
+        # Only this attempt is canceled, not a reconnect running meanwhile
+        canceled = manager.try_connect.call_args.kwargs["canceled"]
+        manager.cancel_connect.assert_called_once_with(canceled)
+        self.assertEqual(list(status), [[False]])
+        self.assertFalse(controller.is_connecting())
+
+    def test_canceled_attempt_that_connects_is_closed(self):
+        manager = self._manager()
+        release = threading.Event()
+        stale, newer = object(), object()
+
+        def try_connect(**_kwargs):
+            release.wait(5)
+            # A background reconnect installed its own client meanwhile
+            manager.client = newer
+            return stale
+
+        manager.try_connect.side_effect = try_connect
+        controller = SSHController(manager)
+        controller.connect()
+        controller.cancel()
+        release.set()
+        controller.wait_for_done()
+        QApplication.processEvents()
+
+        manager.drop_client.assert_called_once_with(stale)
+
+    def test_drop_client_keeps_a_newer_connection(self):
+        manager = SSHConnectionManager("example.com", "user")
+        current = mock.Mock()
+        manager.client = current
+        manager.drop_client(mock.Mock())
+        current.close.assert_not_called()
+        manager.drop_client(current)
+        current.close.assert_called_once()
+        self.assertIsNone(manager.client)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+import random
+import unittest
+
+from tab_history import TabHistory, TabState, diff_files
+
+
+def _state(files, prefix=""):
+    return TabState(
+        files=tuple(files),
+        root_path=None,
+        include_root=False,
+        prefix=prefix,
+        suffix="",
+        preset="Markdown",
+    )
+
+
+class TestDiffFiles(unittest.TestCase):
+    def test_append_remove_and_reorder(self):
+        old = ("a", "b", "c", "d")
+        self.assertIsNone(diff_files(old, old))
+        append = diff_files(old, old + ("e",))
+        self.assertEqual((append.start, append.removed, append.inserted), (4, (), ("e",)))
+        remove = diff_files(old, ("a", "d"))
+        self.assertEqual((remove.start, remove.removed, remove.inserted), (1, ("b", "c"), ()))
+        swap = diff_files(old, ("a", "c", "b", "d"))
+        self.assertEqual(swap.apply(old), ("a", "c", "b", "d"))
+        self.assertEqual(swap.revert(("a", "c", "b", "d")), old)
+
+
+class TestTabHistory(unittest.TestCase):
+    def test_undo_redo_replays_random_edits(self):
+        rng = random.Random(4)
+        files = [f"/src/{i}.py" for i in range(50)]
+        history = TabHistory()
+        history.reset(_state(files))
+        states = [tuple(files)]
+        for step in range(40):
+            files = list(files)
+            if rng.random() < 0.5 and files:
+                del files[rng.randrange(len(files))]
+            else:
+                files.insert(rng.randrange(len(files) + 1), f"/new/{step}.py")
+            history.record(_state(files))
+            states.append(tuple(files))
+
+        live = list(states[-1])
+        for expected in reversed(states[:-1]):
+            step = history.undo()
+            live[step.start:step.stop] = step.paths
+            self.assertEqual(tuple(live), expected)
+            self.assertEqual(step.state.files, expected)
+        self.assertIsNone(history.undo())
+        for expected in states[1:]:
+            step = history.redo()
+            live[step.start:step.stop] = step.paths
+            self.assertEqual(tuple(live), expected)
+
+    def test_unchanged_state_is_not_recorded(self):
+        history = TabHistory()
+        history.reset(_state(["a"]))
+        self.assertFalse(history.record(_state(["a"])))
+        self.assertTrue(history.record(_state(["a"], prefix="p")))
+        step = history.undo()
+        self.assertEqual((step.start, step.stop, step.paths, step.state.prefix), (0, 0, (), ""))
+
+    def test_small_edits_of_large_lists_stay_small(self):
+        files = [f"/workspace/module_{i}/file.py" for i in range(50000)]
+        history = TabHistory()
+        history.reset(_state(files))
+        for i in range(100):
+            files = files[:i] + files[i + 1:]
+            history.record(_state(files))
+        self.assertLess(history.memory_bytes, 100 * 1024)
+
+    def test_entry_and_memory_budgets_drop_oldest(self):
+        history = TabHistory(max_entries=5)
+        history.reset(_state([]))
+        for i in range(10):
+            history.record(_state([str(n) for n in range(i + 1)]))
+        self.assertEqual(len(history), 5)
+        for _ in range(4):
+            self.assertIsNotNone(history.undo())
+        self.assertFalse(history.can_undo())
+        self.assertEqual(history.current().files, tuple(str(n) for n in range(6)))
+
+        history = TabHistory(max_entries=1000, max_memory_mb=1)
+        history.reset(_state([]))
+        big = ["x" * 1000 + str(i) for i in range(400)]
+        for i in range(10):
+            history.record(_state(big if i % 2 == 0 else []))
+        self.assertLessEqual(history.memory_bytes, 1024 * 1024)
+        self.assertTrue(history.can_undo())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "minimal")
+os.environ.setdefault("QT_STYLE_OVERRIDE", "Fusion")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.*=false")
+
+from PyQt5.QtCore import QModelIndex, Qt
+from PyQt5.QtTest import QAbstractItemModelTester, QSignalSpy
+from PyQt5.QtWidgets import QApplication
+
+from file_list_model import FileListModel
+from file_list_widget import FileListWidget
+from file_metadata import FileMetadata
+from workspace_tree_model import TREE_COLUMN_FILES, TREE_COLUMN_SIZE, WorkspaceTreeModel
+from workspace_tree_view import WorkspaceTreeView
+
+FILES = [
+    "/r/src/app/main.py",
+    "/r/src/app/util.py",
+    "/r/src/lib/core.py",
+    "/r/README.md",
+    "/r/docs/index.md",
+]
+
+
+class TestWorkspaceTreeModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.source = FileListModel()
+        self.source.set_root_path("/r")
+        self.source.set_files(FILES)
+        self.model = WorkspaceTreeModel(self.source)
+        self.tester = QAbstractItemModelTester(
+            self.model, QAbstractItemModelTester.FailureReportingMode.Fatal
+        )
+
+    def _names(self, parent=QModelIndex()):
+        return [self.model.index(r, 0, parent).data() for r in range(self.model.rowCount(parent))]
+
+    def _expand(self, *names):
+        parent = QModelIndex()
+        for name in names:
+            parent = self.model.index(self._names(parent).index(name), 0, parent)
+            if self.model.canFetchMore(parent):
+                self.model.fetchMore(parent)
+        return parent
+
+    def test_directories_group_in_workspace_order(self):
+        self.assertEqual(self._names(), ["src", "README.md", "docs"])
+        self.assertEqual(self.model.index(0, TREE_COLUMN_FILES).data(), "3")
+        app = self._expand("src", "app")
+        self.assertEqual(self._names(app), ["main.py", "util.py"])
+        self.assertEqual(self.model.index(0, 0, app).data(Qt.UserRole), "/r/src/app/main.py")
+
+    def test_directories_are_split_only_when_expanded(self):
+        model = WorkspaceTreeModel(self.source)
+        src = model.index(0, 0)
+        self.assertEqual(model.rowCount(src), 0)
+        self.assertTrue(model.hasChildren(src))
+        self.assertTrue(model.canFetchMore(src))
+        model.fetchMore(src)
+        self.assertEqual(model.rowCount(src), 2)
+        self.assertFalse(model.canFetchMore(src))
+
+    def test_appends_update_only_affected_branches(self):
+        src = self._expand("src")
+        spy = QSignalSpy(self.model.modelReset)
+        self.source.append_rows(["/r/src/app/new.py", "/r/src/web/page.js", "/r/setup.py"])
+        self.assertEqual(len(spy), 0)
+        self.assertEqual(self._names(), ["src", "README.md", "docs", "setup.py"])
+        self.assertEqual(self._names(src), ["app", "lib", "web"])
+        self.assertEqual(self.model.index(0, TREE_COLUMN_FILES).data(), "5")
+        self.assertEqual(self._names(self._expand("src", "app")), ["main.py", "util.py", "new.py"])
+
+    def test_removing_a_directory_removes_its_node_once(self):
+        src = self._expand("src")
+        self._expand("src", "app")
+        removed = QSignalSpy(self.model.rowsRemoved)
+        self.source.remove_rows([0, 1])
+        self.assertEqual(len(removed), 1)
+        self.assertEqual(self._names(src), ["lib"])
+        self.assertEqual(self.model.index(0, TREE_COLUMN_FILES).data(), "1")
+        self.source.remove_rows([0])
+        self.assertEqual(self._names(), ["README.md", "docs"])
+
+    def test_removing_many_files_under_a_collapsed_directory(self):
+        source = FileListModel()
+        source.set_root_path("/r")
+        source.set_files([f"/r/big/f{i}.py" for i in range(40_000)] + ["/r/keep.py"])
+        model = WorkspaceTreeModel(source)
+        start = time.perf_counter()
+        source.remove_rows(range(1, 40_000, 2))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(model.index(0, TREE_COLUMN_FILES).data(), "20,000")
+        big = model.index(0, 0)
+        model.fetchMore(big)
+        self.assertEqual(model.rowCount(big), 20_000)
+        self.assertEqual(model.index(1, 0, big).data(), "f2.py")
+
+    def test_paths_under_and_keys(self):
+        lib = self._expand("src", "lib")
+        self.assertEqual(self.model.item_key(lib), ("src", "lib"))
+        self.assertEqual(sorted(self.model.paths_under(self.model.index(0, 0))), sorted(FILES[:3]))
+        self.model.rebuild()
+        found = self.model.index_for_key("/r/src/lib/core.py")
+        self.assertEqual(found.data(Qt.UserRole), "/r/src/lib/core.py")
+        self.assertFalse(self.model.index_for_key(("src", "missing")).isValid())
+
+    def test_directory_size_sums_known_file_sizes(self):
+        sizes = {"/r/src/app/main.py": 1024, "/r/src/app/util.py": 512}
+        service = mock.Mock()
+        service.cached.side_effect = lambda p: FileMetadata(p, sizes[p], 0) if p in sizes else None
+        self.source.set_metadata_service(service)
+        self.assertEqual(self.model.index(0, TREE_COLUMN_SIZE).data(), "")
+        service.cached.assert_not_called()  # directory totals never look metadata up
+        for row in range(3):
+            self.source.metadata_for(self.source.files[row])  # the list paints its rows
+        service.request.reset_mock()
+        self.assertEqual(self.model.index(0, TREE_COLUMN_SIZE).data(), "1.5 KB+")
+        sizes["/r/src/lib/core.py"] = 512
+        self.source.update_metadata(2, FileMetadata("/r/src/lib/core.py", 512, 0))
+        self.assertEqual(self.model.index(0, TREE_COLUMN_SIZE).data(), "2.0 KB")
+        self.source.update_metadata(0, FileMetadata("/r/src/app/main.py", 2048, 0))
+        self.assertEqual(self.model.index(0, TREE_COLUMN_SIZE).data(), "3.0 KB")
+        service.request.assert_not_called()
+
+    def test_reorder_sorts_branches_in_place(self):
+        app = self._expand("src", "app")
+        reset = QSignalSpy(self.model.modelReset)
+        self.source.move_row(3, 0)
+        self.source.move_row(1, 3)
+        self.assertEqual(len(reset), 0)
+        self.assertEqual(self._names(), ["README.md", "src", "docs"])
+        self.assertEqual(self._names(app), ["util.py", "main.py"])
+        self.assertEqual(app.parent().data(), "src")
+
+
+class TestWorkspaceTreeView(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.changes = []
+        self.widget = FileListWidget(change_callback=lambda: self.changes.append(list(self.widget.files)))
+        self.widget.set_root_path("/r")
+        self.widget.set_files(FILES, notify=False)
+        self.view = WorkspaceTreeView(self.widget)
+        self.model = self.view.tree_model()
+
+    def test_remove_directory_is_one_change(self):
+        self.view.setCurrentIndex(self.model.index(0, 0))
+        self.view.remove_selected()
+        self.assertEqual(self.widget.files, ["/r/README.md", "/r/docs/index.md"])
+        self.assertEqual(len(self.changes), 1)
+
+    def test_move_directory_keeps_expansion_and_selection(self):
+        src = self.model.index(0, 0)
+        self.view.expand(src)
+        self.view.move_item(src, 1)
+        self.assertEqual(self.widget.files, [FILES[3]] + FILES[:3] + [FILES[4]])
+        self.assertEqual(len(self.changes), 1)
+        src = self.model.index(1, 0)
+        self.assertEqual(src.data(), "src")
+        self.assertTrue(self.view.isExpanded(src))
+        self.assertEqual(self.view.selectionModel().selectedRows(), [src])
+
+
+if __name__ == "__main__":
+    unittest.main()
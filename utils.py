@@ -3,6 +3,14 @@ import os
 import fnmatch
 from typing import Optional, Set
 
+from gitignore_filters import (
+    GITIGNORE_FILENAME,
+    GitIgnoreMatcher,
+    load_gitignore_file,
+    matcher_for_directory,
+    to_posix_relpath,
+)
+
 def resource_path(rel_path: str) -> str:
     """
     Get the absolute path to a resource, whether running normally
@@ -50,19 +58,47 @@ def list_files(
     directory: str,
     extensions: Optional[list[str]] = None,
     ignore_folders: Optional[Set[str]] = None,
+    respect_gitignore: bool = False,
+    visited_dirs: Optional[list[str]] = None,
 ) -> list[str]:
     """
     Return a list of files under ``directory`` filtered by extensions
     and skipping specified ignored folders.
+
+    When ``respect_gitignore`` is set, ``.gitignore`` files (including those of
+    enclosing directories in the work tree) and ``.git/info/exclude`` are
+    honoured and ignored directories are pruned before descending into them.
+    Every directory walked is appended to ``visited_dirs`` when given.
     """
     selected: list[str] = []
     normalized = [ext.lower() for ext in extensions] if extensions else None
+    matchers: dict[str, GitIgnoreMatcher] = {}
+    worktree = directory
+    if respect_gitignore:
+        matchers[directory], worktree = matcher_for_directory(directory)
     for root, dirs, files in os.walk(directory, topdown=True):
+        if visited_dirs is not None:
+            visited_dirs.append(root)
         if ignore_folders:
             dirs[:] = [
                 d for d in dirs
                 if not any(fnmatch.fnmatch(d, pattern) for pattern in ignore_folders)
             ]
+        if respect_gitignore:
+            rel_root = to_posix_relpath(root, worktree)
+            prefix = rel_root + "/" if rel_root else ""
+            matcher = matchers.pop(root)
+            if GITIGNORE_FILENAME in files:
+                matcher = matcher.child(
+                    rel_root, load_gitignore_file(os.path.join(root, GITIGNORE_FILENAME))
+                )
+            dirs[:] = [
+                d for d in dirs
+                if d != ".git" and not matcher.is_ignored(prefix + d, True)
+            ]
+            for d in dirs:
+                matchers[os.path.join(root, d)] = matcher
+            files = [f for f in files if not matcher.is_ignored(prefix + f, False)]
         for name in files:
             if normalized:
                 ext = os.path.splitext(name)[1].lower()
@@ -70,4 +106,3 @@ def list_files(
                     continue
             selected.append(os.path.join(root, name))
     return selected
-
@@ -0,0 +1,68 @@
+# watch_mode.py
+from __future__ import annotations
+import os
+from typing import Iterable, Set
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+DEFAULT_DEBOUNCE_MS = 500
+
+
+class WorkspaceWatcher(QObject):
+    """
+    Watches the local files of a workspace and reports edits in batches.
+
+    Bursts of change events (editors often write a file several times per
+    save) are coalesced into a single ``triggered`` emission carrying every
+    path that changed since the previous one.
+    """
+
+    triggered = pyqtSignal(object)  # set of changed paths
+
+    def __init__(self, debounce_ms: int = DEFAULT_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self.flush)
+        self._paths: Set[str] = set()
+        self._pending: Set[str] = set()
+
+    def set_paths(self, paths: Iterable[str]) -> None:
+        """
+        Watch the existing files among ``paths`` (remote paths are skipped by
+        the caller); missing files are picked up by a later call.
+        """
+        wanted = set(paths)
+        stale = self._paths - wanted
+        if stale:
+            self._watcher.removePaths(list(stale))
+        kept = self._paths & wanted
+        fresh = [p for p in wanted - self._paths if os.path.isfile(p)]
+        if fresh:
+            kept.update(set(fresh) - set(self._watcher.addPaths(fresh)))
+        self._paths = kept
+
+    def schedule(self, paths: Iterable[str] = ()) -> None:
+        self._pending.update(paths)
+        self._timer.start()
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self._pending.clear()
+        if self._paths:
+            self._watcher.removePaths(list(self._paths))
+        self._paths = set()
+
+    def _on_file_changed(self, path: str) -> None:
+        # Editors that save by renaming replace the inode; Qt then drops the
+        # watch, so re-arm it whenever the path exists again.
+        if path in self._paths and path not in self._watcher.files() and os.path.isfile(path):
+            self._watcher.addPath(path)
+        self.schedule([path])
+
+    def flush(self) -> None:
+        self._timer.stop()
+        changed, self._pending = self._pending, set()
+        self.triggered.emit(changed)
@@ -0,0 +1,492 @@
+"""Directory tree over the workspace list, materialized as it is expanded."""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Union
+
+from PyQt5.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+from file_list_model import COLUMN_ENCODING, COLUMN_PATH, COLUMN_SIZE
+from file_metadata import format_size
+
+TREE_COLUMN_NAME, TREE_COLUMN_FILES, TREE_COLUMN_SIZE = range(3)
+TREE_COLUMN_TITLES = ("Name", "Files", "Size")
+
+
+class _DirNode:
+    """
+    A directory of the tree.
+
+    Until the directory is expanded it only keeps the paths below it in
+    ``pending``; ``fetchMore`` turns them into child directories and file
+    leaves (plain path strings) in workspace order. ``size`` sums the file
+    sizes known so far and ``unknown`` counts the files still without one.
+    """
+
+    __slots__ = ("name", "parent", "depth", "row", "count", "pending", "children", "dirs", "size", "unknown")
+
+    def __init__(self, name: str, parent: Optional["_DirNode"], depth: int):
+        self.name = name
+        self.parent = parent
+        self.depth = depth
+        self.row = 0
+        self.count = 0
+        self.pending: Optional[dict[str, None]] = {}  # ordered set of paths
+        self.children: list[Union["_DirNode", str]] = []
+        self.dirs: dict[str, "_DirNode"] = {}
+        self.size = 0
+        self.unknown = 0
+
+    @property
+    def materialized(self) -> bool:
+        return self.pending is None
+
+    def key(self) -> tuple[str, ...]:
+        names = []
+        node = self
+        while node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+        return tuple(reversed(names))
+
+
+class WorkspaceTreeModel(QAbstractItemModel):
+    """
+    Groups the paths of a :class:`~file_list_model.FileListModel` by
+    directory.
+
+    The tree holds paths rather than source rows, so appends and removals
+    in the list are applied to the affected branches only; directories are
+    split into children the first time they are expanded, which keeps a
+    100k file workspace cheap until somebody opens it up. Every directory
+    reports how many files it contains and their combined size, as far as
+    the source model has metadata cached; totals are adjusted by each
+    file's change in size and never trigger metadata requests themselves.
+    """
+
+    def __init__(self, source=None, parent=None):
+        super().__init__(parent)
+        self._source = None
+        self._root = _DirNode("", None, 0)
+        self._parts: dict[str, tuple[str, ...]] = {}
+        self._sizes: dict[str, int] = {}
+        self._prefix: Optional[str] = None
+        self._removing: list[str] = []
+        if source is not None:
+            self.set_source_model(source)
+
+    # ---- source model ----
+    def source_model(self):
+        return self._source
+
+    def set_source_model(self, source) -> None:
+        self._source = source
+        source.rowsInserted.connect(self._on_rows_inserted)
+        source.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        source.rowsRemoved.connect(self._on_rows_removed)
+        source.rowsMoved.connect(self._reorder)
+        source.modelReset.connect(self.rebuild)
+        source.layoutChanged.connect(self._reorder)
+        source.dataChanged.connect(self._on_data_changed)
+        source.metadataCached.connect(self._update_size)
+        self.rebuild()
+
+    def _split(self, path: str) -> tuple[str, ...]:
+        parts = self._parts.get(path)
+        if parts is None:
+            prefix = self._prefix
+            text = path[len(prefix):] if prefix and path.startswith(prefix) else path
+            text = text.replace("\\", "/")
+            parts = tuple(part for part in text.split("/") if part)
+            if text.startswith("/") and parts:
+                parts = ("/" + parts[0],) + parts[1:]
+            self._parts[path] = parts or (path,)
+            parts = self._parts[path]
+        return parts
+
+    def rebuild(self, *args) -> None:
+        self.beginResetModel()
+        self._parts.clear()
+        self._sizes.clear()
+        self._prefix = self._source.root_prefix if self._source is not None else None
+        self._root = _DirNode("", None, 0)
+        self._root.pending = dict.fromkeys(self._source.files) if self._source is not None else {}
+        self._root.count = len(self._root.pending)
+        for path in self._root.pending:
+            self._add_size(self._root, path)
+        self._root.children = self._materialize(self._root)
+        self.endResetModel()
+
+    def _materialize(self, node: _DirNode) -> list[Union[_DirNode, str]]:
+        """Split the pending paths of ``node`` into its direct children."""
+        children: list[Union[_DirNode, str]] = []
+        dirs: dict[str, _DirNode] = {}
+        for path in node.pending:
+            parts = self._split(path)
+            if node.depth >= len(parts) - 1:
+                children.append(path)
+                continue
+            child = dirs.get(parts[node.depth])
+            if child is None:
+                child = dirs[parts[node.depth]] = _DirNode(parts[node.depth], node, node.depth + 1)
+                child.row = len(children)
+                children.append(child)
+            child.pending[path] = None
+            child.count += 1
+            self._add_size(child, path)
+        node.dirs = dirs
+        node.pending = None
+        return children
+
+    # ---- structure ----
+    def _node(self, index) -> _DirNode:
+        """The directory ``index`` refers to (the root for an invalid index)."""
+        if not index.isValid():
+            return self._root
+        child = index.internalPointer().children[index.row()]
+        return child if isinstance(child, _DirNode) else None
+
+    def _node_index(self, node: _DirNode, column: int = 0):
+        if node.parent is None:
+            return QModelIndex()
+        return self.createIndex(node.row, column, node.parent)
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        node = self._node(parent)
+        if node is None or not 0 <= row < len(node.children) or not 0 <= column < len(TREE_COLUMN_TITLES):
+            return QModelIndex()
+        return self.createIndex(row, column, node)
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self._node_index(index.internalPointer())
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = self._node(parent)
+        return len(node.children) if node is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(TREE_COLUMN_TITLES)
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        if node is None:
+            return False
+        return bool(node.children) if node.materialized else bool(node.pending)
+
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return node is not None and not node.materialized
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        if node is None or node.materialized:
+            return
+        children = self._materialize(node)
+        if not children:
+            return
+        self.beginInsertRows(parent, 0, len(children) - 1)
+        node.children = children
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(TREE_COLUMN_TITLES):
+            return TREE_COLUMN_TITLES[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    # ---- sizes ----
+    def _cached_size(self, path: str) -> Optional[int]:
+        metadata = self._source.cached_metadata(path)
+        if metadata is None or metadata.error:
+            return None
+        return metadata.size
+
+    def _add_size(self, node: _DirNode, path: str, sign: int = 1) -> None:
+        """Count the size of ``path`` (looked up when first seen) into ``node``."""
+        if path not in self._sizes:
+            size = self._cached_size(path)
+            self._sizes[path] = -1 if size is None else size
+        size = self._sizes[path]
+        if size < 0:
+            node.unknown += sign
+        else:
+            node.size += sign * size
+
+    def _update_size(self, path: str) -> None:
+        """Apply the change in size of ``path`` to its directories and repaint them."""
+        old = self._sizes.get(path)
+        if old is None:
+            return  # not in the tree
+        size = self._cached_size(path)
+        new = -1 if size is None else size
+        if new == old:
+            return
+        self._sizes[path] = new
+        parts = self._split(path)
+        node = self._root
+        while True:
+            node.size += max(new, 0) - max(old, 0)
+            node.unknown += (new < 0) - (old < 0)
+            if node.parent is not None:
+                index = self._node_index(node, TREE_COLUMN_SIZE)
+                self.dataChanged.emit(index, index)
+            if not node.materialized:
+                return
+            if node.depth >= len(parts) - 1:
+                # Repainting the column spares a search for the file's row;
+                # views only redraw the rows they show.
+                if node.children:
+                    self.dataChanged.emit(
+                        self.createIndex(0, TREE_COLUMN_SIZE, node),
+                        self.createIndex(len(node.children) - 1, TREE_COLUMN_SIZE, node),
+                    )
+                return
+            node = node.dirs.get(parts[node.depth])
+            if node is None:
+                return
+
+    # ---- data ----
+    def _size(self, item: Union[_DirNode, str]) -> tuple[int, bool]:
+        """Known size of ``item`` and whether every file's size is known."""
+        if isinstance(item, str):
+            metadata = self._source.metadata_for(item)
+            if metadata is None or metadata.error:
+                return 0, False
+            return metadata.size, True
+        return item.size, item.unknown == 0
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = index.internalPointer().children[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == TREE_COLUMN_NAME:
+                return self._split(item)[-1] if isinstance(item, str) else item.name
+            if column == TREE_COLUMN_FILES:
+                return f"{item.count:,}" if isinstance(item, _DirNode) else ""
+            size, complete = self._size(item)
+            if not size and not complete:
+                return ""
+            return format_size(size) + ("" if complete else "+")
+        if role in (Qt.UserRole, Qt.ToolTipRole) and isinstance(item, str):
+            return item
+        if role == Qt.TextAlignmentRole and column != TREE_COLUMN_NAME:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def is_dir(self, index) -> bool:
+        return index.isValid() and self._node(index) is not None
+
+    def item_key(self, index):
+        """Stable key of ``index``: the path of a file, the name parts of a directory."""
+        if not index.isValid():
+            return None
+        item = index.internalPointer().children[index.row()]
+        return item if isinstance(item, str) else item.key()
+
+    def index_for_key(self, key) -> QModelIndex:
+        """Find the row of an :meth:`item_key`, expanding directories on the way."""
+        if key is None:
+            return QModelIndex()
+        names = self._split(key)[:-1] if isinstance(key, str) else key
+        parent = QModelIndex()
+        node = self._root
+        for name in names:
+            if not node.materialized:
+                self.fetchMore(parent)
+            node = node.dirs.get(name)
+            if node is None:
+                return QModelIndex()
+            parent = self._node_index(node)
+        if isinstance(key, str):
+            if not node.materialized:
+                self.fetchMore(parent)
+            try:
+                return self.index(node.children.index(key), 0, parent)
+            except ValueError:
+                return QModelIndex()
+        return parent
+
+    def paths_under(self, index) -> list[str]:
+        """Every workspace path at or below ``index``."""
+        if not index.isValid():
+            return list(self._source.files)
+        item = index.internalPointer().children[index.row()]
+        if isinstance(item, str):
+            return [item]
+        paths: list[str] = []
+        stack = [item]
+        while stack:
+            node = stack.pop()
+            if not node.materialized:
+                paths.extend(node.pending)
+                continue
+            for child in node.children:
+                if isinstance(child, str):
+                    paths.append(child)
+                else:
+                    stack.append(child)
+        return paths
+
+    # ---- incremental updates ----
+    def _emit_counts(self, nodes: Iterable[_DirNode]) -> None:
+        for node in nodes:
+            if node.parent is not None and node.count:
+                self.dataChanged.emit(
+                    self._node_index(node, TREE_COLUMN_FILES), self._node_index(node, TREE_COLUMN_SIZE)
+                )
+
+    def _on_rows_inserted(self, parent, first, last):
+        if last + 1 != len(self._source.files):
+            self.rebuild()  # only appends are applied in place
+            return
+        touched: dict[_DirNode, None] = {}
+        staged: dict[_DirNode, list[Union[_DirNode, str]]] = {}
+        for path in self._source.files[first:last + 1]:
+            parts = self._split(path)
+            node = self._root
+            while True:
+                node.count += 1
+                self._add_size(node, path)
+                touched[node] = None
+                if not node.materialized:
+                    node.pending[path] = None
+                    break
+                if node.depth >= len(parts) - 1:
+                    staged.setdefault(node, []).append(path)
+                    break
+                child = node.dirs.get(parts[node.depth])
+                if child is None:
+                    child = node.dirs[parts[node.depth]] = _DirNode(parts[node.depth], node, node.depth + 1)
+                    staged.setdefault(node, []).append(child)
+                node = child
+        for node, items in staged.items():
+            start = len(node.children)
+            self.beginInsertRows(self._node_index(node), start, start + len(items) - 1)
+            for offset, item in enumerate(items):
+                if isinstance(item, _DirNode):
+                    item.row = start + offset
+            node.children.extend(items)
+            self.endInsertRows()
+        self._emit_counts(node for node in touched if node not in staged.get(node.parent, ()))
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        self._removing = self._source.files[first:last + 1]
+
+    def _on_rows_removed(self, parent, first, last):
+        paths, self._removing = self._removing, []
+        touched: dict[_DirNode, None] = {}
+        removed: dict[_DirNode, set] = {}
+        for path in paths:
+            parts = self._split(path)
+            node = self._root
+            while True:
+                node.count -= 1
+                self._add_size(node, path, -1)
+                touched[node] = None
+                if node.count == 0 and node.parent is not None:
+                    removed.setdefault(node.parent, set()).add(node)
+                if not node.materialized:
+                    del node.pending[path]
+                    break
+                if node.depth >= len(parts) - 1:
+                    removed.setdefault(node, set()).add(path)
+                    break
+                node = node.dirs[parts[node.depth]]
+            del self._parts[path]
+            del self._sizes[path]
+        for node, items in removed.items():
+            if self._detached(node):
+                continue
+            self._remove_children(node, items)
+        self._emit_counts(node for node in touched if not self._detached(node))
+
+    @staticmethod
+    def _detached(node: _DirNode) -> bool:
+        while node.parent is not None:
+            if node.count == 0:
+                return True
+            node = node.parent
+        return False
+
+    def _remove_children(self, node: _DirNode, items: set) -> None:
+        rows = [row for row, child in enumerate(node.children) if child in items]
+        parent = self._node_index(node)
+        while rows:
+            last = first = rows.pop()
+            while rows and rows[-1] == first - 1:
+                first = rows.pop()
+            self.beginRemoveRows(parent, first, last)
+            for child in node.children[first:last + 1]:
+                if isinstance(child, _DirNode):
+                    del node.dirs[child.name]
+            del node.children[first:last + 1]
+            for row in range(first, len(node.children)):
+                child = node.children[row]
+                if isinstance(child, _DirNode):
+                    child.row = row
+            self.endRemoveRows()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        if top_left.column() == COLUMN_PATH and (not roles or Qt.DisplayRole in roles):
+            if self._source.root_prefix != self._prefix:
+                self.rebuild()  # new root: the directory layout changes
+            return
+        if bottom_right.column() < COLUMN_SIZE or top_left.column() > COLUMN_ENCODING:
+            return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self._update_size(self._source.files[row])
+
+    def _reorder(self, *args) -> None:
+        """Follow a reordered workspace by sorting the existing branches in place."""
+        files = self._source.files
+        if len(files) != len(self._parts) or any(path not in self._parts for path in files):
+            self.rebuild()
+            return
+        position = {path: row for row, path in enumerate(files)}
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        items = [
+            (index.internalPointer(), index.internalPointer().children[index.row()], index.column())
+            for index in persistent
+        ]
+        self._sort_children(self._root, position)
+        file_rows: dict[_DirNode, dict[str, int]] = {}
+        moved = []
+        for node, item, column in items:
+            if isinstance(item, _DirNode):
+                row = item.row
+            else:
+                rows = file_rows.get(node)
+                if rows is None:
+                    rows = file_rows[node] = {
+                        child: r for r, child in enumerate(node.children) if isinstance(child, str)
+                    }
+                row = rows[item]
+            moved.append(self.createIndex(row, column, node))
+        self.changePersistentIndexList(persistent, moved)
+        self.layoutChanged.emit()
+
+    def _sort_children(self, node: _DirNode, position: dict[str, int]) -> int:
+        """Put the children of ``node`` in workspace order; returns its first position."""
+        if not node.materialized:
+            node.pending = dict.fromkeys(sorted(node.pending, key=position.__getitem__))
+            return position[next(iter(node.pending))] if node.pending else 0
+        keyed = [
+            (position[child] if isinstance(child, str) else self._sort_children(child, position), row)
+            for row, child in enumerate(node.children)
+        ]
+        keyed.sort()
+        node.children = [node.children[row] for _, row in keyed]
+        for row, child in enumerate(node.children):
+            if isinstance(child, _DirNode):
+                child.row = row
+        return keyed[0][0] if keyed else 0
@@ -0,0 +1,106 @@
+from functools import partial
+
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QMenu, QTreeView
+from PyQt5.QtCore import QItemSelectionModel, Qt
+
+from workspace_tree_model import TREE_COLUMN_NAME, WorkspaceTreeModel
+
+
+class WorkspaceTreeView(QTreeView):
+    """
+    Directory view of a :class:`~file_list_widget.FileListWidget`.
+
+    Edits go through the list widget, so removing or moving a whole
+    directory is one list operation and one history entry. Expanded
+    directories and the selection survive the tree being rebuilt after a
+    reorder or an undo.
+    """
+
+    def __init__(self, list_widget, parent=None):
+        super().__init__(parent)
+        self.list_widget = list_widget
+        self._model = WorkspaceTreeModel(list_widget.list_model, self)
+        self.setModel(self._model)
+        self.setUniformRowHeights(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setAllColumnsShowFocus(True)
+        header = self.header()
+        header.setStretchLastSection(False)
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(TREE_COLUMN_NAME, QHeaderView.Stretch)
+        self._expanded_keys: set = set()
+        self._selected_keys: list = []
+        self.expanded.connect(lambda index: self._expanded_keys.add(self._model.item_key(index)))
+        self.collapsed.connect(lambda index: self._expanded_keys.discard(self._model.item_key(index)))
+        self._model.modelAboutToBeReset.connect(self._save_state)
+        self._model.modelReset.connect(self._restore_state)
+
+    def tree_model(self) -> WorkspaceTreeModel:
+        return self._model
+
+    def _save_state(self) -> None:
+        self._selected_keys = [self._model.item_key(i) for i in self.selectionModel().selectedRows()]
+
+    def _restore_state(self) -> None:
+        for key in sorted(self._expanded_keys, key=len):
+            index = self._model.index_for_key(key)
+            if index.isValid():
+                self.expand(index)
+            else:
+                self._expanded_keys.discard(key)
+        for key in self._selected_keys:
+            index = self._model.index_for_key(key)
+            if index.isValid():
+                self.selectionModel().select(index, QItemSelectionModel.Select | QItemSelectionModel.Rows)
+        self._selected_keys = []
+
+    def _selected_paths(self) -> list[str]:
+        paths: dict[str, None] = {}
+        for index in self.selectionModel().selectedRows():
+            paths.update(dict.fromkeys(self._model.paths_under(index)))
+        return list(paths)
+
+    def remove_selected(self) -> None:
+        self.list_widget.remove_paths(self._selected_paths())
+
+    def move_item(self, index, step: int) -> None:
+        """Swap the file or directory at ``index`` with its neighbour ``step`` rows away."""
+        sibling = index.sibling(index.row() + step, 0)
+        if not sibling.isValid():
+            return
+        rows = [self.list_widget.index_of(p) for p in self._model.paths_under(sibling)]
+        target = min(rows) if step < 0 else max(rows) + 1
+        self.selectionModel().select(index, QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
+        self.list_widget.move_paths(self._model.paths_under(index), target)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Delete and self.selectionModel().hasSelection():
+            self.remove_selected()
+            return
+        super().keyPressEvent(event)
+
+    def contextMenuEvent(self, event):
+        index = self.indexAt(event.pos())
+        if not index.isValid():
+            return
+        index = index.sibling(index.row(), TREE_COLUMN_NAME)
+        if not self.selectionModel().isRowSelected(index.row(), index.parent()):
+            self.setCurrentIndex(index)
+        is_dir = self._model.is_dir(index)
+        menu = QMenu(self)
+        remove_action = menu.addAction("Remove Directory" if is_dir else "Remove File")
+        remove_action.triggered.connect(self.remove_selected)
+        menu.addSeparator()
+        up_action = menu.addAction("Move Up")
+        up_action.setEnabled(index.row() > 0)
+        up_action.triggered.connect(partial(self.move_item, index, -1))
+        down_action = menu.addAction("Move Down")
+        down_action.setEnabled(index.row() + 1 < self._model.rowCount(index.parent()))
+        down_action.triggered.connect(partial(self.move_item, index, 1))
+        if not is_dir:
+            menu.addSeparator()
+            encoding_action = menu.addAction("Check Encoding")
+            encoding_action.triggered.connect(partial(self.list_widget.check_encoding, index))
+            metadata_action = menu.addAction("View Metadata")
+            metadata_action.triggered.connect(partial(self.list_widget.view_metadata, index))
+        menu.exec_(self.mapToGlobal(event.pos()))